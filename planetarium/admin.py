@@ -2,7 +2,7 @@ from django.contrib import admin
 
 from planetarium.models import (ShowTheme, AstronomyShow,
                                 PlanetariumDome, ShowSession,
-                                Reservation, Ticket)
+                                Reservation, Ticket, SeatHold, Job)
 
 
 class TicketInLine(admin.TabularInline):
@@ -17,4 +17,12 @@ admin.site.register(ShowTheme)
 admin.site.register(AstronomyShow)
 admin.site.register(PlanetariumDome)
 admin.site.register(ShowSession)
-admin.site.register(Ticket)
\ No newline at end of file
+admin.site.register(Ticket)
+admin.site.register(SeatHold)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "status", "attempts", "run_after",
+                    "finished_at")
+    list_filter = ("status", "name")
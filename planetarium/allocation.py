@@ -0,0 +1,130 @@
+"""Best-available seat allocation on a SeatMap.
+
+Every row is an int with one bit per seat, set when the seat is free;
+seat s of a row of n seats is bit n - s. Blocks of count free seats are
+found with a few shift-and-ands per row, and the block or seats nearest
+to the middle of a row with bit scans, so the cost grows with the number
+of rows rather than seats.
+
+A seat or block scores ROW_WEIGHT per row away from the preferred row
+plus one per seat its middle is away from the middle of the row; the
+lowest score wins, on ties the one with lower seat numbers.
+"""
+
+PREFERENCES = ("center", "front", "back")
+ROW_WEIGHT = 2
+
+
+def preferred_row(rows, prefer):
+    """0-based preferred row index, may be between two rows"""
+    if prefer == "front":
+        return 0
+    if prefer == "back":
+        return rows - 1
+    return (rows - 1) / 2
+
+
+def rows_by_distance(rows, target):
+    """0-based row indexes ordered by their distance from target"""
+    return sorted(range(rows), key=lambda row: (abs(row - target), row))
+
+
+def free_rows(seat_map):
+    """Return a function of a 0-based row index giving its free mask"""
+    seats, bits = seat_map.seats_in_row, seat_map.bits
+    full = (1 << seats) - 1
+
+    def free(row):
+        # Only the bytes of the row, the last seat ends up in bit 0
+        first, last = row * seats, (row + 1) * seats - 1
+        taken = int.from_bytes(bits[first >> 3:(last >> 3) + 1], "big")
+        return ~(taken >> (7 - (last & 7))) & full
+
+    return free
+
+
+def block_starts(free, count):
+    """Bits b where bits b..b + count - 1 are all free"""
+    starts, width = free, 1
+    while width < count:
+        step = min(width, count - width)
+        starts &= starts >> step
+        width += step
+    return starts
+
+
+def nearest_bit(mask, target):
+    """Set bit of mask nearest to target, None for an empty mask"""
+    below = int(target)
+    low = mask & ((2 << below) - 1)
+    high = mask >> (below + 1)
+    best = low.bit_length() - 1 if low else None
+    if high:
+        bit = (high & -high).bit_length() + below
+        if best is None or bit - target <= target - best:
+            best = bit
+    return best
+
+
+def bits_by_distance(mask, target):
+    """Yield set bits of mask ordered by their distance from target"""
+    below = int(target)
+    low = mask & ((2 << below) - 1)
+    high = mask >> (below + 1) << (below + 1)
+    while low or high:
+        low_bit = low.bit_length() - 1 if low else None
+        high_bit = (high & -high).bit_length() - 1 if high else None
+        if high_bit is None or (
+            low_bit is not None and target - low_bit < high_bit - target
+        ):
+            low ^= 1 << low_bit
+            yield low_bit
+        else:
+            high ^= 1 << high_bit
+            yield high_bit
+
+
+def allocate(seat_map, count, prefer="center", together=True):
+    """Best free (row, seat) pairs for count people, None if none fit"""
+    rows, seats = seat_map.rows, seat_map.seats_in_row
+    if count < 1 or (together and count > seats):
+        return None
+    free = free_rows(seat_map)
+    target_row = preferred_row(rows, prefer)
+
+    if together:
+        # Bit b starts a block whose middle is (seats - count) / 2 - b
+        # seats off the middle of the row
+        target_bit = (seats - count) / 2
+        best = None
+        for row in rows_by_distance(rows, target_row):
+            row_score = ROW_WEIGHT * abs(row - target_row)
+            if best is not None and row_score >= best[0]:
+                break
+            bit = nearest_bit(block_starts(free(row), count), target_bit)
+            if bit is None:
+                continue
+            score = row_score + abs(bit - target_bit)
+            if best is None or score < best[0]:
+                best = (score, row, bit)
+        if best is None:
+            return None
+        _, row, bit = best
+        first = seats - bit - count + 1
+        return [(row + 1, seat) for seat in range(first, first + count)]
+
+    middle = (seats - 1) / 2
+    candidates = []
+    for row in rows_by_distance(rows, target_row):
+        row_score = ROW_WEIGHT * abs(row - target_row)
+        if len(candidates) >= count and row_score >= candidates[-1][0]:
+            break
+        for taken, bit in enumerate(bits_by_distance(free(row), middle)):
+            if taken == count:
+                break
+            candidates.append((row_score + abs(bit - middle), row, bit))
+        candidates.sort()
+        del candidates[count:]
+    if len(candidates) < count:
+        return None
+    return sorted((row + 1, seats - bit) for _, row, bit in candidates)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PlanetariumConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "planetarium"
+
+    def ready(self):
+        import planetarium.signals  # noqa: F401
+        import planetarium.tasks  # noqa: F401
@@ -0,0 +1,226 @@
+import asyncio
+import json
+from datetime import datetime
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from rest_framework.exceptions import Throttled
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+    TokenError,
+)
+
+from planetarium import events
+from planetarium.models import ShowSession
+from planetarium.read_models import (
+    show_session_list_items,
+    show_session_list_values,
+)
+from planetarium.renderers import FastJSONRenderer
+from planetarium.seatmap import SeatMap, taken_seats
+from planetarium.views import show_time_on
+from user.authentication import CachedJWTAuthentication
+
+jwt_authentication = CachedJWTAuthentication()
+json_renderer = FastJSONRenderer()
+
+
+def json_response(data, status=200, **kwargs):
+    return HttpResponse(json_renderer.render(data), status=status,
+                        content_type=json_renderer.media_type, **kwargs)
+
+
+async def authenticate(request):
+    """Resolve the JWT user, from the user cache when it is there.
+
+    Returns None when the request has no valid token.
+    """
+    header = jwt_authentication.get_header(request)
+    raw_token = header and jwt_authentication.get_raw_token(header)
+    if not raw_token:
+        return None
+    try:
+        token = jwt_authentication.get_validated_token(raw_token)
+        return await jwt_authentication.aget_user(token)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+
+
+def check_throttles(request):
+    """Run DEFAULT_THROTTLE_CLASSES as APIView does.
+
+    Returns None when every throttle allows the request, else the
+    Throttled error with the longest wait.
+    """
+    throttles = [cls() for cls in api_settings.DEFAULT_THROTTLE_CLASSES]
+    waits = [throttle.wait() for throttle in throttles
+             if not throttle.allow_request(request, None)]
+    if not waits:
+        return None
+    return Throttled(max((wait for wait in waits if wait is not None),
+                         default=None))
+
+
+def authenticated(view):
+    """Authenticate and throttle requests to an async view"""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request.user = await authenticate(request)
+        if request.user is None:
+            return json_response(
+                {"detail": "Authentication credentials were not provided."},
+                status=401,
+                headers={"WWW-Authenticate": jwt_authentication
+                         .authenticate_header(request)},
+            )
+        # The throttles use the blocking cache API
+        throttled = await sync_to_async(check_throttles)(request)
+        if throttled is not None:
+            headers = {}
+            if throttled.wait is not None:
+                headers["Retry-After"] = str(throttled.wait)
+            return json_response({"detail": str(throttled.detail)},
+                                 status=throttled.status_code,
+                                 headers=headers)
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def query_int(request, name, default):
+    try:
+        value = int(request.GET[name])
+    except (KeyError, ValueError):
+        return default
+    return value if value > 0 else default
+
+
+@authenticated
+async def show_session_list(request):
+    """Async twin of GET /show-sessions/ with limit/offset pagination"""
+    queryset = ShowSession.objects.all()
+    date = request.GET.get("date")
+    if date:
+        try:
+            date = datetime.strptime(date, "%Y-%m-%d").date()
+        except ValueError:
+            return json_response({"date": ["Use format YYYY-MM-DD"]},
+                                 status=400)
+        queryset = queryset.filter(**show_time_on(date))
+
+    paginator = LimitOffsetPagination()
+    paginator.request = request
+    paginator.limit = query_int(request, "limit", api_settings.PAGE_SIZE)
+    paginator.offset = query_int(request, "offset", 0)
+    paginator.count = await queryset.acount()
+
+    rows = show_session_list_values(queryset.order_by("id"))
+    window = rows[paginator.offset:paginator.offset + paginator.limit]
+    return json_response({
+        "count": paginator.count,
+        "next": paginator.get_next_link(),
+        "previous": paginator.get_previous_link(),
+        "results": show_session_list_items(
+            [row async for row in window.aiterator()], request
+        ),
+    })
+
+
+async def get_show_session(pk):
+    return await ShowSession.objects.select_related(
+        "planetarium_dome"
+    ).aget(pk=pk)
+
+
+def show_session_not_found():
+    return json_response({"detail": "No ShowSession matches the given query."},
+                         status=404)
+
+
+async def seat_map_data(show_session, seatmap="list"):
+    if seatmap == "bitmap":
+        seat_map = await SeatMap.afor_show_session(show_session)
+        taken = seat_map.to_base64()
+    else:
+        taken = [
+            {"row": row, "seat": seat}
+            async for row, seat in taken_seats(show_session)
+        ]
+    dome = show_session.planetarium_dome
+    return {
+        "id": show_session.id,
+        "rows": dome.rows,
+        "seats_in_row": dome.seats_in_row,
+        "taken_seats": taken,
+    }
+
+
+@authenticated
+async def show_session_seat_map(request, pk):
+    """Taken seats of a session as a list or a base64 bitmap"""
+    try:
+        show_session = await get_show_session(pk)
+    except ShowSession.DoesNotExist:
+        return show_session_not_found()
+    seatmap = request.GET.get("seatmap", "list")
+    if seatmap not in ("list", "bitmap"):
+        return json_response({"seatmap": ["Use list or bitmap"]}, status=400)
+    return json_response(await seat_map_data(show_session, seatmap))
+
+
+def server_sent_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def seat_events(show_session):
+    hub = events.get_hub()
+    queue = hub.subscribe(show_session.id)
+    try:
+        # Subscribed before the snapshot is read, so no committed change
+        # can fall between the snapshot and the first delta.
+        yield server_sent_event("snapshot", await seat_map_data(show_session))
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), settings.PLANETARIUM_SEAT_EVENT_KEEPALIVE
+                )
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event is events.RESYNC:
+                yield server_sent_event("snapshot",
+                                        await seat_map_data(show_session))
+            else:
+                yield server_sent_event(event["type"],
+                                        {"seats": event["seats"]})
+    finally:
+        hub.unsubscribe(show_session.id, queue)
+
+
+@authenticated
+async def show_session_events(request, pk):
+    """Server-sent events: one seat map snapshot, then taken/released deltas
+
+    Needs an ASGI server, WSGI servers would buffer the endless stream.
+    """
+    if not isinstance(request, ASGIRequest):
+        return json_response(
+            {"detail": "Seat events are only served over ASGI."},
+            status=501,
+        )
+    try:
+        show_session = await get_show_session(pk)
+    except ShowSession.DoesNotExist:
+        return show_session_not_found()
+    response = StreamingHttpResponse(
+        seat_events(show_session), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
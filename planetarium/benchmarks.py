@@ -0,0 +1,317 @@
+import itertools
+import statistics
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from planetarium import cache as catalog, throttling
+from planetarium.models import (
+    AstronomyShow,
+    PlanetariumDome,
+    Reservation,
+    SeatHold,
+    ShowSession,
+    Ticket,
+)
+
+PASSWORD = "bench-password"
+CATALOG_MODELS = ("showtheme", "astronomyshow", "planetariumdome")
+
+
+class Scenario:
+    """Users and objects the benchmarked requests refer to.
+
+    Writes go to a show session in a dome of its own, one new seat per
+    request, so that repeated requests never conflict. The user gets a
+    few reservations of several tickets up front, which makes nested
+    serializers show up in the query counts.
+    """
+
+    def __init__(self):
+        self.user = self.get_user("bench-user@example.com")
+        self.admin = self.get_user("bench-admin@example.com", is_staff=True)
+        self.dome = PlanetariumDome.objects.create(
+            name=f"Bench dome {time.time_ns()}", rows=100, seats_in_row=100
+        )
+        self.show = AstronomyShow.objects.order_by("id").first()
+        self.session = ShowSession.objects.create(
+            astronomy_show=self.show,
+            planetarium_dome=self.dome,
+            show_time=timezone.now() + timedelta(days=1),
+        )
+        self.seats = (
+            (row, seat)
+            for row in range(1, self.dome.rows + 1)
+            for seat in range(1, self.dome.seats_in_row + 1)
+        )
+        self.counter = itertools.count()
+        for _ in range(3):
+            reservation = Reservation.objects.create(user=self.user)
+            Ticket.objects.bulk_create(
+                Ticket(reservation=reservation, show_session=self.session,
+                       row=row, seat=seat)
+                for row, seat in itertools.islice(self.seats, 3)
+            )
+        ShowSession.objects.filter(pk=self.session.pk).update(tickets_sold=9)
+        self.refresh = RefreshToken.for_user(self.user)
+
+    @staticmethod
+    def get_user(email, is_staff=False):
+        user, _ = get_user_model().objects.get_or_create(
+            email=email, defaults={"is_staff": is_staff}
+        )
+        user.set_password(PASSWORD)
+        user.save()
+        return user
+
+    def seat(self):
+        row, seat = next(self.seats)
+        return {"show_session": self.session.pk, "row": row, "seat": seat}
+
+    def hold(self):
+        seat = self.seat()
+        return SeatHold.objects.create(
+            user=self.user,
+            show_session_id=seat["show_session"],
+            row=seat["row"],
+            seat=seat["seat"],
+            expires_at=timezone.now() + timedelta(minutes=10),
+        )
+
+    def unique(self):
+        return f"{time.time_ns()}-{next(self.counter)}"
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """A route with the number of SQL queries it may run.
+
+    request builds (method, path, data) from a Scenario, as user is
+    the client to authenticate as: "user", "admin" or None.
+    """
+
+    name: str
+    budget: int
+    request: Callable
+    user: str | None = "user"
+
+
+def url(name, *args):
+    return reverse(f"planetarium:{name}", args=args)
+
+
+def reserve_holds(scenario):
+    scenario.hold()
+    return "post", url("seathold-reserve"), None
+
+
+# Not measured: the server-sent events stream of a show session never
+# ends, and upload-image writes files and renditions to media storage.
+
+ENDPOINTS = (
+    Endpoint("api-root", 0, lambda s: ("get", url("api-root"), None)),
+    Endpoint("show-themes", 2, lambda s: (
+        "get", url("showtheme-list"), None
+    )),
+    Endpoint("show-themes create", 3, lambda s: (
+        "post", url("showtheme-list"), {"name": f"Theme {s.unique()}"}
+    ), user="admin"),
+    Endpoint("astronomy-shows", 3, lambda s: (
+        "get", url("astronomyshow-list"), None
+    )),
+    Endpoint("astronomy-shows themes filter", 3, lambda s: (
+        "get", url("astronomyshow-list"), {"themes": "1,2,3"}
+    )),
+    Endpoint("astronomy-shows retrieve", 2, lambda s: (
+        "get", url("astronomyshow-detail", s.show.pk), None
+    )),
+    Endpoint("astronomy-shows create", 2, lambda s: (
+        "post", url("astronomyshow-list"),
+        {"title": f"Show {s.unique()}", "description": "Benchmark"},
+    ), user="admin"),
+    Endpoint("planetarium-domes", 2, lambda s: (
+        "get", url("planetariumdome-list"), None
+    )),
+    Endpoint("planetarium-domes create", 1, lambda s: (
+        "post", url("planetariumdome-list"),
+        {"name": f"Dome {s.unique()}", "rows": 10, "seats_in_row": 10},
+    ), user="admin"),
+    Endpoint("show-sessions", 3, lambda s: (
+        "get", url("showsession-list"), None
+    )),
+    Endpoint("show-sessions cursor", 1, lambda s: (
+        "get", url("showsession-list"), {"pagination": "cursor"}
+    )),
+    Endpoint("show-sessions date filter", 3, lambda s: (
+        "get", url("showsession-list"),
+        {"date": s.session.show_time.date().isoformat()},
+    )),
+    Endpoint("show-sessions retrieve", 4, lambda s: (
+        "get", url("showsession-detail", s.session.pk), None
+    )),
+    Endpoint("show-sessions retrieve bitmap", 4, lambda s: (
+        "get", url("showsession-detail", s.session.pk), {"seatmap": "bitmap"}
+    )),
+    Endpoint("show-sessions create", 3, lambda s: (
+        "post", url("showsession-list"),
+        {"astronomy_show": s.show.pk, "planetarium_dome": s.dome.pk,
+         "show_time": timezone.now().isoformat()},
+    ), user="admin"),
+    Endpoint("show-sessions update", 5, lambda s: (
+        "patch", url("showsession-detail", s.session.pk),
+        {"show_time": s.session.show_time.isoformat()},
+    ), user="admin"),
+    Endpoint("show-sessions allocate", 12, lambda s: (
+        "post", url("showsession-allocate", s.session.pk), {"count": 2}
+    )),
+    Endpoint("show-sessions delete", 6, lambda s: (
+        "delete", url("showsession-detail", ShowSession.objects.create(
+            astronomy_show=s.show, planetarium_dome=s.dome,
+            show_time=timezone.now(),
+        ).pk), None,
+    ), user="admin"),
+    Endpoint("reservations", 8, lambda s: (
+        "get", url("reservation-list"), None
+    )),
+    Endpoint("reservations cursor", 5, lambda s: (
+        "get", url("reservation-list"), {"pagination": "cursor"}
+    )),
+    Endpoint("reservations create", 11, lambda s: (
+        "post", url("reservation-list"), {"tickets": [s.seat(), s.seat()]}
+    )),
+    Endpoint("tickets", 5, lambda s: ("get", url("ticket-list"), None)),
+    Endpoint("tickets cursor", 2, lambda s: (
+        "get", url("ticket-list"), {"pagination": "cursor"}
+    )),
+    Endpoint("tickets export", 1, lambda s: (
+        "get", url("ticket-export"),
+        {"format": "ndjson", "show_session": s.session.pk},
+    ), user="admin"),
+    Endpoint("seat-holds", 1, lambda s: ("get", url("seathold-list"), None)),
+    Endpoint("seat-holds create", 7, lambda s: (
+        "post", url("seathold-list"), {"seats": [s.seat()]}
+    )),
+    Endpoint("seat-holds delete", 3, lambda s: (
+        "delete", url("seathold-detail", s.hold().pk), None
+    )),
+    Endpoint("seat-holds reserve", 12, reserve_holds),
+    Endpoint("cache-stats", 0, lambda s: ("get", url("cache-stats"), None),
+             user="admin"),
+    Endpoint("async show-sessions", 2, lambda s: (
+        "get", url("async-showsession-list"), None
+    )),
+    Endpoint("async seat-map", 2, lambda s: (
+        "get", url("async-showsession-seat-map", s.session.pk), None
+    )),
+    Endpoint("user register", 2, lambda s: (
+        "post", reverse("user:create"),
+        {"email": f"bench-{s.unique()}@example.com", "password": "secret1"},
+    ), user=None),
+    Endpoint("user token", 1, lambda s: (
+        "post", reverse("user:token_obtain_pair"),
+        {"email": s.user.email, "password": PASSWORD},
+    ), user=None),
+    Endpoint("user token refresh", 1, lambda s: (
+        "post", reverse("user:token_refresh"), {"refresh": str(s.refresh)}
+    ), user=None),
+    Endpoint("user token verify", 0, lambda s: (
+        "post", reverse("user:token_verify"),
+        {"token": str(s.refresh.access_token)},
+    ), user=None),
+    Endpoint("user me", 0, lambda s: ("get", reverse("user:manage_user"),
+                                      None)),
+    Endpoint("user me update", 2, lambda s: (
+        "patch", reverse("user:manage_user"), {"first_name": "Bench"}
+    )),
+)
+
+
+def reset_throttles(users):
+    """Forget request history so long runs stay under the daily rates"""
+    throttling.reset_throttles(
+        ["127.0.0.1"] + [user.pk for user in users]
+    )
+
+
+def make_clients(scenario):
+    clients = {None: APIClient()}
+    for name in ("user", "admin"):
+        client = APIClient()
+        token = RefreshToken.for_user(getattr(scenario, name)).access_token
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        clients[name] = client
+    return clients
+
+
+def send(client, method, path, data):
+    if method == "get":
+        response = client.get(path, data)
+    else:
+        response = getattr(client, method)(path, data, format="json")
+    if response.streaming:
+        b"".join(response.streaming_content)
+    return response
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def measure(endpoint, scenario, clients, iterations=1):
+    """Time an endpoint and count the queries of its first request.
+
+    The first request runs with a cold catalog cache, later ones may be
+    served from it. Returns the result as a JSON serializable dict.
+    """
+    client = clients[endpoint.user]
+    users = (scenario.user, scenario.admin)
+    for model_name in CATALOG_MODELS:
+        catalog.invalidate(model_name)
+    timings = []
+    statuses = set()
+    queries = None
+    for _ in range(iterations):
+        reset_throttles(users)
+        method, path, data = endpoint.request(scenario)
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = send(client, method, path, data)
+            timings.append((time.perf_counter() - started) * 1000)
+        statuses.add(response.status_code)
+        if queries is None:
+            queries = len(context.captured_queries)
+    return {
+        "endpoint": endpoint.name,
+        "method": method.upper(),
+        "path": path,
+        "statuses": sorted(statuses),
+        "queries": queries,
+        "budget": endpoint.budget,
+        "iterations": iterations,
+        "p50_ms": percentile(timings, 0.50),
+        "p95_ms": percentile(timings, 0.95),
+        "mean_ms": statistics.fmean(timings),
+    }
+
+
+def run(iterations=1, endpoints=ENDPOINTS):
+    """Measure endpoints against the current database, in order"""
+    scenario = Scenario()
+    clients = make_clients(scenario)
+    for name in ("user", "admin"):
+        # Budgets leave out the user lookup of a cold user cache
+        clients[name].get(reverse("user:manage_user"))
+    return [
+        measure(endpoint, scenario, clients, iterations)
+        for endpoint in endpoints
+    ]
@@ -0,0 +1,307 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from rest_framework import serializers
+
+from planetarium import events
+from planetarium.allocation import allocate
+from planetarium.counters import add_tickets_sold, bump_versions
+from planetarium.models import Reservation, ShowSession, Ticket, SeatHold
+from planetarium.seatmap import SeatMap
+
+# Seat maps rebuilt when allocated seats are sold concurrently
+ALLOCATION_ATTEMPTS = 3
+RESERVATION_LOCKING = ("constraint", "session", "advisory", "optimistic")
+
+
+def seat_taken_message(row, seat):
+    return f"Seat {seat} in row {row} is already taken."
+
+
+def load_show_sessions(tickets_data):
+    """Load every referenced show session and its dome in one query"""
+    session_ids = {ticket["show_session_id"] for ticket in tickets_data}
+    return ShowSession.objects.select_related("planetarium_dome").in_bulk(
+        session_ids
+    )
+
+
+def seats_condition(tickets_data):
+    condition = Q()
+    for ticket in tickets_data:
+        condition |= Q(
+            show_session_id=ticket["show_session_id"],
+            row=ticket["row"],
+            seat=ticket["seat"],
+        )
+    return condition
+
+
+def find_taken_seats(tickets_data, user=None):
+    """Return the (show_session_id, row, seat) keys that are unavailable.
+
+    A seat is unavailable when it is sold or held by anybody but the
+    given user. Both are read with one UNION query.
+    """
+    condition = seats_condition(tickets_data)
+    fields = ("show_session_id", "row", "seat")
+    sold = Ticket.objects.filter(condition).values_list(*fields)
+    held = SeatHold.objects.active().filter(condition)
+    if user is not None:
+        held = held.exclude(user=user)
+    return set(
+        sold.order_by().union(held.values_list(*fields).order_by())
+    )
+
+
+def seat_keys(objects):
+    return [(obj.show_session_id, obj.row, obj.seat) for obj in objects]
+
+
+def validate_tickets(tickets_data, user=None):
+    """Validate a whole reservation in memory.
+
+    Rows and seats are checked against the dome of every referenced
+    session, then all requested seats are checked for conflicts with
+    one query. Seats held by the given user do not conflict. Errors are
+    reported per ticket, in request order.
+    """
+    show_sessions = load_show_sessions(tickets_data)
+    errors = [{} for _ in tickets_data]
+    requested = set()
+
+    for index, ticket in enumerate(tickets_data):
+        show_session = show_sessions.get(ticket["show_session_id"])
+        if show_session is None:
+            errors[index]["show_session"] = [
+                f"Invalid pk \"{ticket['show_session_id']}\" - "
+                f"object does not exist."
+            ]
+            continue
+        dome = show_session.planetarium_dome
+        try:
+            Ticket.validate_row(ticket["row"], dome.rows,
+                                serializers.ValidationError)
+            Ticket.validate_seat(ticket["seat"], dome.seats_in_row,
+                                 serializers.ValidationError)
+        except serializers.ValidationError as error:
+            errors[index].update(error.detail)
+            continue
+        key = (ticket["show_session_id"], ticket["row"], ticket["seat"])
+        if key in requested:
+            errors[index]["seat"] = [
+                seat_taken_message(ticket["row"], ticket["seat"])
+            ]
+        requested.add(key)
+
+    if not any(errors):
+        errors = taken_seat_errors(tickets_data,
+                                   find_taken_seats(tickets_data, user))
+    if any(errors):
+        raise serializers.ValidationError(errors)
+    return tickets_data
+
+
+def taken_seat_errors(tickets_data, taken):
+    errors = []
+    for ticket in tickets_data:
+        key = (ticket["show_session_id"], ticket["row"], ticket["seat"])
+        if key in taken:
+            errors.append(
+                {"seat": [seat_taken_message(ticket["row"], ticket["seat"])]}
+            )
+        else:
+            errors.append({})
+    return errors
+
+
+def lock_seats(tickets_data, locking):
+    """Serialize reservations of the requested seats until commit.
+
+    "session" locks the rows of the show sessions with SELECT ... FOR
+    UPDATE, "advisory" takes a PostgreSQL transaction advisory lock per
+    (show session, row), other databases skip it. Locks are taken in a
+    fixed order so concurrent reservations cannot deadlock.
+    """
+    if locking == "session":
+        list(
+            ShowSession.objects.select_for_update()
+            .filter(pk__in={ticket["show_session_id"]
+                            for ticket in tickets_data})
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+    elif locking == "advisory" and connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            for key in sorted({(ticket["show_session_id"], ticket["row"])
+                               for ticket in tickets_data}):
+                # The two argument form takes int4 keys, session ids
+                # are bigint
+                cursor.execute(
+                    "SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))",
+                    ["planetarium.seats:{}:{}".format(*key)],
+                )
+
+
+def create_tickets(reservation, tickets_data, locking=None):
+    """Insert all tickets of a reservation with a single bulk_create.
+
+    Must run inside a transaction. A seat sold concurrently after
+    validation is reported per seat instead of surfacing as a server
+    error; how it is detected depends on locking, by default
+    PLANETARIUM_RESERVATION_LOCKING:
+
+    - "constraint": insert in a savepoint, the unique_ticket_seat_session
+      constraint fails late and the savepoint is rolled back
+    - "session" or "advisory": lock first (see lock_seats), then check
+      the seats again and insert only when they are all free
+    - "optimistic": INSERT ... ON CONFLICT DO NOTHING, then count the
+      inserted tickets to report the conflicting seats
+
+    tickets_sold of every affected session is updated in the same
+    transaction and the seat holds of the reservation owner on these
+    seats are released. Seat events are published once the transaction
+    commits.
+    """
+    locking = locking or settings.PLANETARIUM_RESERVATION_LOCKING
+    if locking not in RESERVATION_LOCKING:
+        raise ImproperlyConfigured(
+            "PLANETARIUM_RESERVATION_LOCKING must be one of "
+            f"{', '.join(RESERVATION_LOCKING)}"
+        )
+    tickets = [
+        Ticket(reservation=reservation, **ticket_data)
+        for ticket_data in tickets_data
+    ]
+    if locking in ("session", "advisory"):
+        lock_seats(tickets_data, locking)
+        errors = taken_seat_errors(
+            tickets_data, find_taken_seats(tickets_data, reservation.user_id)
+        )
+        if any(errors):
+            raise serializers.ValidationError({"tickets": errors})
+
+    if locking == "optimistic":
+        Ticket.objects.bulk_create(tickets, ignore_conflicts=True)
+        tickets = list(Ticket.objects.filter(reservation=reservation))
+        if len(tickets) < len(tickets_data):
+            taken = {
+                (ticket["show_session_id"], ticket["row"], ticket["seat"])
+                for ticket in tickets_data
+            } - set(seat_keys(tickets))
+            raise serializers.ValidationError(
+                {"tickets": taken_seat_errors(tickets_data, taken)}
+            )
+    else:
+        try:
+            with transaction.atomic():
+                tickets = Ticket.objects.bulk_create(tickets)
+        except IntegrityError:
+            errors = taken_seat_errors(
+                tickets_data,
+                find_taken_seats(tickets_data, reservation.user_id),
+            )
+            if not any(errors):
+                raise
+            raise serializers.ValidationError({"tickets": errors})
+    add_tickets_sold(ticket.show_session_id for ticket in tickets)
+    events.publish_seats_on_commit(events.SEATS_TAKEN, seat_keys(tickets))
+    SeatHold.objects.filter(
+        seats_condition(tickets_data), user_id=reservation.user_id
+    ).delete()
+    return tickets
+
+
+def hold_seats(user, tickets_data):
+    """Hold validated seats for the user for PLANETARIUM_SEAT_HOLD_TTL.
+
+    Holding a seat again extends the hold. Expired holds of other users
+    on the same seats are replaced, and concurrent holds on a seat are
+    arbitrated by the unique_seat_hold_session constraint.
+    """
+    now = timezone.now()
+    expires_at = now + settings.PLANETARIUM_SEAT_HOLD_TTL
+    holds = [
+        SeatHold(user=user, expires_at=expires_at, **ticket_data)
+        for ticket_data in tickets_data
+    ]
+    try:
+        with transaction.atomic():
+            SeatHold.objects.filter(seats_condition(tickets_data)).filter(
+                Q(user=user) | Q(expires_at__lte=now)
+            ).delete()
+            holds = SeatHold.objects.bulk_create(holds)
+            bump_versions(hold.show_session_id for hold in holds)
+            events.publish_seats_on_commit(events.SEATS_TAKEN,
+                                           seat_keys(holds))
+            return holds
+    except IntegrityError:
+        errors = taken_seat_errors(tickets_data,
+                                   find_taken_seats(tickets_data, user))
+        if not any(errors):
+            raise
+        raise serializers.ValidationError({"seats": errors})
+
+
+def purge_expired_holds():
+    """Delete expired seat holds, return how many were deleted.
+
+    Expired holds no longer count as taken, but seat event clients only
+    learn about it from the released event published here.
+    """
+    expired = SeatHold.objects.expired()
+    with transaction.atomic():
+        unsold = expired.exclude(
+            Exists(Ticket.objects.filter(
+                show_session_id=OuterRef("show_session_id"),
+                row=OuterRef("row"),
+                seat=OuterRef("seat"),
+            ))
+        ).values_list("show_session_id", "row", "seat")
+        events.publish_seats_on_commit(events.SEATS_RELEASED, unsold)
+        bump_versions(expired.values_list("show_session_id", flat=True))
+        deleted, _ = expired.delete()
+    return deleted
+
+def reserve_best_available(user, show_session, count, prefer="center",
+                           together=True):
+    """Reserve the best free seats of a session for count people.
+
+    Seats are picked on the current seat map (sold and held seats are
+    taken) and reserved in one transaction; when another buyer sells or
+    holds one of them first, the map is rebuilt and allocation runs
+    again.
+    """
+    for attempt in range(ALLOCATION_ATTEMPTS):
+        seats = allocate(SeatMap.for_show_session(show_session), count,
+                         prefer, together)
+        if seats is None:
+            raise serializers.ValidationError({"count": [
+                f"There are no {count} free seats"
+                + (" together." if together else ".")
+            ]})
+        tickets_data = [
+            {"show_session_id": show_session.id, "row": row, "seat": seat}
+            for row, seat in seats
+        ]
+        try:
+            with transaction.atomic():
+                reservation = Reservation.objects.create(user=user)
+                create_tickets(reservation, tickets_data)
+                # Only the lock strategies recheck holds, a hold placed
+                # after the map was read must not be overridden
+                if SeatHold.objects.active().filter(
+                    seats_condition(tickets_data)
+                ).exclude(user=user).exists():
+                    raise serializers.ValidationError(
+                        {"tickets": ["Seats were held concurrently."]}
+                    )
+                return reservation
+        except serializers.ValidationError as error:
+            if attempt == ALLOCATION_ATTEMPTS - 1:
+                raise serializers.ValidationError({"count": [
+                    "The free seats were taken while reserving them, "
+                    "try again."
+                ]}) from error
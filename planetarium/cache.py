@@ -0,0 +1,169 @@
+import hashlib
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from django.utils.http import parse_etags
+from rest_framework.response import Response
+
+from planetarium import jobs
+
+PREFIX = "planetarium:catalog"
+STATS_KEYS = {"hits": f"{PREFIX}:hits", "misses": f"{PREFIX}:misses"}
+
+
+def make_etag(*parts):
+    """Strong ETag from the given parts"""
+    digest = hashlib.sha1("\n".join(map(str, parts)).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request, etag):
+    etags = parse_etags(request.headers.get("If-None-Match", ""))
+    return etag in etags or "*" in etags
+
+
+def not_modified(etag):
+    return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+def generation_key(model_name):
+    return f"{PREFIX}:generation:{model_name}"
+
+
+def version_key(model_name, pk):
+    return f"{PREFIX}:version:{model_name}:{pk}"
+
+
+def increment(key, initial=1):
+    """Atomically increment a counter, starting it if it is missing"""
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, initial, timeout=None):
+            cache.incr(key)
+
+
+def invalidate(model_name, pk=None):
+    """Invalidate cached responses that render the given model.
+
+    Every list of the model and every response that nests it is
+    invalidated; with a pk, only that object's detail response is.
+    Generation counters start at the current time so that a counter
+    evicted from the cache never comes back with a value it had.
+    """
+    increment(generation_key(model_name), time.time_ns())
+    if pk is not None:
+        increment(version_key(model_name, pk), time.time_ns())
+    schedule_warming()
+
+
+def schedule_warming():
+    """Queue one warm_catalog_cache job for a burst of changes"""
+    if settings.PLANETARIUM_CACHE_WARM_URL:
+        jobs.enqueue(
+            "warm_catalog_cache",
+            unique=True,
+            delay=timedelta(seconds=settings.PLANETARIUM_CACHE_WARM_DELAY),
+        )
+
+
+def read_counters(keys):
+    """Read generation or version counters, starting missing ones"""
+    counters = cache.get_many(keys)
+    missing = [key for key in keys if key not in counters]
+    for key in missing:
+        cache.add(key, time.time_ns(), timeout=None)
+    if missing:
+        counters.update(cache.get_many(missing))
+    return [counters.get(key) for key in keys]
+
+
+def generations(model_names):
+    return read_counters([generation_key(name) for name in model_names])
+
+
+def catalog_cache_stats():
+    values = cache.get_many(STATS_KEYS.values())
+    return {name: values.get(key, 0) for name, key in STATS_KEYS.items()}
+
+
+class CatalogCacheMixin:
+    """Cache list and retrieve responses of near-static catalog viewsets.
+
+    Keys cover the scheme and host (responses hold absolute image URLs),
+    the action, the object, every query parameter (filters and
+    pagination window) and the generation counters of
+    cache_model and cache_dependencies, which signals bump on change.
+    Detail responses follow the version of their own object only, so
+    saving one object does not invalidate the details of the others.
+    """
+
+    cache_model = None
+    cache_dependencies = ()
+
+    def get_cache_etag(self, request, pk=None):
+        if pk is None:
+            keys = [generation_key(self.cache_model)]
+        else:
+            keys = [version_key(self.cache_model, pk)]
+        keys += [generation_key(name) for name in self.cache_dependencies]
+        return make_etag(
+            request.scheme,
+            request.get_host(),
+            self.action,
+            pk,
+            *read_counters(keys),
+            *sorted(f"{name}={value}"
+                    for name, values in request.query_params.lists()
+                    for value in values),
+        )
+
+    def cached_response(self, request, render, pk=None):
+        """Answer from the cache, or render and cache a 200 response.
+
+        The key is derived from a strong ETag, so a matching
+        If-None-Match is answered with 304 without touching the cache.
+        """
+        etag = self.get_cache_etag(request, pk)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        key = f"{PREFIX}:{self.basename}:" + etag.strip('"')
+        data = cache.get(key)
+        if data is not None:
+            increment(STATS_KEYS["hits"])
+            response = Response(data)
+            response["X-Cache"] = "HIT"
+            response["ETag"] = etag
+            return response
+        increment(STATS_KEYS["misses"])
+        response = render()
+        response["X-Cache"] = "MISS"
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data,
+                      settings.PLANETARIUM_CATALOG_CACHE_TIMEOUT)
+            response["ETag"] = etag
+        return response
+
+
+class CachedListMixin(CatalogCacheMixin):
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            request,
+            lambda: super(CachedListMixin, self).list(
+                request, *args, **kwargs
+            ),
+        )
+
+
+class CachedRetrieveMixin(CatalogCacheMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            request,
+            lambda: super(CachedRetrieveMixin, self).retrieve(
+                request, *args, **kwargs
+            ),
+            pk=kwargs[self.lookup_url_kwarg or self.lookup_field],
+        )
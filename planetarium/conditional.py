@@ -0,0 +1,76 @@
+from django.db.models import Count, Max
+from rest_framework import status
+from rest_framework.pagination import CursorPagination
+
+from planetarium.cache import etag_matches, generations, make_etag, not_modified
+
+
+class ConditionalGetMixin:
+    """Strong ETags and If-None-Match for viewsets.
+
+    The ETag is computed before any serializer runs, from a cheap
+    watermark query, the catalog generations of etag_dependencies (cache
+    reads only), the requesting user and the full path. A matching
+    If-None-Match gets 304 Not Modified without a response body.
+    """
+
+    etag_dependencies = ()
+
+    def get_etag(self, request, watermark):
+        return make_etag(
+            request.get_full_path(),
+            request.user.pk,
+            watermark,
+            *generations(self.etag_dependencies),
+        )
+
+    def conditional_response(self, request, etag, render):
+        if etag is not None and etag_matches(request, etag):
+            return not_modified(etag)
+        response = render()
+        if etag is not None and response.status_code == status.HTTP_200_OK:
+            response["ETag"] = etag
+        return response
+
+
+class ConditionalListMixin(ConditionalGetMixin):
+    def get_list_watermark(self, queryset):
+        """Summary of the filtered queryset that changes with its content"""
+        return tuple(
+            queryset.aggregate(count=Count("pk"), last=Max("pk")).values()
+        )
+
+    def list(self, request, *args, **kwargs):
+        # The watermark scans the whole filtered queryset, which keyset
+        # pages are built to avoid, so cursor pages get no ETag
+        etag = None
+        if not isinstance(self.paginator, CursorPagination):
+            queryset = self.filter_queryset(self.get_queryset())
+            etag = self.get_etag(request, self.get_list_watermark(queryset))
+        return self.conditional_response(
+            request,
+            etag,
+            lambda: super(ConditionalListMixin, self).list(
+                request, *args, **kwargs
+            ),
+        )
+
+
+class ConditionalRetrieveMixin(ConditionalGetMixin):
+    def get_object_watermark(self, pk):
+        """Version of one object, or None when it does not exist"""
+        raise NotImplementedError
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        watermark = self.get_object_watermark(pk)
+        etag = None
+        if watermark is not None:
+            etag = self.get_etag(request, watermark)
+        return self.conditional_response(
+            request,
+            etag,
+            lambda: super(ConditionalRetrieveMixin, self).retrieve(
+                request, *args, **kwargs
+            ),
+        )
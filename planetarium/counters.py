@@ -0,0 +1,76 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from planetarium.models import ShowSession, Ticket
+
+
+def add_tickets_sold(show_session_ids, delta=1):
+    """Shift tickets_sold of sessions, one UPDATE per distinct session.
+
+    Accepts an iterable of show session ids with one entry per ticket.
+    Call it in the transaction that inserts or deletes the tickets.
+    The version of the sessions is bumped as well.
+    """
+    for show_session_id, count in Counter(show_session_ids).items():
+        ShowSession.objects.filter(pk=show_session_id).update(
+            tickets_sold=F("tickets_sold") + delta * count,
+            version=F("version") + 1,
+        )
+
+
+def bump_versions(show_session_ids):
+    """Mark the seat map of sessions as changed, see ShowSession.version"""
+    ShowSession.objects.filter(pk__in=set(show_session_ids)).update(
+        version=F("version") + 1
+    )
+
+
+def recount_tickets_sold(show_session_ids):
+    """Store the actual ticket count of sessions and bump their version.
+
+    For saves that bypass the counting signals, such as loaddata.
+    """
+    tickets = (
+        Ticket.objects.filter(show_session=OuterRef("pk"))
+        .order_by().values("show_session").annotate(count=Count("pk"))
+        .values("count")
+    )
+    ShowSession.objects.filter(pk__in=set(show_session_ids)).update(
+        tickets_sold=Coalesce(Subquery(tickets), 0),
+        version=F("version") + 1,
+    )
+
+
+def find_tickets_sold_drift():
+    """Return {show_session_id: (stored, actual)} for drifted counters"""
+    drifted = (
+        ShowSession.objects.annotate(actual=Count("tickets"))
+        .exclude(tickets_sold=F("actual"))
+        .values_list("id", "tickets_sold", "actual")
+    )
+    return {pk: (stored, actual) for pk, stored, actual in drifted}
+
+
+def reconcile_tickets_sold():
+    """Recount tickets of drifted sessions and store the actual value.
+
+    Each session row is locked before recounting, so tickets inserted
+    concurrently are either counted here or added by their own
+    transaction afterwards.
+    """
+    drift = find_tickets_sold_drift()
+    for show_session_id in drift:
+        with transaction.atomic():
+            ShowSession.objects.select_for_update().filter(
+                pk=show_session_id
+            ).exists()
+            actual = Ticket.objects.filter(
+                show_session_id=show_session_id
+            ).count()
+            ShowSession.objects.filter(pk=show_session_id).update(
+                tickets_sold=actual, version=F("version") + 1
+            )
+    return drift
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+from functools import cache
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+SEATS_TAKEN = "taken"
+SEATS_RELEASED = "released"
+RESYNC = {"type": "resync"}
+SEATS_PER_EVENT = 200
+
+
+class LocalHub:
+    """In-process fan-out of seat events to subscribed event loops.
+
+    publish() may be called from any thread, every subscriber queue is
+    fed on its own loop with call_soon_threadsafe. A subscriber that
+    falls queue_size events behind gets its backlog replaced by a
+    single RESYNC event, so it can send a fresh snapshot instead.
+    """
+
+    queue_size = 1000
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = defaultdict(set)
+
+    def subscribe(self, show_session_id):
+        queue = asyncio.Queue(self.queue_size)
+        subscriber = (asyncio.get_running_loop(), queue)
+        with self.lock:
+            self.subscribers[show_session_id].add(subscriber)
+        return queue
+
+    def unsubscribe(self, show_session_id, queue):
+        with self.lock:
+            subscribers = self.subscribers[show_session_id]
+            subscribers.difference_update(
+                [subscriber for subscriber in subscribers
+                 if subscriber[1] is queue]
+            )
+            if not subscribers:
+                del self.subscribers[show_session_id]
+
+    def publish(self, show_session_id, event):
+        self.deliver(show_session_id, event)
+
+    def deliver(self, show_session_id, event):
+        with self.lock:
+            subscribers = list(self.subscribers.get(show_session_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(put_event, queue, event)
+            except RuntimeError:
+                self.unsubscribe(show_session_id, queue)
+
+
+def put_event(queue, event):
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(RESYNC)
+
+
+class PostgresHub(LocalHub):
+    """Fan-out across processes with Postgres LISTEN/NOTIFY.
+
+    publish() sends a NOTIFY on the default database. Every process
+    that has subscribers runs one listener thread with its own
+    connection and hands the notifications to its local subscribers.
+    """
+
+    channel = "planetarium_seat_events"
+    poll_timeout = 5
+    reconnect_delay = 1
+
+    def __init__(self):
+        super().__init__()
+        self.listener = None
+
+    def publish(self, show_session_id, event):
+        payload = json.dumps({"show_session": show_session_id, **event})
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, payload])
+
+    def subscribe(self, show_session_id):
+        with self.lock:
+            if self.listener is None:
+                self.listener = threading.Thread(
+                    target=self.listen, name="seat-events", daemon=True
+                )
+                self.listener.start()
+        return super().subscribe(show_session_id)
+
+    def listen(self):
+        while True:
+            try:
+                self.listen_once()
+            except Exception:
+                logger.exception("Seat event listener failed, reconnecting")
+                time.sleep(self.reconnect_delay)
+
+    def listen_once(self):
+        from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+        database = connections[DEFAULT_DB_ALIAS]
+        # A connection of its own, never one taken from the pool
+        connection = database.Database.connect(
+            **database.get_connection_params()
+        )
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            notifies = (connection.notifies() if is_psycopg3
+                        else self.poll_notifies(connection))
+            for notify in notifies:
+                event = json.loads(notify.payload)
+                self.deliver(event.pop("show_session"), event)
+        finally:
+            connection.close()
+
+    def poll_notifies(self, connection):
+        """Notifications of a psycopg2 connection, as psycopg 3 yields them"""
+        while True:
+            if select.select([connection], [], [], self.poll_timeout)[0]:
+                connection.poll()
+                while connection.notifies:
+                    yield connection.notifies.pop(0)
+
+
+@cache
+def get_hub():
+    return import_string(settings.PLANETARIUM_SEAT_EVENT_HUB)()
+
+
+def publish_seats(event_type, seats):
+    """Publish (show_session_id, row, seat) keys grouped per session"""
+    grouped = defaultdict(list)
+    for show_session_id, row, seat in seats:
+        grouped[show_session_id].append({"row": row, "seat": seat})
+    hub = get_hub()
+    for show_session_id, session_seats in grouped.items():
+        for start in range(0, len(session_seats), SEATS_PER_EVENT):
+            hub.publish(show_session_id, {
+                "type": event_type,
+                "seats": session_seats[start:start + SEATS_PER_EVENT],
+            })
+
+
+def publish_seats_on_commit(event_type, seats):
+    """Publish seat changes once the current transaction commits"""
+    seats = list(seats)
+    if seats:
+        transaction.on_commit(
+            lambda: publish_seats(event_type, seats), robust=True
+        )
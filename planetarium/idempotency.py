@@ -0,0 +1,122 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+HEADER = "Idempotency-Key"
+PENDING = "pending"
+# A pending key outlives a request that crashed without releasing it
+PENDING_TIMEOUT = 60
+POLL_INTERVAL = 0.05
+
+IDEMPOTENCY_KEY_PARAMETER = OpenApiParameter(
+    HEADER,
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.HEADER,
+    description="Unique key of this request; retries with the same key "
+    "return the original response instead of creating again",
+)
+
+
+class IdempotencyConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "A request with this Idempotency-Key is in progress."
+    default_code = "idempotency_conflict"
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = (
+        "This Idempotency-Key was used with a different request."
+    )
+    default_code = "idempotency_key_reused"
+
+
+def idempotency_cache_key(user_id, path, key):
+    return "idempotency:" + hashlib.sha256(
+        f"{user_id}:{path}:{key}".encode()
+    ).hexdigest()
+
+
+def request_digest(request):
+    body = json.dumps(request.data, sort_keys=True, separators=(",", ":"),
+                      default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+class IdempotentCreateMixin:
+    """Idempotency-Key header support for create.
+
+    The first request with a key marks it pending in the cache, runs
+    and stores (digest of the request, status, response data) for
+    PLANETARIUM_IDEMPOTENCY_TTL seconds. Retries get that response
+    replayed with an Idempotent-Replayed header, and retries arriving
+    while the first request runs wait up to PLANETARIUM_IDEMPOTENCY_WAIT
+    seconds for it instead of creating again. Keys are per user and
+    path; failed requests are not stored, so they can be retried.
+    Other creating actions can use idempotent() the same way.
+    """
+
+    def create(self, request, *args, **kwargs):
+        return self.idempotent(
+            request,
+            lambda: super(IdempotentCreateMixin, self).create(
+                request, *args, **kwargs
+            ),
+        )
+
+    def idempotent(self, request, handler):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return handler()
+        if not key or len(key) > 255:
+            raise ValidationError(
+                {HEADER: "Use a non-empty key of up to 255 characters."}
+            )
+
+        cache_key = idempotency_cache_key(request.user.pk, request.path, key)
+        digest = request_digest(request)
+        while not cache.add(cache_key, (PENDING, digest), PENDING_TIMEOUT):
+            stored = self.wait_for_response(cache_key)
+            if stored is None:
+                # The first request failed, run this one instead
+                continue
+            stored_digest, status_code, data = stored
+            if stored_digest != digest:
+                raise IdempotencyKeyReused()
+            response = Response(data, status=status_code)
+            response["Idempotent-Replayed"] = "true"
+            return response
+
+        try:
+            response = handler()
+        except BaseException:
+            cache.delete(cache_key)
+            raise
+        if status.is_success(response.status_code):
+            cache.set(
+                cache_key,
+                (digest, response.status_code, response.data),
+                settings.PLANETARIUM_IDEMPOTENCY_TTL,
+            )
+        else:
+            cache.delete(cache_key)
+        return response
+
+    def wait_for_response(self, cache_key):
+        """Stored response of the key, None when it was released"""
+        deadline = time.monotonic() + settings.PLANETARIUM_IDEMPOTENCY_WAIT
+        while True:
+            stored = cache.get(cache_key)
+            if stored is None or stored[0] != PENDING:
+                return stored
+            if time.monotonic() >= deadline:
+                raise IdempotencyConflict()
+            time.sleep(POLL_INTERVAL)
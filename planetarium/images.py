@@ -0,0 +1,142 @@
+import pathlib
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from planetarium import cache, jobs
+from planetarium.models import AstronomyShow
+
+RENDITIONS = {
+    "thumbnail": (160, 90),
+    "card": (480, 270),
+    "hero": (1600, 900),
+}
+FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 6}),
+    "jpeg": ("JPEG", {"quality": 85, "optimize": True, "progressive": True}),
+}
+
+image_storage = AstronomyShow._meta.get_field("image").storage
+
+
+def rendition_name(source, rendition, extension):
+    """Deterministic storage path of one rendition of a source image"""
+    path = pathlib.PurePosixPath(source)
+    return str(path.parent / "renditions" / path.stem
+               / f"{rendition}.{extension}")
+
+
+def render(image, size, image_format, options):
+    rendition = ImageOps.fit(image, size, Image.Resampling.LANCZOS)
+    output = BytesIO()
+    rendition.save(output, image_format, **options)
+    return ContentFile(output.getvalue())
+
+
+def renditions_up_to_date(source, renditions):
+    if renditions.get("source") != source:
+        return False
+    return all(
+        rendition in renditions
+        and all(image_storage.exists(name)
+                for name in renditions[rendition].values())
+        for rendition in RENDITIONS
+    )
+
+
+def delete_renditions(renditions):
+    for rendition in RENDITIONS:
+        for name in renditions.get(rendition, {}).values():
+            image_storage.delete(name)
+
+
+def generate_renditions(astronomy_show_id, force=False):
+    """Create every rendition of the current image of an astronomy show.
+
+    Idempotent: renditions are written to paths derived from the source
+    name and nothing is done when they already exist for that source.
+    The map is stored only if the image did not change meanwhile.
+    Returns True when renditions were generated.
+    """
+    try:
+        show = AstronomyShow.objects.get(pk=astronomy_show_id)
+    except AstronomyShow.DoesNotExist:
+        return False
+    source = show.image.name
+    if not source:
+        return False
+    if not force and renditions_up_to_date(source, show.image_renditions):
+        return False
+
+    with image_storage.open(source) as file:
+        image = ImageOps.exif_transpose(Image.open(file))
+        image = image.convert("RGB")
+    renditions = {"source": source}
+    for rendition, size in RENDITIONS.items():
+        renditions[rendition] = {}
+        for extension, (image_format, options) in FORMATS.items():
+            name = rendition_name(source, rendition, extension)
+            image_storage.delete(name)
+            renditions[rendition][extension] = image_storage.save(
+                name, render(image, size, image_format, options)
+            )
+
+    updated = AstronomyShow.objects.filter(
+        pk=astronomy_show_id, image=source
+    ).update(image_renditions=renditions)
+    if not updated:
+        delete_renditions(renditions)
+        return False
+    if show.image_renditions.get("source") != source:
+        delete_renditions(show.image_renditions)
+    cache.invalidate("astronomyshow", astronomy_show_id)
+    return True
+
+
+def schedule_renditions(astronomy_show_id):
+    """Queue rendition generation, it runs in the run_worker command"""
+    jobs.enqueue("generate_image_renditions", unique=True,
+                 astronomy_show_id=astronomy_show_id)
+
+
+def url_builder(request=None):
+    """Function from a stored file name to its URL, absolute with request.
+
+    The scheme and host are resolved once, so building many URLs for
+    one response does not parse each of them again.
+    """
+    if request is None:
+        return image_storage.url
+    base = request.build_absolute_uri("/")[:-1]
+
+    def url(name):
+        url = image_storage.url(name)
+        if url.startswith("/") and not url.startswith("//"):
+            return base + url
+        return request.build_absolute_uri(url)
+
+    return url
+
+
+def rendition_urls(source, renditions, request=None, url=None):
+    """Map of rendition -> format -> URL, plus the original upload.
+
+    Renditions not generated yet for the current source are left out,
+    clients fall back to "original". Pass url from url_builder to reuse
+    it across many images.
+    """
+    if not source:
+        return None
+    if url is None:
+        url = url_builder(request)
+
+    urls = {"original": url(source)}
+    if renditions and renditions.get("source") == source:
+        for rendition in RENDITIONS:
+            if rendition in renditions:
+                urls[rendition] = {
+                    extension: url(name)
+                    for extension, name in renditions[rendition].items()
+                }
+    return urls
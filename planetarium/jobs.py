@@ -0,0 +1,252 @@
+import logging
+import os
+import socket
+import time
+import traceback
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from planetarium.models import Job
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class JobType:
+    name: str
+    func: Callable
+    max_attempts: int
+    backoff: int
+    concurrency: int | None
+    every: timedelta | None
+
+
+registry = {}
+
+
+def job(name=None, max_attempts=5, backoff=30, concurrency=None, every=None):
+    """Register a function as a background job.
+
+    backoff is the delay in seconds before the first retry, doubled for
+    every further attempt. concurrency caps how many jobs of this type
+    run at once across workers, every makes workers keep one run of the
+    job scheduled at that interval.
+    """
+
+    def decorator(func):
+        job_name = name or func.__name__
+        registry[job_name] = JobType(job_name, func, max_attempts, backoff,
+                                     concurrency, every)
+        return func
+
+    return decorator
+
+
+def enqueue(name, delay=None, unique=False, **kwargs):
+    """Queue a registered job in the current transaction.
+
+    The job becomes visible to workers when the transaction commits and
+    is dropped if it rolls back. With unique, nothing is queued while an
+    identical job is still waiting.
+    """
+    if name not in registry:
+        raise ValueError(f"Unknown job {name}")
+    if unique and Job.objects.filter(
+        name=name, kwargs=kwargs, status=Job.Status.QUEUED
+    ).exists():
+        return None
+    return Job.objects.create(
+        name=name,
+        kwargs=kwargs,
+        max_attempts=registry[name].max_attempts,
+        run_after=timezone.now() + (delay or timedelta()),
+    )
+
+
+def lock_job_types(names):
+    """Serialize claiming and scheduling of job types until commit.
+
+    Takes a PostgreSQL transaction advisory lock per type, in name order
+    so workers cannot deadlock. Other databases are not locked.
+    """
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        for name in sorted(names):
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))",
+                [f"planetarium.job:{name}"],
+            )
+
+
+def claim(worker_id, limit):
+    """Lock up to limit due jobs with SKIP LOCKED and mark them running.
+
+    Types with a concurrency cap are locked before their running jobs
+    are counted, so two workers cannot both take the last free slot.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        lock_job_types(
+            name for name, job_type in registry.items()
+            if job_type.concurrency is not None
+        )
+        running = Counter(dict(
+            Job.objects.filter(status=Job.Status.RUNNING)
+            .values_list("name")
+            .annotate(count=Count("id"))
+        ))
+        full = [
+            name for name, job_type in registry.items()
+            if job_type.concurrency is not None
+            and running[name] >= job_type.concurrency
+        ]
+        candidates = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.Status.QUEUED, run_after__lte=now,
+                    name__in=registry)
+            .exclude(name__in=full)[:limit]
+        )
+        jobs = []
+        for candidate in candidates:
+            cap = registry[candidate.name].concurrency
+            if cap is not None and running[candidate.name] >= cap:
+                continue
+            running[candidate.name] += 1
+            jobs.append(candidate)
+        Job.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            status=Job.Status.RUNNING,
+            locked_by=worker_id,
+            locked_at=now,
+            attempts=F("attempts") + 1,
+        )
+    for job in jobs:
+        job.status = Job.Status.RUNNING
+        job.attempts += 1
+    return jobs
+
+
+def retry_delay(job_type, attempts):
+    return timedelta(seconds=job_type.backoff * 2 ** (attempts - 1))
+
+
+def run_job(job):
+    """Run a claimed job, then mark it done, retried or failed"""
+    job_type = registry[job.name]
+    try:
+        job_type.func(**job.kwargs)
+    except Exception:
+        logger.exception("Job %s failed", job)
+        now = timezone.now()
+        if job.attempts < job.max_attempts:
+            changes = {
+                "status": Job.Status.QUEUED,
+                "run_after": now + retry_delay(job_type, job.attempts),
+            }
+        else:
+            changes = {"status": Job.Status.FAILED, "finished_at": now}
+        Job.objects.filter(pk=job.pk).update(
+            last_error=traceback.format_exc(), locked_by="", locked_at=None,
+            **changes,
+        )
+        return False
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.Status.DONE, finished_at=timezone.now(),
+        locked_by="", locked_at=None,
+    )
+    return True
+
+
+def requeue_stale(stale_after):
+    """Give jobs of crashed workers back to the queue, or fail them"""
+    stale = Job.objects.filter(
+        status=Job.Status.RUNNING,
+        locked_at__lt=timezone.now() - stale_after,
+    )
+    changes = {"locked_by": "", "locked_at": None,
+               "last_error": "Worker stopped while running the job"}
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.Status.FAILED, finished_at=timezone.now(), **changes
+    )
+    return failed + stale.update(status=Job.Status.QUEUED, **changes)
+
+
+def schedule_periodic():
+    """Queue a run of every periodic job type that has none pending"""
+    for job_type in registry.values():
+        if job_type.every is None:
+            continue
+        with transaction.atomic():
+            lock_job_types([job_type.name])
+            if not Job.objects.filter(
+                name=job_type.name,
+                status__in=[Job.Status.QUEUED, Job.Status.RUNNING],
+            ).exists():
+                enqueue(job_type.name, delay=job_type.every)
+
+
+class Worker:
+    """Claim due jobs and run them on up to concurrency threads.
+
+    With concurrency 1 jobs run in the calling thread.
+    """
+
+    maintenance_interval = 60
+
+    def __init__(self, concurrency=1, poll_interval=1.0):
+        self.id = f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.stopping = False
+        self.executor = None
+        if concurrency > 1:
+            self.executor = ThreadPoolExecutor(
+                concurrency, thread_name_prefix="planetarium-worker"
+            )
+
+    def stop(self, *args):
+        self.stopping = True
+
+    def maintain(self):
+        requeue_stale(settings.PLANETARIUM_JOB_STALE_AFTER)
+        schedule_periodic()
+
+    def run_in_thread(self, job):
+        try:
+            return run_job(job)
+        finally:
+            connection.close()
+
+    def run(self, once=False):
+        """Process jobs until stopped, or until none is due with once"""
+        running = set()
+        next_maintenance = 0
+        while not self.stopping:
+            if time.monotonic() >= next_maintenance:
+                self.maintain()
+                next_maintenance = time.monotonic() + self.maintenance_interval
+            jobs = claim(self.id, self.concurrency - len(running))
+            for job in jobs:
+                if self.executor is None:
+                    run_job(job)
+                else:
+                    running.add(self.executor.submit(self.run_in_thread, job))
+            if jobs:
+                continue
+            if running:
+                _, running = wait(running, timeout=self.poll_interval,
+                                  return_when=FIRST_COMPLETED)
+            elif once:
+                break
+            else:
+                time.sleep(self.poll_interval)
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
@@ -0,0 +1,164 @@
+import json
+import re
+from collections import Counter, defaultdict
+
+from django.core.management.color import no_style
+from django.core.serializers.python import Deserializer
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Q
+
+from planetarium import cache
+from planetarium.counters import reconcile_tickets_sold
+from planetarium.models import Ticket
+
+WHITESPACE = re.compile(r"[\s,]*")
+
+
+def iter_json_array(file, chunk_size=1 << 16):
+    """Yield the objects of a top-level JSON array, reading it in chunks"""
+    decoder = json.JSONDecoder()
+    buffer = file.read(chunk_size).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("Expected a JSON array")
+    position = 1
+    eof = False
+    while True:
+        position = WHITESPACE.match(buffer, position).end()
+        if buffer.startswith("]", position):
+            return
+        try:
+            item, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        if not isinstance(item, dict):
+            raise ValueError("Expected an array of objects")
+        yield item
+
+
+def dependency_order(models):
+    """Sort models so that every model follows the models it refers to"""
+    ordered = []
+    visiting = set()
+
+    def visit(model):
+        if model in ordered or model in visiting:
+            return
+        visiting.add(model)
+        for field in model._meta.concrete_fields:
+            related = field.related_model
+            if related in models and related is not model:
+                visit(related)
+        visiting.discard(model)
+        ordered.append(model)
+
+    for model in models:
+        visit(model)
+    return ordered
+
+
+def invalid_tickets():
+    """Tickets whose row or seat does not exist in their dome"""
+    dome = "show_session__planetarium_dome__"
+    return Ticket.objects.filter(
+        Q(row__lt=1)
+        | Q(seat__lt=1)
+        | Q(row__gt=F(f"{dome}rows"))
+        | Q(seat__gt=F(f"{dome}seats_in_row"))
+    )
+
+
+class Loader:
+    """Bulk insert serialized records grouped by model.
+
+    Records are buffered per model and written with bulk_create once a
+    buffer holds batch_size objects; the rest is written in dependency
+    order at the end. Django creates foreign keys as deferrable
+    constraints, so they are checked when the transaction commits and
+    an early batch may refer to rows inserted later.
+    """
+
+    def __init__(self, batch_size=5000):
+        self.batch_size = batch_size
+        self.buffers = defaultdict(list)
+        self.models = set()
+        self.counts = Counter()
+
+    def add(self, deserialized):
+        obj = deserialized.object
+        self.buffer(type(obj), obj)
+        for name, pks in (deserialized.m2m_data or {}).items():
+            field = obj._meta.get_field(name)
+            through = field.remote_field.through
+            source = field.m2m_field_name()
+            target = field.m2m_reverse_field_name()
+            for pk in pks:
+                self.buffer(through, through(**{
+                    f"{source}_id": obj.pk, f"{target}_id": pk
+                }))
+
+    def buffer(self, model, obj):
+        self.models.add(model)
+        self.buffers[model].append(obj)
+        if len(self.buffers[model]) >= self.batch_size:
+            self.flush(model)
+
+    def flush(self, model):
+        objects = self.buffers.pop(model, [])
+        if objects:
+            model.objects.bulk_create(objects, batch_size=self.batch_size)
+            self.counts[model._meta.label] += len(objects)
+
+    def finish(self):
+        for model in dependency_order(list(self.buffers)):
+            self.flush(model)
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(),
+                                                         self.models):
+                cursor.execute(sql)
+
+
+def load(files, batch_size=5000, exclude=()):
+    """Load fixture files in one transaction, return counts per model.
+
+    Raises ValueError when a ticket lies outside its dome or a record
+    clashes with a stored row, ex. on a rerun, nothing is stored then.
+    tickets_sold counters are recounted and the catalog cache is
+    invalidated afterwards.
+    """
+    exclude = {label.lower() for label in exclude}
+
+    def excluded(label):
+        return label in exclude or label.split(".")[0] in exclude
+
+    loader = Loader(batch_size)
+    try:
+        with transaction.atomic():
+            for file in files:
+                records = (
+                    record for record in iter_json_array(file)
+                    if not excluded(record["model"])
+                )
+                for deserialized in Deserializer(records):
+                    loader.add(deserialized)
+            loader.finish()
+            invalid = list(invalid_tickets().values_list("pk", flat=True)[:10])
+            if invalid:
+                raise ValueError(
+                    "Tickets outside their dome: "
+                    + ", ".join(map(str, invalid))
+                )
+            reconcile_tickets_sold()
+    except IntegrityError as error:
+        raise ValueError(
+            "Records clash with stored data, load into an empty database "
+            f"or use loaddata to update them: {error}"
+        ) from error
+    for model_name in ("showtheme", "astronomyshow", "planetariumdome"):
+        cache.invalidate(model_name)
+    return loader.counts
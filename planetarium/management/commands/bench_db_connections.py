@@ -0,0 +1,123 @@
+import json
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.utils import ConnectionHandler
+
+from planetarium_api.database import CONNECTION_MODES, database_config
+
+QUERY = "SELECT id, name FROM planetarium_showtheme ORDER BY id"
+
+
+def run_mode(mode, concurrency, duration):
+    """Serve small reads like /show-themes/ from threads for duration.
+
+    Every simulated request closes obsolete connections before and after
+    its query, as Django does on request_started and request_finished,
+    so each mode opens, keeps or pools connections like in production.
+    """
+    alias = f"bench_{mode}"
+    config = database_config(mode=mode)
+    # Pools are shared per alias, so the mode gets its own one
+    connections = ConnectionHandler({"default": config, alias: config})
+    latencies, errors = [], []
+    deadline = time.monotonic() + duration
+
+    def client():
+        conn = connections[alias]
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                conn.close_if_unusable_or_obsolete()
+                with conn.cursor() as cursor:
+                    cursor.execute(QUERY)
+                    cursor.fetchall()
+                conn.close_if_unusable_or_obsolete()
+            except Exception as exc:
+                errors.append(repr(exc))
+                conn.close()
+                continue
+            latencies.append(time.perf_counter() - started)
+        conn.close()
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if mode == "pool":
+        connections[alias].close_pool()
+
+    latencies.sort()
+
+    def percentile(fraction):
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1,
+                             int(len(latencies) * fraction))] * 1000
+
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "duration": duration,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "requests_per_second": len(latencies) / duration,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else None,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare req/s of small reads with a new connection per request, "
+        "persistent connections and psycopg's pool against the Postgres "
+        "database of the POSTGRES_* settings"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--mode",
+            action="append",
+            choices=CONNECTION_MODES,
+            help="Connection mode to measure, repeat for several "
+            "(default: all)",
+        )
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--duration", type=float, default=5,
+                            help="Seconds per mode")
+        parser.add_argument("--output", help="Write results as JSON here")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Needs the PostgreSQL database")
+
+        results = {
+            mode: run_mode(mode, options["concurrency"], options["duration"])
+            for mode in options["mode"] or CONNECTION_MODES
+        }
+
+        self.stdout.write(
+            f"{'mode':<12}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+            f"{'errors':>8}"
+        )
+        for mode, result in results.items():
+            self.stdout.write(
+                f"{mode:<12}{result['requests_per_second']:>10.1f}"
+                + "".join(
+                    f"{result[key]:>10.2f}" if result[key] is not None
+                    else f"{'-':>10}"
+                    for key in ("p50_ms", "p95_ms")
+                )
+                + f"{result['errors']:>8}"
+            )
+            if result["first_error"]:
+                self.stderr.write(f"{mode}: {result['first_error']}")
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(results, output, indent=2)
@@ -0,0 +1,79 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from planetarium import benchmarks
+from planetarium.seeding import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Time every API endpoint at p50/p95 and count its SQL queries "
+        "against its budget. Writes benchmark users and objects, run it "
+        "on a scratch database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            metavar="TICKETS",
+            help="Insert a synthetic data set with this many tickets first "
+            "(ex. 100000)",
+        )
+        parser.add_argument("--iterations", type=int, default=50,
+                            help="Requests per endpoint")
+        parser.add_argument(
+            "--endpoint",
+            action="append",
+            metavar="NAME",
+            help="Only measure this endpoint, repeat for more",
+        )
+        parser.add_argument("--output", help="Write results as JSON here")
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            seed(options["seed"])
+        endpoints = benchmarks.ENDPOINTS
+        if options["endpoint"]:
+            known = {endpoint.name for endpoint in endpoints}
+            unknown = set(options["endpoint"]) - known
+            if unknown:
+                raise CommandError(
+                    f"Unknown endpoints: {', '.join(sorted(unknown))}"
+                )
+            endpoints = [endpoint for endpoint in endpoints
+                         if endpoint.name in options["endpoint"]]
+
+        results = benchmarks.run(options["iterations"], endpoints)
+
+        self.stdout.write(
+            f"{'endpoint':<32}{'status':>8}{'p50 ms':>10}{'p95 ms':>10}"
+            f"{'queries':>9}{'budget':>8}"
+        )
+        for result in results:
+            line = (
+                f"{result['endpoint']:<32}"
+                f"{','.join(map(str, result['statuses'])):>8}"
+                f"{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}"
+                f"{result['queries']:>9}{result['budget']:>8}"
+            )
+            if result["queries"] > result["budget"]:
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump({
+                    "created_at": timezone.now().isoformat(),
+                    "database": connection.vendor,
+                    "iterations": options["iterations"],
+                    "results": results,
+                }, output, indent=2)
+
+        over = [result["endpoint"] for result in results
+                if result["queries"] > result["budget"]]
+        if over:
+            raise CommandError(f"Over query budget: {', '.join(over)}")
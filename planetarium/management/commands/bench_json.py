@@ -0,0 +1,113 @@
+import json
+import time
+from io import BytesIO
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from planetarium import read_models
+from planetarium.models import Reservation, ShowSession, Ticket
+from planetarium.parsers import FastJSONParser
+from planetarium.renderers import FastJSONRenderer, orjson
+from planetarium.seeding import seed
+from planetarium.serializers import ReservationListSerializer
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare JSONRenderer/JSONParser with FastJSONRenderer/"
+        "FastJSONParser on the largest list payloads"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            metavar="TICKETS",
+            help="Insert a synthetic data set with this many tickets first",
+        )
+        parser.add_argument("--rows", type=int, default=1000,
+                            help="Objects per payload")
+        parser.add_argument("--repeat", type=int, default=5,
+                            help="Runs per measurement, the best one counts")
+        parser.add_argument("--output", help="Write results as JSON here")
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            seed(options["seed"], tickets_per_reservation=10)
+        rows = options["rows"]
+        request = APIRequestFactory().get("/")
+        payloads = {
+            "reservations": ReservationListSerializer(
+                Reservation.objects.prefetch_related(
+                    "tickets__show_session__astronomy_show",
+                    "tickets__show_session__planetarium_dome",
+                ).order_by("id")[:rows],
+                many=True,
+                context={"request": request},
+            ).data,
+            "show sessions": read_models.show_session_list_items(
+                read_models.show_session_list_values(
+                    ShowSession.objects.order_by("id")
+                )[:rows],
+                request,
+            ),
+            "tickets": read_models.ticket_list_items(
+                read_models.ticket_list_values(Ticket.objects.all())[:rows],
+                request,
+            ),
+        }
+        if not any(payloads.values()):
+            raise CommandError("No data, use --seed")
+
+        repeat = options["repeat"]
+        results = {}
+        for name, data in payloads.items():
+            body = JSONRenderer().render(data)
+            results[name] = {
+                "objects": len(data),
+                "bytes": len(body),
+                "render_ms": best_of(
+                    repeat, lambda: JSONRenderer().render(data)
+                ),
+                "fast_render_ms": best_of(
+                    repeat, lambda: FastJSONRenderer().render(data)
+                ),
+                "parse_ms": best_of(
+                    repeat, lambda: JSONParser().parse(BytesIO(body))
+                ),
+                "fast_parse_ms": best_of(
+                    repeat, lambda: FastJSONParser().parse(BytesIO(body))
+                ),
+            }
+
+        self.stdout.write(
+            f"JSON backend: {'orjson' if orjson else 'json (stdlib)'}"
+        )
+        self.stdout.write(
+            f"{'payload':<15}{'KiB':>8}{'render ms':>11}{'fast':>8}"
+            f"{'parse ms':>10}{'fast':>8}"
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<15}{result['bytes'] / 1024:>8.0f}"
+                f"{result['render_ms']:>11.2f}"
+                f"{result['fast_render_ms']:>8.2f}"
+                f"{result['parse_ms']:>10.2f}"
+                f"{result['fast_parse_ms']:>8.2f}"
+            )
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(results, output, indent=2)
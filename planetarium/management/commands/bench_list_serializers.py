@@ -0,0 +1,122 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory
+
+from planetarium import read_models
+from planetarium.models import AstronomyShow, ShowSession
+from planetarium.seatmap import tickets_available
+from planetarium.seeding import seed
+from planetarium.serializers import (
+    AstronomyShowListSerializer,
+    ShowSessionListSerializer,
+)
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare DRF list serializers with the values() read models of "
+        "show sessions and astronomy shows on one large page"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            metavar="TICKETS",
+            help="Insert a synthetic data set with this many tickets first",
+        )
+        parser.add_argument("--rows", type=int, default=1000,
+                            help="Rows per page")
+        parser.add_argument("--repeat", type=int, default=5,
+                            help="Runs per measurement, the best one counts")
+        parser.add_argument("--output", help="Write results as JSON here")
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            seed(options["seed"])
+        rows = options["rows"]
+        request = APIRequestFactory().get("/")
+        context = {"request": request}
+        cases = {
+            "show sessions": (
+                ShowSessionListSerializer,
+                ShowSession.objects.select_related(
+                    "astronomy_show", "planetarium_dome"
+                ).annotate(tickets_available=tickets_available())
+                .order_by("id")[:rows],
+                read_models.show_session_list_values(
+                    ShowSession.objects.order_by("id")
+                )[:rows],
+                read_models.show_session_list_items,
+            ),
+            "astronomy shows": (
+                AstronomyShowListSerializer,
+                AstronomyShow.objects.prefetch_related("themes")
+                .order_by("id")[:rows],
+                read_models.astronomy_show_list_values(
+                    AstronomyShow.objects.order_by("id")
+                )[:rows],
+                read_models.astronomy_show_list_items,
+            ),
+        }
+
+        results = {}
+        for name, (serializer_class, queryset, values, items) in (
+            cases.items()
+        ):
+            instances = list(queryset.all())
+            page = list(values.all())
+            results[name] = {
+                "rows": len(page),
+                "serializer_ms": best_of(
+                    options["repeat"],
+                    lambda: serializer_class(
+                        list(queryset.all()), many=True, context=context
+                    ).data,
+                ),
+                "read_model_ms": best_of(
+                    options["repeat"],
+                    lambda: items(values.all(), request),
+                ),
+                "serializer_render_ms": best_of(
+                    options["repeat"],
+                    lambda: serializer_class(
+                        instances, many=True, context=context
+                    ).data,
+                ),
+                "read_model_render_ms": best_of(
+                    options["repeat"], lambda: items(page, request)
+                ),
+            }
+
+        self.stdout.write(
+            f"{'list':<18}{'rows':>6}{'DRF ms':>10}{'values ms':>11}"
+            f"{'speedup':>9}{'render only':>13}"
+        )
+        for name, result in results.items():
+            total = result["serializer_ms"] / max(result["read_model_ms"],
+                                                  1e-9)
+            render = result["serializer_render_ms"] / max(
+                result["read_model_render_ms"], 1e-9
+            )
+            self.stdout.write(
+                f"{name:<18}{result['rows']:>6}"
+                f"{result['serializer_ms']:>10.1f}"
+                f"{result['read_model_ms']:>11.1f}"
+                f"{total:>8.1f}x{render:>12.1f}x"
+            )
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(results, output, indent=2)
@@ -0,0 +1,90 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from planetarium.models import ShowSession, Reservation
+from planetarium.seeding import seed
+from planetarium.views import show_time_on
+
+NEW_INDEXES = (
+    "showsession_show_time_id_idx",
+    "reservation_user_created_idx",
+)
+
+
+def explain(queryset):
+    if connection.vendor == "postgresql":
+        return queryset.explain(analyze=True, buffers=True)
+    return queryset.explain()
+
+
+class Command(BaseCommand):
+    help = (
+        "Print query plans of the show session date filter and the "
+        "reservation list before and after the filter path indexes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            metavar="TICKETS",
+            help="Insert a synthetic data set with this many tickets first "
+            "(ex. 1000000)",
+        )
+        parser.add_argument(
+            "--date",
+            type=lambda value: datetime.strptime(value, "%Y-%m-%d").date(),
+            default=None,
+            help="Show date to filter on, defaults to today",
+        )
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            created = seed(options["seed"])
+            self.stdout.write(
+                "Seeded " + ", ".join(
+                    f"{count} {name}" for name, count in created.items()
+                )
+            )
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+        date = options["date"] or timezone.localdate()
+        reservation = Reservation.objects.order_by("-id").first()
+        user_id = reservation.user_id if reservation else 0
+        queries = {
+            "show sessions by date": (
+                ShowSession.objects.filter(show_time__date=date).order_by("id"),
+                ShowSession.objects.filter(**show_time_on(date)).order_by(
+                    "show_time", "id"
+                ),
+            ),
+            "reservations of a user": (
+                Reservation.objects.filter(user_id=user_id).order_by(
+                    "-created_at"
+                )[:5],
+            ) * 2,
+        }
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for name in NEW_INDEXES:
+                    cursor.execute(
+                        f"DROP INDEX {connection.ops.quote_name(name)}"
+                    )
+            before = {
+                title: explain(pair[0]) for title, pair in queries.items()
+            }
+            transaction.set_rollback(True)
+        after = {title: explain(pair[1]) for title, pair in queries.items()}
+
+        for title in queries:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{title}: before"))
+            self.stdout.write(before[title])
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{title}: after"))
+            self.stdout.write(after[title])
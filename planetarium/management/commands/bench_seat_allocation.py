@@ -0,0 +1,86 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from planetarium.allocation import PREFERENCES, allocate
+from planetarium.seatmap import SeatMap
+
+DOMES = ((30, 40), (100, 100), (200, 250))
+
+
+def random_seat_map(rows, seats_in_row, occupancy, rng):
+    seat_map = SeatMap(rows, seats_in_row)
+    for row in range(1, rows + 1):
+        for seat in range(1, seats_in_row + 1):
+            if rng.random() < occupancy:
+                seat_map.take(row, seat)
+    return seat_map
+
+
+class Command(BaseCommand):
+    help = (
+        "Time best-available seat allocation on randomly occupied seat "
+        "maps of small to very large domes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dome",
+            action="append",
+            metavar="ROWSxSEATS",
+            help="Dome size, repeat for several (default: 30x40, 100x100 "
+            "and 200x250)",
+        )
+        parser.add_argument("--occupancy", type=float, action="append",
+                            help="Share of taken seats (default: 0.5, 0.95)")
+        parser.add_argument("--count", type=int, default=4)
+        parser.add_argument("--repeat", type=int, default=200)
+        parser.add_argument("--output", help="Write results as JSON here")
+
+    def handle(self, *args, **options):
+        domes = [
+            tuple(int(size) for size in dome.lower().split("x"))
+            for dome in options["dome"] or []
+        ] or DOMES
+        rng = random.Random(0)
+        results = []
+        for rows, seats_in_row in domes:
+            for occupancy in options["occupancy"] or (0.5, 0.95):
+                seat_map = random_seat_map(rows, seats_in_row, occupancy, rng)
+                for prefer in PREFERENCES:
+                    for together in (True, False):
+                        timings = []
+                        for _ in range(options["repeat"]):
+                            started = time.perf_counter()
+                            seats = allocate(seat_map, options["count"],
+                                             prefer, together)
+                            timings.append(
+                                (time.perf_counter() - started) * 1e6
+                            )
+                        timings.sort()
+                        results.append({
+                            "dome": f"{rows}x{seats_in_row}",
+                            "occupancy": occupancy,
+                            "prefer": prefer,
+                            "together": together,
+                            "found": seats is not None,
+                            "p50_us": timings[len(timings) // 2],
+                            "p95_us": timings[int(len(timings) * 0.95)],
+                        })
+
+        self.stdout.write(
+            f"{'dome':<10}{'taken':>7}{'prefer':>8}{'together':>10}"
+            f"{'found':>7}{'p50 us':>10}{'p95 us':>10}"
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result['dome']:<10}{result['occupancy']:>7.0%}"
+                f"{result['prefer']:>8}{str(result['together']):>10}"
+                f"{str(result['found']):>7}"
+                f"{result['p50_us']:>10.1f}{result['p95_us']:>10.1f}"
+            )
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(results, output, indent=2)
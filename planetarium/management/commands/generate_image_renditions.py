@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from planetarium.images import generate_renditions
+from planetarium.models import AstronomyShow
+
+
+class Command(BaseCommand):
+    help = "Create missing image renditions of astronomy shows"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Render again even if renditions are up to date",
+        )
+
+    def handle(self, *args, **options):
+        ids = AstronomyShow.objects.exclude(image="").exclude(
+            image__isnull=True
+        ).values_list("id", flat=True)
+        generated = sum(
+            generate_renditions(astronomy_show_id, force=options["force"])
+            for astronomy_show_id in ids.iterator()
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Generated renditions of {generated} images.")
+        )
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from planetarium.loading import load
+from planetarium.seeding import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Load fixture files with bulk inserts, or generate a synthetic "
+        "data set with --generate"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("fixtures", nargs="*",
+                            help="JSON fixture files, ex. db_data.json")
+        parser.add_argument(
+            "--generate",
+            type=int,
+            metavar="N",
+            help="Insert a synthetic data set with N tickets instead",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--exclude",
+            action="append",
+            default=[],
+            metavar="APP_LABEL[.ModelName]",
+            help="Skip records of an app or a model, can be repeated",
+        )
+
+    def handle(self, *args, **options):
+        if options["generate"]:
+            counts = seed(options["generate"],
+                          batch_size=options["batch_size"])
+        elif options["fixtures"]:
+            try:
+                files = [open(path, encoding="utf-8")
+                         for path in options["fixtures"]]
+            except OSError as error:
+                raise CommandError(error)
+            try:
+                counts = load(files, options["batch_size"],
+                              set(options["exclude"]))
+            except ValueError as error:
+                raise CommandError(error)
+            finally:
+                for file in files:
+                    file.close()
+        else:
+            raise CommandError("Give fixture files or --generate N")
+
+        for label, count in counts.items():
+            self.stdout.write(f"{label}: {count}")
+        self.stdout.write(self.style.SUCCESS("Data loaded."))
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+async def read_response(reader):
+    """Read one HTTP/1.1 response, return (status, keep_alive)"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed")
+    status = int(status_line.split()[1])
+    headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if headers.get("transfer-encoding") == "chunked":
+        while size := int((await reader.readline()).split(b";")[0], 16):
+            await reader.readexactly(size + 2)
+        await reader.readline()
+    else:
+        await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers.get("connection") != "close"
+
+
+async def client(url, token, deadline, latencies, errors):
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+        + (f"Authorization: Bearer {token}\r\n" if token else "")
+        + "Connection: keep-alive\r\n\r\n"
+    ).encode()
+    loop = asyncio.get_running_loop()
+    writer = None
+    while loop.time() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(
+                    parts.hostname, port, ssl=parts.scheme == "https"
+                )
+            started = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status, keep_alive = await read_response(reader)
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors.append(status)
+            if not keep_alive:
+                writer.close()
+                writer = None
+        except (OSError, ConnectionError, asyncio.IncompleteReadError):
+            errors.append("connection")
+            writer = None
+            await asyncio.sleep(0.01)
+    if writer is not None:
+        writer.close()
+
+
+async def run_target(url, token, concurrency, duration):
+    latencies, errors = [], []
+    deadline = asyncio.get_running_loop().time() + duration
+    await asyncio.gather(*(
+        client(url, token, deadline, latencies, errors)
+        for _ in range(concurrency)
+    ))
+    latencies.sort()
+
+    def percentile(fraction):
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1,
+                             int(len(latencies) * fraction))] * 1000
+
+    return {
+        "url": url,
+        "concurrency": concurrency,
+        "duration": duration,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_second": len(latencies) / duration,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else None,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test running servers with keep-alive connections, ex. "
+        "gunicorn (WSGI) against uvicorn (ASGI) with the same number of "
+        "workers, and compare their throughput and latency"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            action="append",
+            required=True,
+            metavar="NAME=URL",
+            help="Named URL to load, repeat to compare servers",
+        )
+        parser.add_argument("--concurrency", type=int, default=100)
+        parser.add_argument("--duration", type=float, default=10,
+                            help="Seconds per target")
+        parser.add_argument("--token", help="JWT access token to send")
+        parser.add_argument(
+            "--user",
+            metavar="EMAIL",
+            help="Mint an access token for this user instead of --token",
+        )
+        parser.add_argument("--output", help="Write results as JSON here")
+
+    def handle(self, *args, **options):
+        token = options["token"]
+        if options["user"]:
+            try:
+                user = get_user_model().objects.get(email=options["user"])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"No user {options['user']}")
+            token = str(AccessToken.for_user(user))
+
+        results = {}
+        for target in options["target"]:
+            name, _, url = target.partition("=")
+            if not url:
+                raise CommandError(f"Use NAME=URL, got {target}")
+            results[name] = asyncio.run(run_target(
+                url, token, options["concurrency"], options["duration"]
+            ))
+
+        self.stdout.write(
+            f"{'target':<12}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+            f"{'p99 ms':>10}{'errors':>8}"
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<12}{result['requests_per_second']:>10.1f}"
+                + "".join(
+                    f"{result[key]:>10.1f}" if result[key] is not None
+                    else f"{'-':>10}"
+                    for key in ("p50_ms", "p95_ms", "p99_ms")
+                )
+                + f"{result['errors']:>8}"
+            )
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(results, output, indent=2)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from planetarium.booking import purge_expired_holds
+
+
+class Command(BaseCommand):
+    help = "Delete expired seat holds"
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_holds()
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} expired seat holds.")
+        )
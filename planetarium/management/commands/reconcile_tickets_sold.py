@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from planetarium.counters import find_tickets_sold_drift, reconcile_tickets_sold
+
+
+class Command(BaseCommand):
+    help = "Check ShowSession.tickets_sold against actual tickets and repair drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report drifted sessions, do not repair them",
+        )
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            drift = find_tickets_sold_drift()
+        else:
+            drift = reconcile_tickets_sold()
+
+        for show_session_id, (stored, actual) in sorted(drift.items()):
+            self.stdout.write(
+                f"Show session {show_session_id}: "
+                f"tickets_sold {stored}, actual {actual}"
+            )
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("All counters are in sync."))
+        elif options["dry_run"]:
+            self.stdout.write(
+                self.style.WARNING(f"{len(drift)} counters drifted.")
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"Repaired {len(drift)} counters.")
+            )
@@ -0,0 +1,44 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from planetarium.jobs import Worker, registry
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs until stopped"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=2,
+            help="Number of jobs run at once by this worker",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when no job is due",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once no job is due instead of waiting for more",
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(options["concurrency"], options["poll_interval"])
+        handlers = {
+            signum: signal.signal(signum, worker.stop)
+            for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+        self.stdout.write(
+            f"Worker {worker.id} running {', '.join(sorted(registry))}"
+        )
+        try:
+            worker.run(once=options["once"])
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+        self.stdout.write(self.style.SUCCESS("Worker stopped."))
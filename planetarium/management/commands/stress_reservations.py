@@ -0,0 +1,189 @@
+import json
+import random
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import serializers
+
+from planetarium.booking import RESERVATION_LOCKING
+from planetarium.models import (
+    AstronomyShow,
+    PlanetariumDome,
+    ShowSession,
+    Ticket,
+)
+from planetarium.serializers import ReservationCreateSerializer
+
+
+def buyer_requests(buyers, tickets, rows, seats_in_row, hot_seats, rng):
+    """Adjacent seats for every buyer, all within the first hot_seats"""
+    requests = []
+    for _ in range(buyers):
+        start = rng.randrange(hot_seats - tickets + 1)
+        row, seat = divmod(start, seats_in_row)
+        # Keep a buyer's seats within one row
+        seat = min(seat, seats_in_row - tickets)
+        requests.append([
+            {"row": row + 1, "seat": seat + 1 + offset}
+            for offset in range(tickets)
+        ])
+    return requests
+
+
+def run_burst(strategy, buyers=500, concurrency=50, tickets=2,
+              rows=20, seats_in_row=30, hot_seats=60, seed=0):
+    """Let buyers reserve seats of one new show session all at once.
+
+    Every buyer is its own user and posts one reservation through
+    ReservationCreateSerializer, as the API does, from a pool of
+    concurrency threads with their own database connections. The
+    requested seats are drawn from the first hot_seats seats, so most
+    buyers compete for the same seats. Returns the counts of bookings,
+    conflicts (seats reported as taken) and errors, bookings per second
+    and the seats sold more than once, which must be empty.
+    """
+    if not tickets <= min(seats_in_row, hot_seats) <= rows * seats_in_row:
+        raise ValueError("tickets, hot_seats and the dome do not fit")
+    tag = uuid.uuid4().hex[:8]
+    show_session = ShowSession.objects.create(
+        astronomy_show=AstronomyShow.objects.create(
+            title=f"Stress {tag}", description="Reservation stress test"
+        ),
+        planetarium_dome=PlanetariumDome.objects.create(
+            name=f"Stress {tag}", rows=rows, seats_in_row=seats_in_row
+        ),
+        show_time=timezone.now() + timedelta(days=1),
+    )
+    password = make_password(None)
+    users = get_user_model().objects.bulk_create(
+        get_user_model()(email=f"stress-{tag}-{number}@example.com",
+                         password=password)
+        for number in range(buyers)
+    )
+    requests = buyer_requests(buyers, tickets, rows, seats_in_row,
+                              hot_seats, random.Random(seed))
+
+    def buy(user, seats):
+        started = time.perf_counter()
+        serializer = ReservationCreateSerializer(
+            data={"tickets": [
+                {"show_session": show_session.id, **seat} for seat in seats
+            ]},
+            context={"request": SimpleNamespace(user=user)},
+        )
+        try:
+            serializer.is_valid(raise_exception=True)
+            serializer.save(user=user)
+            outcome = "bookings"
+        except serializers.ValidationError:
+            outcome = "conflicts"
+        except DatabaseError as exc:
+            outcome = repr(exc)
+        finally:
+            connection.close()
+        return outcome, time.perf_counter() - started
+
+    with override_settings(PLANETARIUM_RESERVATION_LOCKING=strategy):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            outcomes = list(executor.map(buy, users, requests))
+        elapsed = time.perf_counter() - started
+
+    counts = {"bookings": 0, "conflicts": 0}
+    errors = []
+    for outcome, _ in outcomes:
+        if outcome in counts:
+            counts[outcome] += 1
+        else:
+            errors.append(outcome)
+    latencies = sorted(latency for _, latency in outcomes)
+    sold = Counter(
+        Ticket.objects.filter(show_session=show_session)
+        .values_list("row", "seat")
+    )
+    show_session.refresh_from_db()
+    return {
+        "strategy": strategy,
+        "buyers": buyers,
+        "concurrency": concurrency,
+        **counts,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "seconds": elapsed,
+        "bookings_per_second": counts["bookings"] / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000,
+        "tickets_sold": show_session.tickets_sold,
+        "double_booked": sorted(
+            seat for seat, count in sold.items() if count > 1
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Burst concurrent buyers at one show session and compare "
+        "successful bookings per second of the reservation locking "
+        "strategies. Writes to the PostgreSQL database of the POSTGRES_* "
+        "settings, use a scratch database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--strategy",
+            action="append",
+            choices=RESERVATION_LOCKING,
+            help="Locking strategy to measure, repeat for several "
+            "(default: all)",
+        )
+        parser.add_argument("--buyers", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--tickets", type=int, default=2,
+                            help="Seats per reservation")
+        parser.add_argument("--hot-seats", type=int, default=60,
+                            help="Seats the buyers compete for")
+        parser.add_argument("--output", help="Write results as JSON here")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Needs the PostgreSQL database")
+
+        results = [
+            run_burst(strategy, options["buyers"], options["concurrency"],
+                      options["tickets"], hot_seats=options["hot_seats"])
+            for strategy in options["strategy"] or RESERVATION_LOCKING
+        ]
+
+        self.stdout.write(
+            f"{'strategy':<12}{'booked':>8}{'conflicts':>11}{'errors':>8}"
+            f"{'booked/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result['strategy']:<12}{result['bookings']:>8}"
+                f"{result['conflicts']:>11}{result['errors']:>8}"
+                f"{result['bookings_per_second']:>10.1f}"
+                f"{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+            )
+            if result["first_error"]:
+                self.stderr.write(
+                    f"{result['strategy']}: {result['first_error']}"
+                )
+            if result["double_booked"]:
+                self.stderr.write(
+                    f"{result['strategy']}: seats sold twice "
+                    f"{result['double_booked']}"
+                )
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(results, output, indent=2)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-17 06:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("planetarium", "0009_seathold"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="showsession",
+            name="version",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
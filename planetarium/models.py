@@ -1,8 +1,9 @@
 import pathlib
 import uuid
 
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from django.utils import timezone
 from django.utils.text import slugify
 
 
@@ -27,6 +28,8 @@ class AstronomyShow(models.Model):
                                     blank=True,)
     image = models.ImageField(upload_to=astronomy_show_image_path,
                               null=True, blank=True)
+    image_renditions = models.JSONField(default=dict, blank=True,
+                                        editable=False)
 
     def __str__(self):
         return self.title
@@ -46,6 +49,34 @@ class ShowSession(models.Model):
     planetarium_dome = models.ForeignKey(PlanetariumDome,
                                          on_delete=models.CASCADE)
     show_time = models.DateTimeField()
+    tickets_sold = models.PositiveIntegerField(default=0, editable=False)
+    version = models.PositiveIntegerField(default=0, editable=False)
+
+    COUNTER_FIELDS = ("tickets_sold", "version")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["show_time", "id"],
+                         name="showsession_show_time_id_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        """Save without overwriting counters kept by atomic UPDATEs.
+
+        tickets_sold and version change concurrently with edits of the
+        session, so updates never write them back and bump version.
+        """
+        if self._state.adding or kwargs.get("update_fields") is not None:
+            return super().save(*args, **kwargs)
+        kwargs["update_fields"] = [
+            field.name for field in self._meta.concrete_fields
+            if not field.primary_key and field.name not in self.COUNTER_FIELDS
+        ]
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            ShowSession.objects.filter(pk=self.pk).update(
+                version=models.F("version") + 1
+            )
 
     def __str__(self):
         return f"{self.astronomy_show.title} at {self.show_time}"
@@ -56,6 +87,12 @@ class Reservation(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL,
                              on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "created_at"],
+                         name="reservation_user_created_idx"),
+        ]
+
     def __str__(self):
         return f"Reservation {self.id} by {self.user.get_username()}"
 
@@ -103,7 +140,82 @@ class Ticket(models.Model):
 
     def save(self, *args, **kwargs):
         self.full_clean()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.show_session} (Row: {self.row}, Seat: {self.seat})"
+
+
+class SeatHoldQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(expires_at__gt=timezone.now())
+
+    def expired(self):
+        return self.filter(expires_at__lte=timezone.now())
+
+
+class SeatHold(models.Model):
+    """A seat kept for one user until expires_at, then free again"""
+
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    show_session = models.ForeignKey(ShowSession,
+                                     on_delete=models.CASCADE,
+                                     related_name="seat_holds")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL,
+                             on_delete=models.CASCADE,
+                             related_name="seat_holds")
+    expires_at = models.DateTimeField()
+
+    objects = SeatHoldQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["show_session", "row", "seat"],
+                name="unique_seat_hold_session"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["expires_at"],
+                         name="seathold_expires_at_idx"),
+        ]
+        ordering = ["row", "seat", "show_session"]
+
+    def __str__(self):
+        return (f"{self.show_session} (Row: {self.row}, Seat: {self.seat}) "
+                f"held until {self.expires_at}")
+
+
+class Job(models.Model):
+    """A unit of background work run by the run_worker command"""
+
+    class Status(models.TextChoices):
+        QUEUED = "queued"
+        RUNNING = "running"
+        DONE = "done"
+        FAILED = "failed"
+
+    name = models.CharField(max_length=100)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices,
+                              default=Status.QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_after"],
+                         name="job_status_run_after_idx"),
+        ]
+        ordering = ["run_after", "id"]
+
+    def __str__(self):
+        return f"{self.name} #{self.id} ({self.status})"
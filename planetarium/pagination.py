@@ -0,0 +1,56 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """Cursor pagination with a flat cost per page and no total count"""
+
+    page_size_query_param = "limit"
+    max_page_size = 100
+
+
+class ShowSessionCursorPagination(KeysetPagination):
+    ordering = ("show_time", "id")
+
+
+class TicketCursorPagination(KeysetPagination):
+    ordering = ("id",)
+
+
+class ReservationCursorPagination(KeysetPagination):
+    ordering = ("-created_at", "id")
+
+
+class SelectablePaginationMixin:
+    """Let clients choose offset or cursor pagination.
+
+    Views set cursor_pagination_class to support keyset pagination and
+    default_pagination to pick what clients get without asking. A request
+    chooses with ?pagination=offset|cursor; following a cursor link also
+    keeps cursor pagination.
+    """
+
+    cursor_pagination_class = None
+    default_pagination = "offset"
+
+    def get_pagination_mode(self):
+        query_params = self.request.query_params
+        if "cursor" in query_params:
+            return "cursor"
+        mode = query_params.get("pagination", self.default_pagination)
+        if mode not in ("offset", "cursor"):
+            raise ValidationError({"pagination": "Use offset or cursor"})
+        return mode
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            if (
+                self.cursor_pagination_class is not None
+                and getattr(self, "request", None) is not None
+                and self.get_pagination_mode() == "cursor"
+            ):
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
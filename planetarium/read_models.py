@@ -0,0 +1,218 @@
+from collections import defaultdict
+from operator import itemgetter
+
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.response import Response
+
+from planetarium.images import rendition_urls, url_builder
+from planetarium.models import ShowSession, ShowTheme
+from planetarium.seatmap import tickets_available
+from planetarium.serializers import (
+    AstronomyShowListSerializer,
+    ShowSessionListSerializer,
+    TicketListSerializer,
+)
+
+
+def format_datetime(value):
+    """Same output as rest_framework.fields.DateTimeField"""
+    if not value:
+        return None
+    value = timezone.localtime(value).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def row_serializer(fields, **getters):
+    """Compile a function building one output dict from a values() row.
+
+    fields is the Meta.fields of the serializer the output mirrors, so
+    keys come out in its order. Fields without a getter are copied from
+    the row key of the same name.
+    """
+    unknown = set(getters) - set(fields)
+    if unknown:
+        raise ValueError(f"Getters for unknown fields: {sorted(unknown)}")
+    compiled = [
+        (field, getters.get(field) or itemgetter(field)) for field in fields
+    ]
+
+    def serialize(row):
+        return {field: get(row) for field, get in compiled}
+
+    return serialize
+
+
+def show_session_list_values(queryset):
+    """values() rows with everything ShowSessionListSerializer renders"""
+    return queryset.annotate(
+        tickets_available=tickets_available()
+    ).values(
+        "id",
+        "show_time",
+        "tickets_available",
+        astronomy_show_title=F("astronomy_show__title"),
+        astronomy_show_image=F("astronomy_show__image"),
+        astronomy_show_image_renditions=F("astronomy_show__image_renditions"),
+        planetarium_dome_name=F("planetarium_dome__name"),
+    )
+
+
+def show_session_list_items(rows, request=None):
+    """Render show_session_list_values rows like ShowSessionListSerializer"""
+    url = url_builder(request)
+    serialize = row_serializer(
+        ShowSessionListSerializer.Meta.fields,
+        astronomy_show_image=lambda row: rendition_urls(
+            row["astronomy_show_image"],
+            row["astronomy_show_image_renditions"],
+            url=url,
+        ),
+        show_time=lambda row: format_datetime(row["show_time"]),
+    )
+    return [serialize(row) for row in rows]
+
+
+def astronomy_show_list_values(queryset):
+    return queryset.values(
+        "id", "title", "description", "image", "image_renditions"
+    )
+
+
+def astronomy_show_list_items(rows, request=None):
+    """Render astronomy_show_list_values rows like AstronomyShowListSerializer.
+
+    Theme names of all rows are read with one query.
+    """
+    rows = list(rows)
+    themes = defaultdict(list)
+    if rows:
+        for show_id, name in ShowTheme.objects.filter(
+            astronomy_shows__in=[row["id"] for row in rows]
+        ).values_list("astronomy_shows", "name"):
+            themes[show_id].append(name)
+    url = url_builder(request)
+    serialize = row_serializer(
+        AstronomyShowListSerializer.Meta.fields,
+        themes=lambda row: themes[row["id"]],
+        image=lambda row: rendition_urls(
+            row["image"], row["image_renditions"], url=url
+        ),
+    )
+    return [serialize(row) for row in rows]
+
+
+class ReadModelListMixin:
+    """List from values() rows instead of model instances.
+
+    get_list_values projects the filtered queryset to values() rows and
+    get_list_data turns a page of rows into the response data, so that a
+    page costs the same number of queries whatever its size.
+    """
+
+    def get_list_values(self, queryset):
+        raise NotImplementedError
+
+    def get_list_data(self, rows):
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_list_values(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_list_data(page))
+        return Response(self.get_list_data(queryset))
+
+
+def ticket_list_values(queryset):
+    """values() rows of tickets with their show session joined in"""
+    return queryset.values(
+        "id",
+        "row",
+        "seat",
+        "reservation",
+        "show_session",
+        show_time=F("show_session__show_time"),
+        astronomy_show_title=F("show_session__astronomy_show__title"),
+        astronomy_show_image=F("show_session__astronomy_show__image"),
+        astronomy_show_image_renditions=F(
+            "show_session__astronomy_show__image_renditions"
+        ),
+        planetarium_dome_name=F("show_session__planetarium_dome__name"),
+    )
+
+
+def ticket_list_items(rows, request=None):
+    """Render ticket_list_values rows like TicketListSerializer.
+
+    Free seats are looked up with one query for all distinct sessions
+    of the rows instead of once per ticket.
+    """
+    rows = list(rows)
+    available = {}
+    if rows:
+        available = dict(
+            ShowSession.objects.filter(
+                pk__in={row["show_session"] for row in rows}
+            )
+            .annotate(tickets_available=tickets_available())
+            .values_list("id", "tickets_available")
+        )
+    sessions = show_session_list_items(
+        (
+            {
+                **row,
+                "id": row["show_session"],
+                "tickets_available": available[row["show_session"]],
+            }
+            for row in rows
+        ),
+        request,
+    )
+    serialize = row_serializer(TicketListSerializer.Meta.fields)
+    for row, session in zip(rows, sessions):
+        row["show_session"] = session
+    return [serialize(row) for row in rows]
+
+
+TICKET_EXPORT_FIELDS = (
+    "id",
+    "row",
+    "seat",
+    "show_session",
+    "show_time",
+    "astronomy_show",
+    "planetarium_dome",
+    "reservation",
+    "reserved_at",
+    "user",
+)
+
+
+def ticket_export_rows(queryset, chunk_size=2000):
+    """Stream flat ticket rows for exports without model instances.
+
+    Rows are fetched chunk_size at a time (with a server-side cursor on
+    PostgreSQL), so memory use does not grow with the export size.
+    """
+    rows = queryset.order_by("id").values_list(
+        "id",
+        "row",
+        "seat",
+        "show_session_id",
+        "show_session__show_time",
+        "show_session__astronomy_show__title",
+        "show_session__planetarium_dome__name",
+        "reservation_id",
+        "reservation__created_at",
+        "reservation__user__email",
+    )
+    for row in rows.iterator(chunk_size=chunk_size):
+        row = dict(zip(TICKET_EXPORT_FIELDS, row))
+        row["show_time"] = format_datetime(row["show_time"])
+        row["reserved_at"] = format_datetime(row["reserved_at"])
+        yield row
@@ -0,0 +1,108 @@
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when it is installed.
+
+    The output is the same as JSONRenderer's: types orjson does not know,
+    such as Decimal, lazy strings and datetimes (passed through so they
+    keep DRF's format), go to DRF's encoder. Indented output, ASCII-only
+    output and data orjson rejects fall back to JSONRenderer; only NaN
+    and infinite floats differ and are rendered as null.
+    """
+
+    use_orjson = orjson is not None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            data is None
+            or not self.use_orjson
+            or not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
+
+
+class StreamingRenderer(BaseRenderer):
+    """Renderer of row exports written through a StreamingHttpResponse.
+
+    render() handles regular responses such as errors, stream() turns an
+    iterator of dicts into byte chunks of about rows_per_chunk rows.
+    """
+
+    charset = "utf-8"
+    rows_per_chunk = 500
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        return b"".join(self.stream(rows, list(rows[0]) if rows else []))
+
+    def stream(self, rows, fields):
+        render_row = self.row_renderer(fields)
+        lines = []
+        for row in rows:
+            lines.append(render_row(row))
+            if len(lines) >= self.rows_per_chunk:
+                yield "".join(lines).encode(self.charset)
+                lines = []
+        if lines:
+            yield "".join(lines).encode(self.charset)
+
+    def row_renderer(self, fields):
+        """Return a function rendering one row as a line of text"""
+        raise NotImplementedError
+
+
+class NDJSONRenderer(StreamingRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def row_renderer(self, fields):
+        encoder = DjangoJSONEncoder()
+        return lambda row: encoder.encode(row) + "\n"
+
+
+class Line:
+    """File-like target of csv.writer that returns the written line"""
+
+    def write(self, value):
+        return value
+
+
+class CSVRenderer(StreamingRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+    def stream(self, rows, fields):
+        yield csv.writer(Line()).writerow(fields).encode(self.charset)
+        yield from super().stream(rows, fields)
+
+    def row_renderer(self, fields):
+        writer = csv.writer(Line())
+        return lambda row: writer.writerow([row[field] for field in fields])
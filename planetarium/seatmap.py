@@ -0,0 +1,110 @@
+import base64
+
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from planetarium.models import Ticket, SeatHold
+
+
+def taken_seats(show_session):
+    """(row, seat) pairs of sold and actively held seats, in one query"""
+    sold = Ticket.objects.filter(show_session=show_session)
+    held = SeatHold.objects.active().filter(show_session=show_session)
+    return (
+        sold.values_list("row", "seat").order_by()
+        .union(held.values_list("row", "seat").order_by())
+        .order_by("row", "seat")
+    )
+
+
+def active_holds(prefix=""):
+    """Expression counting active holds of a session in a subquery"""
+    held = (
+        SeatHold.objects.active()
+        .filter(show_session=OuterRef(f"{prefix}pk"))
+        .order_by()
+        .values("show_session")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    return Coalesce(Subquery(held), 0)
+
+
+def held_seats(show_session_ids):
+    """Count active holds of the sessions of a values() subquery.
+
+    One semi-join over the holds, for list watermarks that cannot
+    afford a correlated subquery per row.
+    """
+    return SeatHold.objects.active().filter(
+        show_session__in=show_session_ids
+    ).count()
+
+
+def tickets_available(prefix=""):
+    """Expression for the free seats of a session.
+
+    Capacity minus sold tickets minus active holds, counted with a
+    correlated subquery so it does not add a query per session. Use
+    prefix to annotate models related to a session, ex. "show_session__".
+    """
+    return (
+        F(f"{prefix}planetarium_dome__rows")
+        * F(f"{prefix}planetarium_dome__seats_in_row")
+        - F(f"{prefix}tickets_sold")
+        - active_holds(prefix)
+    )
+
+
+class SeatMap:
+    """Occupancy of a planetarium dome as a bitset.
+
+    Seat (row, seat) maps to bit (row - 1) * seats_in_row + (seat - 1),
+    stored most significant bit first, so a 30x40 dome fits in 150 bytes.
+    """
+
+    def __init__(self, rows, seats_in_row, bits=None):
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        size = (rows * seats_in_row + 7) // 8
+        self.bits = bytearray(size) if bits is None else bytearray(bits)
+
+    @classmethod
+    def for_show_session(cls, show_session):
+        """Build the seat map of a session, sold and held seats are taken"""
+        dome = show_session.planetarium_dome
+        seat_map = cls(dome.rows, dome.seats_in_row)
+        for row, seat in taken_seats(show_session):
+            seat_map.take(row, seat)
+        return seat_map
+
+    @classmethod
+    async def afor_show_session(cls, show_session):
+        """Async version of for_show_session"""
+        dome = show_session.planetarium_dome
+        seat_map = cls(dome.rows, dome.seats_in_row)
+        async for row, seat in taken_seats(show_session):
+            seat_map.take(row, seat)
+        return seat_map
+
+    def _index(self, row, seat):
+        return (row - 1) * self.seats_in_row + (seat - 1)
+
+    def take(self, row, seat):
+        index = self._index(row, seat)
+        self.bits[index >> 3] |= 0x80 >> (index & 7)
+
+    def release(self, row, seat):
+        index = self._index(row, seat)
+        self.bits[index >> 3] &= ~(0x80 >> (index & 7)) & 0xFF
+
+    def is_taken(self, row, seat):
+        index = self._index(row, seat)
+        return bool(self.bits[index >> 3] & (0x80 >> (index & 7)))
+
+    @property
+    def taken_count(self):
+        return sum(byte.bit_count() for byte in self.bits)
+
+    def to_base64(self):
+        return base64.b64encode(bytes(self.bits)).decode("ascii")
@@ -0,0 +1,135 @@
+import itertools
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from planetarium.models import (
+    ShowTheme,
+    AstronomyShow,
+    PlanetariumDome,
+    ShowSession,
+    Reservation,
+    Ticket,
+)
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def seed(
+    tickets,
+    rows=30,
+    seats_in_row=40,
+    tickets_per_reservation=4,
+    users=100,
+    batch_size=5000,
+):
+    """Insert a synthetic data set with the given number of tickets.
+
+    Sessions are filled one after another, one show time every hour, so
+    the number of sessions is tickets / (rows * seats_in_row) rounded up.
+    Everything is written with bulk_create and tickets_sold is set
+    directly, which keeps a million tickets within a few minutes.
+    Returns the number of created objects per model.
+    """
+    tag = uuid.uuid4().hex[:8]
+    capacity = rows * seats_in_row
+    session_count = max(1, -(-tickets // capacity))
+
+    with transaction.atomic():
+        themes = ShowTheme.objects.bulk_create(
+            ShowTheme(name=f"Theme {tag}-{number}") for number in range(5)
+        )
+        shows = AstronomyShow.objects.bulk_create(
+            AstronomyShow(
+                title=f"Show {tag}-{number}",
+                description="Synthetic astronomy show",
+            )
+            for number in range(20)
+        )
+        AstronomyShow.themes.through.objects.bulk_create(
+            AstronomyShow.themes.through(
+                astronomyshow_id=show.id,
+                showtheme_id=themes[number % len(themes)].id,
+            )
+            for number, show in enumerate(shows)
+        )
+        domes = PlanetariumDome.objects.bulk_create(
+            PlanetariumDome(
+                name=f"Dome {tag}-{number}",
+                rows=rows,
+                seats_in_row=seats_in_row,
+            )
+            for number in range(5)
+        )
+        start = timezone.now().replace(minute=0, second=0, microsecond=0)
+        sessions = []
+        for batch in batched(range(session_count), batch_size):
+            sessions += ShowSession.objects.bulk_create(
+                ShowSession(
+                    astronomy_show=shows[number % len(shows)],
+                    planetarium_dome=domes[number % len(domes)],
+                    show_time=start + timedelta(hours=number),
+                    tickets_sold=min(capacity, tickets - number * capacity),
+                )
+                for number in batch
+            )
+        password = make_password(None)
+        user_ids = [
+            user.id
+            for user in get_user_model().objects.bulk_create(
+                get_user_model()(
+                    email=f"seed-{tag}-{number}@example.com",
+                    password=password,
+                )
+                for number in range(users)
+            )
+        ]
+
+    seats = (
+        (session.id, row, seat)
+        for session in sessions
+        for row in range(1, rows + 1)
+        for seat in range(1, seats_in_row + 1)
+    )
+    seats = itertools.islice(seats, tickets)
+    reservation_count = 0
+    chunk = batch_size - batch_size % tickets_per_reservation
+    for batch in batched(seats, max(chunk, tickets_per_reservation)):
+        with transaction.atomic():
+            reservations = Reservation.objects.bulk_create(
+                Reservation(user_id=user_ids[(reservation_count + number)
+                                             % len(user_ids)])
+                for number in range(
+                    -(-len(batch) // tickets_per_reservation)
+                )
+            )
+            reservation_count += len(reservations)
+            Ticket.objects.bulk_create(
+                Ticket(
+                    show_session_id=session_id,
+                    row=row,
+                    seat=seat,
+                    reservation_id=reservations[
+                        number // tickets_per_reservation
+                    ].id,
+                )
+                for number, (session_id, row, seat) in enumerate(batch)
+            )
+
+    return {
+        "themes": len(themes),
+        "astronomy shows": len(shows),
+        "domes": len(domes),
+        "show sessions": len(sessions),
+        "users": len(user_ids),
+        "reservations": reservation_count,
+        "tickets": tickets,
+    }
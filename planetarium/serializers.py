@@ -1,6 +1,9 @@
 from django.db import transaction
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
+from planetarium import booking, images
+from planetarium.allocation import PREFERENCES
 from planetarium.models import (
     ShowTheme,
     AstronomyShow,
@@ -8,7 +11,9 @@ from planetarium.models import (
     ShowSession,
     Reservation,
     Ticket,
+    SeatHold,
 )
+from planetarium.seatmap import SeatMap, taken_seats
 
 
 class ShowThemeSerializer(serializers.ModelSerializer):
@@ -29,6 +34,35 @@ class AstronomyShowSerializer(serializers.ModelSerializer):
         fields = ("id", "title", "description", "themes", "image")
 
 
+IMAGE_URLS_SCHEMA = {
+    "type": "object",
+    "additionalProperties": {"type": "string", "format": "uri"},
+}
+
+
+@extend_schema_field({
+    "type": "object",
+    "nullable": True,
+    "properties": {
+        "original": {"type": "string", "format": "uri"},
+        **{rendition: IMAGE_URLS_SCHEMA for rendition in images.RENDITIONS},
+    },
+})
+class ImageRenditionsField(serializers.Field):
+    """URLs of the original image and of its renditions per format"""
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, astronomy_show):
+        return images.rendition_urls(
+            astronomy_show.image.name,
+            astronomy_show.image_renditions,
+            self.context.get("request"),
+        )
+
+
 class AstronomyShowImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = AstronomyShow
@@ -38,10 +72,12 @@ class AstronomyShowImageSerializer(serializers.ModelSerializer):
 class AstronomyShowListSerializer(AstronomyShowSerializer):
     themes = serializers.SlugRelatedField(many=True, read_only=True,
                                           slug_field="name")
+    image = ImageRenditionsField(source="*")
 
 
 class AstronomyShowRetrieveSerializer(AstronomyShowSerializer):
     themes = ShowThemeSerializer(many=True, read_only=True)
+    image = ImageRenditionsField(source="*")
 
 
 class PlanetariumDomeSerializer(serializers.ModelSerializer):
@@ -60,9 +96,7 @@ class ShowSessionListSerializer(ShowSessionSerializer):
     astronomy_show_title = serializers.CharField(
         source="astronomy_show.title", read_only=True
     )
-    astronomy_show_image = serializers.ImageField(
-        source="astronomy_show.image", read_only=True
-    )
+    astronomy_show_image = ImageRenditionsField(source="astronomy_show")
     planetarium_dome_name = serializers.CharField(
         source="planetarium_dome.name", read_only=True
     )
@@ -102,20 +136,40 @@ class ShowSessionRetrieveSerializer(ShowSessionSerializer):
     astronomy_show = AstronomyShowRetrieveSerializer(many=False,
                                                      read_only=True)
     planetarium_dome = PlanetariumDomeSerializer(many=False, read_only=True)
-    taken_seats = TicketBriefSerializer(source="tickets",
-                                        many=True, read_only=True)
+    taken_seats = serializers.SerializerMethodField()
 
     class Meta:
         model = ShowSession
         fields = ("id", "astronomy_show",
                   "planetarium_dome", "show_time", "taken_seats")
 
+    @extend_schema_field(TicketBriefSerializer(many=True))
+    def get_taken_seats(self, obj):
+        """Sold and held seats"""
+        return [{"row": row, "seat": seat} for row, seat in taken_seats(obj)]
+
+
+class ShowSessionSeatMapSerializer(ShowSessionRetrieveSerializer):
+    taken_seats = serializers.SerializerMethodField()
+
+    @extend_schema_field(serializers.CharField())
+    def get_taken_seats(self, obj):
+        """Base64 encoded occupancy bitmap, see planetarium.seatmap"""
+        return SeatMap.for_show_session(obj).to_base64()
+
 
 class TicketCreateSerializer(TicketSerializer):
+    show_session = serializers.IntegerField(source="show_session_id")
+
     class Meta:
         model = Ticket
         fields = ("row", "seat", "show_session")
 
+    def validate(self, attrs):
+        # Rows and seats are validated for the whole reservation at once
+        # in ReservationCreateSerializer.validate_tickets.
+        return attrs
+
 
 class ReservationSerializer(serializers.ModelSerializer):
     tickets = TicketSerializer(many=True, read_only=True)
@@ -136,10 +190,45 @@ class ReservationCreateSerializer(serializers.ModelSerializer):
         fields = ("id", "created_at", "tickets")
         read_only_fields = ("id", "created_at")
 
+    def validate_tickets(self, tickets_data):
+        request = self.context.get("request")
+        return booking.validate_tickets(tickets_data,
+                                        request and request.user)
+
     def create(self, validated_data):
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
             reservation = Reservation.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(reservation=reservation, **ticket_data)
+            booking.create_tickets(reservation, tickets_data)
             return reservation
+
+
+class SeatAllocationSerializer(serializers.Serializer):
+    count = serializers.IntegerField(min_value=1, max_value=50)
+    prefer = serializers.ChoiceField(PREFERENCES, default="center")
+    together = serializers.BooleanField(default=True)
+
+    def create(self, validated_data):
+        return booking.reserve_best_available(
+            self.context["request"].user,
+            self.context["show_session"],
+            **validated_data,
+        )
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SeatHold
+        fields = ("id", "show_session", "row", "seat", "expires_at")
+
+
+class SeatHoldCreateSerializer(serializers.Serializer):
+    seats = TicketCreateSerializer(many=True, allow_empty=False)
+
+    def validate_seats(self, seats_data):
+        return booking.validate_tickets(seats_data,
+                                        self.context["request"].user)
+
+    def create(self, validated_data):
+        return booking.hold_seats(self.context["request"].user,
+                                  validated_data["seats"])
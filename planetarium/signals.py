@@ -0,0 +1,107 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from planetarium import cache, events, images
+from planetarium.counters import (
+    add_tickets_sold,
+    bump_versions,
+    recount_tickets_sold,
+)
+from planetarium.models import (
+    ShowTheme,
+    AstronomyShow,
+    PlanetariumDome,
+    ShowSession,
+    Ticket,
+)
+
+
+def seat_key(ticket):
+    return ticket.show_session_id, ticket.row, ticket.seat
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_ticket_seat(sender, instance, raw=False, **kwargs):
+    # The seat before an edit, ex. in the admin, to move the counters
+    instance._saved_seat_key = None
+    if instance.pk and not raw:
+        instance._saved_seat_key = sender.objects.filter(
+            pk=instance.pk
+        ).values_list("show_session_id", "row", "seat").first()
+
+
+@receiver(post_save, sender=Ticket)
+def count_created_ticket(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        # loaddata bypasses the counting, recount the session instead
+        recount_tickets_sold([instance.show_session_id])
+        return
+    saved = getattr(instance, "_saved_seat_key", None)
+    if created:
+        add_tickets_sold([instance.show_session_id])
+        events.publish_seats_on_commit(events.SEATS_TAKEN,
+                                       [seat_key(instance)])
+    elif saved and saved != seat_key(instance):
+        add_tickets_sold([saved[0]], delta=-1)
+        add_tickets_sold([instance.show_session_id])
+        events.publish_seats_on_commit(events.SEATS_RELEASED, [saved])
+        events.publish_seats_on_commit(events.SEATS_TAKEN,
+                                       [seat_key(instance)])
+    else:
+        bump_versions([instance.show_session_id])
+
+
+@receiver(post_save, sender=ShowSession)
+def recount_loaded_show_session(sender, instance, raw=False, **kwargs):
+    # Fixture records lack tickets_sold, loaddata would store the default
+    if raw:
+        recount_tickets_sold([instance.pk])
+
+
+@receiver(post_delete, sender=Ticket)
+def count_deleted_ticket(sender, instance, **kwargs):
+    add_tickets_sold([instance.show_session_id], delta=-1)
+    events.publish_seats_on_commit(events.SEATS_RELEASED, [seat_key(instance)])
+
+
+@receiver([post_save, post_delete], sender=ShowTheme)
+def invalidate_show_themes(sender, instance, **kwargs):
+    cache.invalidate("showtheme", instance.pk)
+
+
+@receiver([post_save, post_delete], sender=AstronomyShow)
+def invalidate_astronomy_shows(sender, instance, **kwargs):
+    cache.invalidate("astronomyshow", instance.pk)
+
+
+@receiver(post_save, sender=AstronomyShow)
+def schedule_image_renditions(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    source = instance.image.name
+    if source and instance.image_renditions.get("source") != source:
+        images.schedule_renditions(instance.pk)
+
+
+@receiver(m2m_changed, sender=AstronomyShow.themes.through)
+def invalidate_astronomy_show_themes(sender, instance, action, reverse,
+                                     pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        cache.invalidate("astronomyshow", instance.pk)
+    elif pk_set:
+        for pk in pk_set:
+            cache.invalidate("astronomyshow", pk)
+    else:
+        cache.invalidate("showtheme")
+
+
+@receiver([post_save, post_delete], sender=PlanetariumDome)
+def invalidate_planetarium_domes(sender, instance, **kwargs):
+    cache.invalidate("planetariumdome", instance.pk)
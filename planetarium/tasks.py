@@ -0,0 +1,69 @@
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory
+from django.urls import reverse
+from rest_framework.test import force_authenticate
+
+from planetarium.booking import purge_expired_holds
+from planetarium.counters import reconcile_tickets_sold
+from planetarium.images import generate_renditions
+from planetarium.jobs import job
+from planetarium.models import AstronomyShow
+from planetarium.views import (
+    AstronomyShowViewSet,
+    PlanetariumDomeViewSet,
+    ShowThemeViewSet,
+)
+
+
+@job(max_attempts=3, concurrency=2)
+def generate_image_renditions(astronomy_show_id):
+    generate_renditions(astronomy_show_id)
+
+
+@job(max_attempts=3, concurrency=1)
+def warm_catalog_cache():
+    """Render the first pages of the catalog lists and every show detail.
+
+    Requests are built for PLANETARIUM_CACHE_WARM_URL, the public base
+    URL, so that keys and absolute URLs match what clients request.
+    """
+    base_url = urlsplit(settings.PLANETARIUM_CACHE_WARM_URL)
+    factory = RequestFactory(
+        headers={"host": base_url.netloc},
+        secure=base_url.scheme == "https",
+    )
+    # Catalog responses do not depend on the user, any active one will do
+    user = get_user_model()(is_active=True)
+
+    def get(viewset, basename, pk=None):
+        if pk is None:
+            action, url = "list", reverse(f"planetarium:{basename}-list")
+            kwargs = {}
+        else:
+            action = "retrieve"
+            url = reverse(f"planetarium:{basename}-detail", args=[pk])
+            kwargs = {"pk": str(pk)}
+        request = factory.get(url)
+        force_authenticate(request, user)
+        view = viewset.as_view({"get": action}, basename=basename)
+        view(request, **kwargs).render()
+
+    get(ShowThemeViewSet, "showtheme")
+    get(PlanetariumDomeViewSet, "planetariumdome")
+    get(AstronomyShowViewSet, "astronomyshow")
+    for pk in AstronomyShow.objects.values_list("pk", flat=True).iterator():
+        get(AstronomyShowViewSet, "astronomyshow", pk)
+
+
+@job(max_attempts=1, concurrency=1, every=timedelta(hours=1))
+def reconcile_tickets_sold_counters():
+    reconcile_tickets_sold()
+
+
+@job(max_attempts=1, concurrency=1, every=timedelta(minutes=1))
+def purge_expired_seat_holds():
+    purge_expired_holds()
@@ -0,0 +1,220 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework import serializers, status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from planetarium import booking
+from planetarium.allocation import allocate
+from planetarium.models import Reservation, SeatHold, Ticket
+from planetarium.seatmap import SeatMap
+from planetarium.tests.test_reservation import sample_show_session
+
+
+def allocate_url(show_session_id):
+    return reverse("planetarium:showsession-allocate",
+                   args=[show_session_id])
+
+
+class AllocateTests(SimpleTestCase):
+    def setUp(self):
+        self.seat_map = SeatMap(5, 9)
+
+    def test_center_block(self):
+        self.assertEqual(allocate(self.seat_map, 3),
+                         [(3, 4), (3, 5), (3, 6)])
+
+    def test_front_and_back(self):
+        self.assertEqual(allocate(self.seat_map, 1, "front"), [(1, 5)])
+        self.assertEqual(allocate(self.seat_map, 1, "back"), [(5, 5)])
+
+    def test_block_moves_around_taken_seats(self):
+        self.seat_map.take(3, 5)
+
+        self.assertEqual(allocate(self.seat_map, 3),
+                         [(3, 2), (3, 3), (3, 4)])
+
+    def test_block_moves_to_other_row(self):
+        for seat in (3, 6):
+            self.seat_map.take(3, seat)
+
+        self.assertEqual(allocate(self.seat_map, 4),
+                         [(2, 3), (2, 4), (2, 5), (2, 6)])
+
+    def test_block_across_byte_boundaries(self):
+        seat_map = SeatMap(3, 13)
+        for seat in range(1, 14):
+            if seat != 12:
+                seat_map.take(2, seat)
+        for seat in range(1, 14):
+            seat_map.take(1, seat)
+            seat_map.take(3, seat)
+
+        self.assertEqual(allocate(seat_map, 1), [(2, 12)])
+        self.assertIsNone(allocate(seat_map, 2))
+
+    def test_apart(self):
+        for row in range(1, 6):
+            for seat in range(1, 10):
+                if (row, seat) not in ((1, 1), (4, 9), (5, 2)):
+                    self.seat_map.take(row, seat)
+
+        self.assertIsNone(allocate(self.seat_map, 2))
+        self.assertEqual(allocate(self.seat_map, 2, together=False),
+                         [(4, 9), (5, 2)])
+        self.assertIsNone(allocate(self.seat_map, 4, together=False))
+
+    def test_count_larger_than_row(self):
+        self.assertIsNone(allocate(self.seat_map, 10))
+        self.assertEqual(len(allocate(self.seat_map, 10, together=False)),
+                         10)
+
+
+class AllocateSeatsApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "allocate@example.com", "password"
+        )
+        self.client.force_authenticate(self.user)
+        self.show_session = sample_show_session()
+
+    def test_allocate_reserves_best_seats(self):
+        res = self.client.post(allocate_url(self.show_session.id),
+                               {"count": 2}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        reservation = Reservation.objects.get(id=res.data["id"])
+        self.assertEqual(reservation.user, self.user)
+        self.assertEqual(
+            [(ticket["row"], ticket["seat"]) for ticket in res.data["tickets"]],
+            [(5, 7), (5, 8)],
+        )
+        self.assertEqual(
+            sorted(reservation.tickets.values_list("row", "seat")),
+            [(5, 7), (5, 8)],
+        )
+        self.show_session.refresh_from_db()
+        self.assertEqual(self.show_session.tickets_sold, 2)
+
+    def test_held_seats_are_skipped(self):
+        other = get_user_model().objects.create_user("other@example.com",
+                                                     "password")
+        booking.hold_seats(other, [{"show_session_id": self.show_session.id,
+                                    "row": 5, "seat": 8}])
+
+        res = self.client.post(allocate_url(self.show_session.id),
+                               {"count": 1, "prefer": "front"},
+                               format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [(ticket["row"], ticket["seat"]) for ticket in res.data["tickets"]],
+            [(1, 8)],
+        )
+        self.assertEqual(SeatHold.objects.count(), 1)
+
+    def test_no_seats_together(self):
+        res = self.client.post(allocate_url(self.show_session.id),
+                               {"count": 16}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("count", res.data)
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_invalid_request(self):
+        for payload in ({}, {"count": 0}, {"count": 2, "prefer": "side"}):
+            with self.subTest(payload=payload):
+                res = self.client.post(allocate_url(self.show_session.id),
+                                       payload, format="json")
+
+                self.assertEqual(res.status_code,
+                                 status.HTTP_400_BAD_REQUEST)
+
+    def test_requires_authentication(self):
+        res = APIClient().post(allocate_url(self.show_session.id),
+                               {"count": 1}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_retries_when_seats_are_sold_concurrently(self):
+        for_show_session = SeatMap.for_show_session
+
+        def sold_after_read(show_session):
+            seat_map = for_show_session(show_session)
+            if not Ticket.objects.exists():
+                Ticket.objects.create(
+                    reservation=Reservation.objects.create(user=self.user),
+                    show_session=show_session, row=5, seat=8,
+                )
+            return seat_map
+
+        with mock.patch.object(SeatMap, "for_show_session",
+                               side_effect=sold_after_read) as read:
+            res = self.client.post(allocate_url(self.show_session.id),
+                                   {"count": 1}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(read.call_count, 2)
+        self.assertEqual(
+            [(ticket["row"], ticket["seat"]) for ticket in res.data["tickets"]],
+            [(6, 8)],
+        )
+
+
+    def test_retries_when_seats_are_held_concurrently(self):
+        other = get_user_model().objects.create_user("other@example.com",
+                                                     "password")
+        for_show_session = SeatMap.for_show_session
+
+        def held_after_read(show_session):
+            seat_map = for_show_session(show_session)
+            booking.hold_seats(other, [{"show_session_id": show_session.id,
+                                        "row": 5, "seat": 8}])
+            return seat_map
+
+        for locking in ("constraint", "optimistic"):
+            with self.subTest(locking=locking), override_settings(
+                PLANETARIUM_RESERVATION_LOCKING=locking
+            ), mock.patch.object(SeatMap, "for_show_session",
+                                 side_effect=held_after_read):
+                SeatHold.objects.all().delete()
+                res = self.client.post(allocate_url(self.show_session.id),
+                                       {"count": 1}, format="json")
+
+                self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+                self.assertNotEqual(
+                    (res.data["tickets"][0]["row"],
+                     res.data["tickets"][0]["seat"]),
+                    (5, 8),
+                )
+        self.assertFalse(Ticket.objects.filter(row=5, seat=8).exists())
+
+    def test_error_after_last_attempt_is_keyed_to_count(self):
+        def always_taken(reservation, tickets_data, locking=None):
+            raise serializers.ValidationError({"tickets": [{"seat": ["x"]}]})
+
+        with mock.patch.object(booking, "create_tickets",
+                               side_effect=always_taken) as create:
+            res = self.client.post(allocate_url(self.show_session.id),
+                                   {"count": 1}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(create.call_count, booking.ALLOCATION_ATTEMPTS)
+        self.assertEqual(list(res.data), ["count"])
+        self.assertFalse(Reservation.objects.exists())
+
+class BenchSeatAllocationTests(SimpleTestCase):
+    def test_bench_seat_allocation(self):
+        out = StringIO()
+
+        call_command("bench_seat_allocation", "--dome", "5x8",
+                     "--occupancy", "0.5", "--repeat", "2", stdout=out)
+
+        self.assertIn("5x8", out.getvalue())
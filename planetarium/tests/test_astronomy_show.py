@@ -1,21 +1,25 @@
 import tempfile
 import os
+import shutil
 from PIL import Image
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
 
-from planetarium.models import AstronomyShow, ShowTheme
+from planetarium.images import delete_renditions, generate_renditions
+from planetarium.jobs import claim, run_job
+from planetarium.models import AstronomyShow, Job, ShowTheme
 from planetarium.serializers import (
     AstronomyShowListSerializer,
     AstronomyShowRetrieveSerializer,
 )
 
 ASTRONOMY_SHOW_URL = reverse("planetarium:astronomyshow-list")
+MEDIA_ROOT = tempfile.mkdtemp()
 
 
 def detail_url(astronomy_show_id):
@@ -152,7 +156,13 @@ class AdminAstronomyShowTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
 
 
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
 class AstronomyShowImageUploadTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
     def setUp(self):
         self.client = APIClient()
         self.user = get_user_model().objects.create_superuser(
@@ -162,9 +172,19 @@ class AstronomyShowImageUploadTests(TestCase):
         self.astronomy_show = sample_astronomy_show()
 
     def tearDown(self):
+        self.astronomy_show.refresh_from_db()
+        delete_renditions(self.astronomy_show.image_renditions)
         if self.astronomy_show.image:
             self.astronomy_show.image.delete()
 
+    def upload_sample_image(self, size=(10, 10)):
+        url = image_upload_url(self.astronomy_show.id)
+        with tempfile.NamedTemporaryFile(suffix=".jpg") as ntf:
+            img = Image.new("RGB", size)
+            img.save(ntf, format="JPEG")
+            ntf.seek(0)
+            return self.client.post(url, {"image": ntf}, format="multipart")
+
     def test_upload_image_to_astronomy_show(self):
         url = image_upload_url(self.astronomy_show.id)
         with tempfile.NamedTemporaryFile(suffix=".jpg") as ntf:
@@ -265,3 +285,59 @@ class AstronomyShowImageUploadTests(TestCase):
         self.astronomy_show.refresh_from_db()
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertTrue(os.path.exists(self.astronomy_show.image.path))
+
+    def test_upload_queues_renditions_job(self):
+        res = self.upload_sample_image()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        job = Job.objects.get(name="generate_image_renditions")
+        self.assertEqual(job.kwargs,
+                         {"astronomy_show_id": self.astronomy_show.id})
+        self.astronomy_show.refresh_from_db()
+        self.assertEqual(self.astronomy_show.image_renditions, {})
+
+        run_job(claim("test", 1)[0])
+        self.astronomy_show.refresh_from_db()
+        self.assertIn("hero", self.astronomy_show.image_renditions)
+
+    def test_raw_save_queues_no_renditions_job(self):
+        # As loaddata saves fixtures
+        AstronomyShow(
+            title="Fixture", description="Fixture", image="upload/fixture.jpg"
+        ).save_base(raw=True)
+
+        self.assertFalse(Job.objects.exists())
+
+    def test_generate_renditions(self):
+        self.upload_sample_image(size=(300, 100))
+
+        self.assertTrue(generate_renditions(self.astronomy_show.id))
+        self.assertFalse(generate_renditions(self.astronomy_show.id))
+
+        self.astronomy_show.refresh_from_db()
+        renditions = self.astronomy_show.image_renditions
+        self.assertEqual(renditions["source"], self.astronomy_show.image.name)
+        storage = self.astronomy_show.image.storage
+        for name, size in (("thumbnail", (160, 90)), ("hero", (1600, 900))):
+            for extension, image_format in (("webp", "WEBP"),
+                                            ("jpeg", "JPEG")):
+                with storage.open(renditions[name][extension]) as file:
+                    image = Image.open(file)
+                    self.assertEqual(image.size, size)
+                    self.assertEqual(image.format, image_format)
+
+    def test_rendition_map_is_shown_on_list_and_detail(self):
+        self.upload_sample_image()
+        res = self.client.get(detail_url(self.astronomy_show.id))
+        self.assertEqual(list(res.data["image"]), ["original"])
+
+        generate_renditions(self.astronomy_show.id)
+
+        res = self.client.get(detail_url(self.astronomy_show.id))
+        self.assertEqual(list(res.data["image"]),
+                         ["original", "thumbnail", "card", "hero"])
+        self.assertTrue(
+            res.data["image"]["card"]["webp"].endswith("/card.webp")
+        )
+        res = self.client.get(ASTRONOMY_SHOW_URL)
+        self.assertIn("jpeg", res.data["results"][0]["image"]["thumbnail"])
@@ -0,0 +1,172 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from planetarium.jobs import claim, run_job
+from planetarium.models import AstronomyShow, Job, PlanetariumDome, ShowTheme
+
+ASTRONOMY_SHOW_URL = reverse("planetarium:astronomyshow-list")
+SHOW_THEME_URL = reverse("planetarium:showtheme-list")
+PLANETARIUM_DOME_URL = reverse("planetarium:planetariumdome-list")
+CACHE_STATS_URL = reverse("planetarium:cache-stats")
+
+
+def detail_url(astronomy_show_id):
+    return reverse("planetarium:astronomyshow-detail", args=[astronomy_show_id])
+
+
+def sample_astronomy_show(**kwargs):
+    defaults = {"title": "Sample Show", "description": "Sample Description"}
+    defaults.update(kwargs)
+    return AstronomyShow.objects.create(**defaults)
+
+
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="testpass"
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_second_list_is_served_from_cache(self):
+        sample_astronomy_show()
+
+        res = self.client.get(ASTRONOMY_SHOW_URL)
+        self.assertEqual(res["X-Cache"], "MISS")
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(ASTRONOMY_SHOW_URL)
+
+        self.assertEqual(cached["X-Cache"], "HIT")
+        self.assertEqual(cached.data, res.data)
+
+    def test_query_parameters_are_part_of_the_key(self):
+        theme = ShowTheme.objects.create(name="Stars")
+        sample_astronomy_show().themes.add(theme)
+        sample_astronomy_show()
+
+        self.client.get(ASTRONOMY_SHOW_URL)
+        res = self.client.get(ASTRONOMY_SHOW_URL, {"themes": theme.id})
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(len(res.data["results"]), 1)
+
+        res = self.client.get(ASTRONOMY_SHOW_URL, {"limit": 1, "offset": 1})
+        self.assertEqual(res["X-Cache"], "MISS")
+
+    def test_scheme_is_part_of_the_key(self):
+        sample_astronomy_show(image="upload/astronomy-shows/sample.jpg")
+
+        self.client.get(ASTRONOMY_SHOW_URL)
+        res = self.client.get(ASTRONOMY_SHOW_URL, secure=True)
+
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertTrue(res.data["results"][0]["image"]["original"]
+                        .startswith("https://"))
+
+    def test_saving_invalidates_list(self):
+        sample_astronomy_show()
+        self.client.get(ASTRONOMY_SHOW_URL)
+
+        sample_astronomy_show(title="Another Show")
+        res = self.client.get(ASTRONOMY_SHOW_URL)
+
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(res.data["count"], 2)
+
+    def test_theme_rename_invalidates_astronomy_shows(self):
+        theme = ShowTheme.objects.create(name="Stars")
+        show = sample_astronomy_show()
+        show.themes.add(theme)
+        self.client.get(ASTRONOMY_SHOW_URL)
+        self.client.get(detail_url(show.id))
+
+        theme.name = "Planets"
+        theme.save()
+
+        res = self.client.get(ASTRONOMY_SHOW_URL)
+        self.assertEqual(res.data["results"][0]["themes"], ["Planets"])
+        res = self.client.get(detail_url(show.id))
+        self.assertEqual(res.data["themes"][0]["name"], "Planets")
+
+    def test_theme_change_invalidates_retrieve(self):
+        show = sample_astronomy_show()
+        self.client.get(detail_url(show.id))
+
+        show.themes.add(ShowTheme.objects.create(name="Stars"))
+        res = self.client.get(detail_url(show.id))
+
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(len(res.data["themes"]), 1)
+
+    def test_saving_one_show_keeps_other_details_cached(self):
+        show = sample_astronomy_show()
+        other_show = sample_astronomy_show(title="Other Show")
+        self.client.get(detail_url(show.id))
+        self.client.get(detail_url(other_show.id))
+
+        other_show.title = "Renamed Show"
+        other_show.save()
+
+        self.assertEqual(self.client.get(detail_url(show.id))["X-Cache"], "HIT")
+        res = self.client.get(detail_url(other_show.id))
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(res.data["title"], "Renamed Show")
+
+    def test_dome_and_theme_lists_are_cached(self):
+        PlanetariumDome.objects.create(name="Dome", rows=5, seats_in_row=5)
+        ShowTheme.objects.create(name="Stars")
+
+        for url in (PLANETARIUM_DOME_URL, SHOW_THEME_URL):
+            self.client.get(url)
+            self.assertEqual(self.client.get(url)["X-Cache"], "HIT")
+
+        PlanetariumDome.objects.create(name="Dome 2", rows=5, seats_in_row=5)
+        res = self.client.get(PLANETARIUM_DOME_URL)
+        self.assertEqual(res.data["count"], 2)
+
+    def test_cache_stats(self):
+        self.client.get(SHOW_THEME_URL)
+        self.client.get(SHOW_THEME_URL)
+
+        res = self.client.get(CACHE_STATS_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        res = self.client.get(CACHE_STATS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {"hits": 1, "misses": 1})
+
+    def test_conditional_get_without_queries(self):
+        show = sample_astronomy_show()
+        etag = self.client.get(detail_url(show.id))["ETag"]
+
+        with self.assertNumQueries(0):
+            res = self.client.get(detail_url(show.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        show.themes.add(ShowTheme.objects.create(name="Stars"))
+        res = self.client.get(detail_url(show.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    @override_settings(PLANETARIUM_CACHE_WARM_URL="http://testserver")
+    def test_changes_queue_one_cache_warming_job(self):
+        show = sample_astronomy_show()
+        show.themes.add(ShowTheme.objects.create(name="Stars"))
+        self.assertEqual(Job.objects.filter(name="warm_catalog_cache").count(),
+                         1)
+
+        Job.objects.update(run_after=Job.objects.get().created_at)
+        self.assertTrue(run_job(claim("test", 1)[0]))
+
+        for url in (ASTRONOMY_SHOW_URL, detail_url(show.id), SHOW_THEME_URL):
+            self.assertEqual(self.client.get(url)["X-Cache"], "HIT")
+
+    def test_cache_warming_is_off_without_public_url(self):
+        sample_astronomy_show()
+        self.assertFalse(Job.objects.exists())
@@ -0,0 +1,65 @@
+from unittest import skipIf
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from planetarium_api.database import database_config
+
+ENVIRON = {"POSTGRES_DB": "planetarium", "POSTGRES_HOST": "db"}
+
+
+class DatabaseConfigTests(SimpleTestCase):
+    def test_persistent_by_default(self):
+        config = database_config(ENVIRON)
+
+        self.assertEqual(config["NAME"], "planetarium")
+        self.assertEqual(config["CONN_MAX_AGE"], 60)
+        self.assertTrue(config["CONN_HEALTH_CHECKS"])
+        self.assertNotIn("pool", config["OPTIONS"])
+
+    def test_no_reuse(self):
+        config = database_config({**ENVIRON, "DB_CONNECTION_MODE": "none"})
+
+        self.assertEqual(config["CONN_MAX_AGE"], 0)
+        self.assertNotIn("pool", config["OPTIONS"])
+
+    def test_pool(self):
+        config = database_config({**ENVIRON, "DB_POOL_MAX_SIZE": "20"},
+                                 mode="pool")
+
+        self.assertEqual(config["CONN_MAX_AGE"], 0)
+        self.assertEqual(config["OPTIONS"]["pool"],
+                         {"min_size": 2, "max_size": 20, "timeout": 10})
+
+    def test_statement_timeout_per_role(self):
+        for environ, options in (
+            (ENVIRON, None),
+            ({**ENVIRON, "DB_CONNECTION_ROLE": "web"},
+             "-c statement_timeout=5000"),
+            ({**ENVIRON, "DB_CONNECTION_ROLE": "worker"},
+             "-c statement_timeout=60000"),
+            ({**ENVIRON, "DB_CONNECTION_ROLE": "worker",
+              "DB_STATEMENT_TIMEOUT_WORKER": "1000"},
+             "-c statement_timeout=1000"),
+            ({**ENVIRON, "DB_CONNECTION_ROLE": "maintenance"}, None),
+        ):
+            with self.subTest(environ=environ):
+                config = database_config(environ)
+
+                self.assertEqual(config["OPTIONS"].get("options"), options)
+
+    def test_invalid_mode_and_role(self):
+        for environ in ({"DB_CONNECTION_MODE": "pooled"},
+                        {"DB_CONNECTION_ROLE": "admin"}):
+            with self.subTest(environ=environ):
+                with self.assertRaises(ImproperlyConfigured):
+                    database_config(environ)
+
+
+class BenchDBConnectionsTests(TestCase):
+    @skipIf(connection.vendor == "postgresql", "Runs on other databases")
+    def test_needs_postgresql(self):
+        with self.assertRaises(CommandError):
+            call_command("bench_db_connections", "--duration", "0")
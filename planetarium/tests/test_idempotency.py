@@ -0,0 +1,140 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from planetarium.idempotency import idempotency_cache_key
+from planetarium.models import Reservation, SeatHold
+from planetarium.tests.test_reservation import (
+    RESERVATION_URL,
+    sample_show_session,
+)
+
+SEAT_HOLD_URL = reverse("planetarium:seathold-list")
+SEAT_HOLD_RESERVE_URL = reverse("planetarium:seathold-reserve")
+
+
+class IdempotencyKeyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "idempotent@example.com", "password"
+        )
+        self.client.force_authenticate(self.user)
+        self.show_session = sample_show_session()
+
+    def reserve(self, key, seat=1, client=None):
+        return (client or self.client).post(
+            RESERVATION_URL,
+            {"tickets": [{"show_session": self.show_session.id,
+                          "row": 1, "seat": seat}]},
+            format="json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_replays_original_response(self):
+        first = self.reserve("key-1")
+        retry = self.reserve("key-1")
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertNotIn("Idempotent-Replayed", first)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_without_key_creates_again(self):
+        self.reserve("key-1")
+
+        res = self.client.post(
+            RESERVATION_URL,
+            {"tickets": [{"show_session": self.show_session.id,
+                          "row": 1, "seat": 2}]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Reservation.objects.count(), 2)
+
+    def test_key_reused_with_other_request(self):
+        self.reserve("key-1", seat=1)
+
+        res = self.reserve("key-1", seat=2)
+
+        self.assertEqual(res.status_code,
+                         status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_keys_are_per_user(self):
+        other_client = APIClient()
+        other_client.force_authenticate(get_user_model().objects.create_user(
+            "other@example.com", "password"
+        ))
+        self.reserve("key-1", seat=1)
+
+        res = self.reserve("key-1", seat=2, client=other_client)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Reservation.objects.count(), 2)
+
+    def test_failed_request_can_be_retried(self):
+        self.reserve("key-0", seat=1)
+        failed = self.reserve("key-1", seat=1)
+
+        Reservation.objects.all().delete()
+        retry = self.reserve("key-1", seat=1)
+
+        self.assertEqual(failed.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+
+    def test_concurrent_retry_waits_for_first_request(self):
+        first = self.reserve("key-1")
+        stored = cache.get(self.stored_key("key-1"))
+        cache.set(self.stored_key("key-1"), ("pending", stored[0]))
+
+        def finish(seconds):
+            cache.set(self.stored_key("key-1"), stored)
+
+        with mock.patch("planetarium.idempotency.time.sleep",
+                        side_effect=finish) as sleep:
+            retry = self.reserve("key-1")
+
+        sleep.assert_called_once()
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    @override_settings(PLANETARIUM_IDEMPOTENCY_WAIT=0)
+    def test_concurrent_retry_times_out(self):
+        cache.set(self.stored_key("key-1"), ("pending", "digest"))
+
+        res = self.reserve("key-1")
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(Reservation.objects.count(), 0)
+
+    def test_invalid_key(self):
+        res = self.reserve("k" * 256)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_seat_hold_actions(self):
+        payload = {"seats": [{"show_session": self.show_session.id,
+                              "row": 2, "seat": 1}]}
+        for _ in range(2):
+            hold = self.client.post(SEAT_HOLD_URL, payload, format="json",
+                                    HTTP_IDEMPOTENCY_KEY="hold")
+            reserve = self.client.post(SEAT_HOLD_RESERVE_URL, format="json",
+                                       HTTP_IDEMPOTENCY_KEY="reserve")
+
+            self.assertEqual(hold.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(reserve.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SeatHold.objects.count(), 0)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def stored_key(self, key):
+        return idempotency_cache_key(self.user.pk, RESERVATION_URL, key)
@@ -0,0 +1,133 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from planetarium import jobs
+from planetarium.models import Job
+
+calls = []
+
+
+@jobs.job(name="test_record")
+def record(value):
+    calls.append(value)
+
+
+@jobs.job(name="test_fail", max_attempts=2, backoff=10)
+def fail():
+    raise RuntimeError("Boom")
+
+
+@jobs.job(name="test_single", concurrency=1)
+def single():
+    pass
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_unknown_job(self):
+        with self.assertRaises(ValueError):
+            jobs.enqueue("test_missing")
+
+    def test_enqueue_unique(self):
+        first = jobs.enqueue("test_record", unique=True, value=1)
+        self.assertIsNone(jobs.enqueue("test_record", unique=True, value=1))
+        self.assertIsNotNone(jobs.enqueue("test_record", unique=True, value=2))
+        self.assertEqual(Job.objects.count(), 2)
+
+        jobs.run_job(jobs.claim("test", 1)[0])
+        self.assertIsNotNone(jobs.enqueue("test_record", unique=True, value=1))
+        self.assertEqual(Job.objects.get(pk=first.pk).status, Job.Status.DONE)
+
+    def test_claim_skips_jobs_not_due(self):
+        jobs.enqueue("test_record", delay=timedelta(minutes=5), value=1)
+
+        self.assertEqual(jobs.claim("test", 10), [])
+
+    def test_run_job(self):
+        jobs.enqueue("test_record", value=1)
+
+        [job] = jobs.claim("test", 10)
+        self.assertEqual(job.status, Job.Status.RUNNING)
+        self.assertTrue(jobs.run_job(job))
+
+        job.refresh_from_db()
+        self.assertEqual(calls, [1])
+        self.assertEqual(job.status, Job.Status.DONE)
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_failed_job_is_retried_with_backoff_then_fails(self):
+        job = jobs.enqueue("test_fail")
+
+        with self.assertLogs("planetarium.jobs", "ERROR"):
+            self.assertFalse(jobs.run_job(jobs.claim("test", 1)[0]))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.QUEUED)
+        self.assertIn("Boom", job.last_error)
+        self.assertGreater(job.run_after,
+                           timezone.now() + timedelta(seconds=5))
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        with self.assertLogs("planetarium.jobs", "ERROR"):
+            jobs.run_job(jobs.claim("test", 1)[0])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_concurrency_limit(self):
+        jobs.enqueue("test_single")
+        jobs.enqueue("test_single")
+        jobs.enqueue("test_record", value=1)
+
+        claimed = jobs.claim("test", 10)
+        self.assertEqual(sorted(job.name for job in claimed),
+                         ["test_record", "test_single"])
+        self.assertEqual(jobs.claim("test", 10), [])
+
+    def test_capped_and_periodic_types_are_locked(self):
+        with mock.patch.object(jobs, "lock_job_types") as lock:
+            jobs.claim("test", 10)
+            locked = list(lock.call_args.args[0])
+            self.assertIn("test_single", locked)
+            self.assertNotIn("test_record", locked)
+
+            jobs.schedule_periodic()
+            lock.assert_any_call(["reconcile_tickets_sold_counters"])
+            lock.assert_any_call(["purge_expired_seat_holds"])
+
+    def test_requeue_stale(self):
+        job = jobs.enqueue("test_record", value=1)
+        jobs.claim("test", 1)
+        Job.objects.filter(pk=job.pk).update(
+            locked_at=timezone.now() - timedelta(hours=1)
+        )
+
+        self.assertEqual(jobs.requeue_stale(timedelta(minutes=10)), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.QUEUED)
+
+    def test_schedule_periodic(self):
+        jobs.schedule_periodic()
+        jobs.schedule_periodic()
+
+        self.assertEqual(
+            Job.objects.filter(name="reconcile_tickets_sold_counters").count(),
+            1,
+        )
+
+    def test_run_worker_once(self):
+        jobs.enqueue("test_record", value=1)
+        jobs.enqueue("test_record", value=2)
+        out = StringIO()
+
+        call_command("run_worker", "--once", "--concurrency", "1", stdout=out)
+
+        self.assertEqual(calls, [1, 2])
+        self.assertIn("Worker stopped.", out.getvalue())
@@ -0,0 +1,91 @@
+import json
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from planetarium.loading import iter_json_array, load
+from planetarium.models import (
+    AstronomyShow,
+    ShowSession,
+    ShowTheme,
+    Ticket,
+)
+
+
+def fixture(ticket_row=2):
+    records = [
+        {"model": "planetarium.ticket", "pk": 1,
+         "fields": {"row": ticket_row, "seat": 1, "show_session": 1,
+                    "reservation": 1}},
+        {"model": "planetarium.showtheme", "pk": 3,
+         "fields": {"name": "Deep Space"}},
+        {"model": "planetarium.astronomyshow", "pk": 1,
+         "fields": {"title": "Journey to Mars", "description": "Mars",
+                    "image": "", "themes": [3]}},
+        {"model": "planetarium.planetariumdome", "pk": 1,
+         "fields": {"name": "Main Dome", "rows": 5, "seats_in_row": 10}},
+        {"model": "planetarium.showsession", "pk": 1,
+         "fields": {"astronomy_show": 1, "planetarium_dome": 1,
+                    "show_time": "2026-02-10T18:00:00Z"}},
+        {"model": "user.user", "pk": 7,
+         "fields": {"password": "", "email": "user@test.com",
+                    "groups": [], "user_permissions": []}},
+        {"model": "planetarium.reservation", "pk": 1,
+         "fields": {"created_at": "2026-02-09T15:00:00Z", "user": 7}},
+        {"model": "sessions.session", "pk": "abc",
+         "fields": {"session_data": "",
+                    "expire_date": "2026-02-23T15:00:00Z"}},
+    ]
+    return StringIO(json.dumps(records, indent=4))
+
+
+class LoadPlanetariumDataTests(TestCase):
+    def test_iter_json_array_across_chunks(self):
+        records = list(iter_json_array(fixture(), chunk_size=7))
+
+        self.assertEqual(len(records), 8)
+        self.assertEqual(records[1]["fields"]["name"], "Deep Space")
+
+    def test_load_in_dependency_order(self):
+        counts = load([fixture()], batch_size=2, exclude={"sessions"})
+
+        self.assertEqual(counts["planetarium.Ticket"], 1)
+        self.assertNotIn("sessions.Session", counts)
+        show = AstronomyShow.objects.get(pk=1)
+        self.assertEqual(list(show.themes.values_list("name", flat=True)),
+                         ["Deep Space"])
+        self.assertEqual(ShowSession.objects.get(pk=1).tickets_sold, 1)
+        self.assertEqual(ShowTheme.objects.create(name="New").pk, 4)
+
+    def test_ticket_outside_dome_is_rejected(self):
+        with self.assertRaises(ValueError):
+            load([fixture(ticket_row=6)], exclude={"sessions"})
+
+        self.assertFalse(Ticket.objects.exists())
+        self.assertFalse(ShowSession.objects.exists())
+
+    def test_rerun_is_a_command_error(self):
+        load([fixture()], exclude={"sessions"})
+
+        with self.assertRaisesMessage(CommandError, "clash"):
+            with tempfile.NamedTemporaryFile("w", suffix=".json") as file:
+                file.write(fixture().getvalue())
+                file.flush()
+                call_command("load_planetarium_data", file.name,
+                             "--exclude", "sessions")
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_generate(self):
+        out = StringIO()
+
+        call_command("load_planetarium_data", "--generate", "10", stdout=out)
+
+        self.assertEqual(Ticket.objects.count(), 10)
+        self.assertIn("Data loaded.", out.getvalue())
+
+    def test_command_requires_input(self):
+        with self.assertRaises(CommandError):
+            call_command("load_planetarium_data")
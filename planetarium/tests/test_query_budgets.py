@@ -0,0 +1,43 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from planetarium import benchmarks
+from planetarium.seeding import seed
+
+
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(300, rows=5, seats_in_row=10, tickets_per_reservation=2,
+             users=3)
+
+    def test_endpoints_stay_within_query_budgets(self):
+        results = benchmarks.run()
+
+        self.assertEqual(len(results), len(benchmarks.ENDPOINTS))
+        for result in results:
+            with self.subTest(result["endpoint"]):
+                self.assertLess(max(result["statuses"]), 300)
+                self.assertLessEqual(result["queries"], result["budget"])
+
+    def test_command_writes_results(self):
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.json")
+
+            call_command("bench_endpoints", "--iterations", "3",
+                         "--endpoint", "tickets", "--endpoint", "user me",
+                         "--output", path, stdout=out)
+
+            with open(path) as output:
+                data = json.load(output)
+        self.assertEqual([result["endpoint"] for result in data["results"]],
+                         ["tickets", "user me"])
+        self.assertEqual(data["results"][0]["iterations"], 3)
+        self.assertIn("p95_ms", data["results"][0])
+        self.assertIn("tickets", out.getvalue())
@@ -0,0 +1,158 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from planetarium.models import (
+    AstronomyShow,
+    PlanetariumDome,
+    Reservation,
+    SeatHold,
+    ShowSession,
+    ShowTheme,
+    Ticket,
+)
+from planetarium.read_models import (
+    astronomy_show_list_items,
+    astronomy_show_list_values,
+    row_serializer,
+    show_session_list_items,
+    show_session_list_values,
+    ticket_list_items,
+    ticket_list_values,
+)
+from planetarium.seatmap import tickets_available
+from planetarium.serializers import (
+    AstronomyShowListSerializer,
+    ShowSessionListSerializer,
+    TicketListSerializer,
+)
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+class ReadModelTests(TestCase):
+    """The read models render byte for byte what the serializers do"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(
+            email="test@test.com", password="testpass"
+        )
+        themes = [ShowTheme.objects.create(name=name)
+                  for name in ("Stars", "Planets", "Black holes")]
+        image = "upload/astronomy-shows/mars--1.jpg"
+        shows = [
+            AstronomyShow.objects.create(
+                title="Mars", description="Red planet", image=image,
+                image_renditions={
+                    "source": image,
+                    "thumbnail": {
+                        "webp": "upload/astronomy-shows/renditions/mars--1/"
+                                "thumbnail.webp",
+                        "jpeg": "upload/astronomy-shows/renditions/mars--1/"
+                                "thumbnail.jpeg",
+                    },
+                },
+            ),
+            AstronomyShow.objects.create(title="Void", description="Dark"),
+        ]
+        shows[0].themes.set(themes[:2])
+        shows[1].themes.set(themes[1:])
+        dome = PlanetariumDome.objects.create(name="Main", rows=3,
+                                              seats_in_row=4)
+        sessions = [
+            ShowSession.objects.create(
+                astronomy_show=show,
+                planetarium_dome=dome,
+                show_time=timezone.now() + timedelta(days=number),
+            )
+            for number, show in enumerate(shows * 2)
+        ]
+        reservation = Reservation.objects.create(user=user)
+        for number, session in enumerate(sessions[:3]):
+            Ticket.objects.create(show_session=session,
+                                  reservation=reservation, row=1,
+                                  seat=number + 1)
+        SeatHold.objects.create(
+            user=user, show_session=sessions[0], row=2, seat=1,
+            expires_at=timezone.now() + timedelta(minutes=5),
+        )
+
+    def setUp(self):
+        self.request = APIRequestFactory().get("/")
+
+    def test_show_session_list(self):
+        queryset = ShowSession.objects.order_by("id")
+        expected = ShowSessionListSerializer(
+            queryset.select_related("astronomy_show", "planetarium_dome")
+            .annotate(tickets_available=tickets_available()),
+            many=True,
+            context={"request": self.request},
+        ).data
+
+        self.assertEqual(
+            render(show_session_list_items(
+                show_session_list_values(queryset), self.request
+            )),
+            render(expected),
+        )
+
+    def test_astronomy_show_list(self):
+        queryset = AstronomyShow.objects.order_by("id")
+        expected = AstronomyShowListSerializer(
+            queryset.prefetch_related("themes"),
+            many=True,
+            context={"request": self.request},
+        ).data
+
+        with self.assertNumQueries(2):
+            data = astronomy_show_list_items(
+                astronomy_show_list_values(queryset), self.request
+            )
+        self.assertEqual(render(data), render(expected))
+        self.assertIn("thumbnail", data[0]["image"])
+
+    def test_ticket_list(self):
+        available = dict(
+            ShowSession.objects.annotate(
+                tickets_available=tickets_available()
+            ).values_list("id", "tickets_available")
+        )
+        tickets = list(Ticket.objects.select_related(
+            "show_session__astronomy_show", "show_session__planetarium_dome"
+        ))
+        for ticket in tickets:
+            ticket.show_session.tickets_available = available[
+                ticket.show_session_id
+            ]
+        expected = TicketListSerializer(
+            tickets, many=True, context={"request": self.request}
+        ).data
+
+        self.assertEqual(
+            render(ticket_list_items(
+                ticket_list_values(Ticket.objects.all()), self.request
+            )),
+            render(expected),
+        )
+
+    def test_row_serializer_rejects_unknown_fields(self):
+        with self.assertRaises(ValueError):
+            row_serializer(("id",), name=str)
+
+    def test_bench_list_serializers(self):
+        out = StringIO()
+
+        call_command("bench_list_serializers", "--rows", "3", "--repeat",
+                     "1", stdout=out)
+
+        self.assertIn("show sessions", out.getvalue())
+        self.assertIn("astronomy shows", out.getvalue())
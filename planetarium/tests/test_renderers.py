@@ -0,0 +1,83 @@
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from planetarium.parsers import FastJSONParser
+from planetarium.renderers import FastJSONRenderer
+from planetarium.seeding import seed
+
+
+PAYLOAD = ReturnDict({
+    "id": 1,
+    "price": Decimal("12.50"),
+    "created_at": datetime(2026, 2, 9, 15, 0, 0, 123456,
+                           tzinfo=timezone.utc),
+    "date": date(2026, 2, 9),
+    "duration": timedelta(minutes=90),
+    "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "detail": gettext_lazy("Not found."),
+    "title": "Sirius\u2028Vega\u2029Ünïcödé",
+    "tickets": ReturnList([{"row": 1, "seat": 2}], serializer=None),
+    "empty": None,
+}, serializer=None)
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def test_same_output_as_json_renderer(self):
+        self.assertEqual(FastJSONRenderer().render(PAYLOAD),
+                         JSONRenderer().render(PAYLOAD))
+
+    def test_indent_falls_back_to_json_renderer(self):
+        rendered = FastJSONRenderer().render(
+            {"id": 1}, "application/json; indent=4"
+        )
+
+        self.assertEqual(rendered, b'{\n    "id": 1\n}')
+
+    def test_without_orjson(self):
+        with mock.patch.object(FastJSONRenderer, "use_orjson", False):
+            self.assertEqual(FastJSONRenderer().render(PAYLOAD),
+                             JSONRenderer().render(PAYLOAD))
+
+    def test_none_renders_empty(self):
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+
+class FastJSONParserTests(SimpleTestCase):
+    def parse(self, body, parser_class=FastJSONParser):
+        return parser_class().parse(BytesIO(body), "application/json", {})
+
+    def test_parse(self):
+        body = JSONRenderer().render(PAYLOAD)
+
+        self.assertEqual(self.parse(body), self.parse(body, JSONParser))
+
+    def test_invalid_json(self):
+        for body in (b'{"row": 1', b'{"row": NaN}'):
+            with self.assertRaises(ParseError):
+                self.parse(body)
+
+    def test_without_orjson(self):
+        with mock.patch.object(FastJSONParser, "use_orjson", False):
+            self.assertEqual(self.parse(b'{"seat": 3}'), {"seat": 3})
+
+
+class BenchJSONTests(TestCase):
+    def test_bench_json(self):
+        seed(20, rows=2, seats_in_row=5, users=2)
+        out = StringIO()
+
+        call_command("bench_json", "--rows", "10", "--repeat", "1",
+                     stdout=out)
+
+        self.assertIn("reservations", out.getvalue())
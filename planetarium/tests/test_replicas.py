@@ -0,0 +1,171 @@
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from planetarium.models import (
+    AstronomyShow,
+    PlanetariumDome,
+    ShowSession,
+)
+from planetarium.tests.test_reservation import RESERVATION_URL
+from planetarium_api.replicas import (
+    ReplicaMiddleware,
+    ReplicaRouter,
+    read_from_replica,
+    sticky_key,
+)
+from user.authentication import CachedJWTAuthentication
+
+
+@override_settings(PLANETARIUM_DB_REPLICAS=["replica"])
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_use_primary_by_default(self):
+        self.assertEqual(self.router.db_for_read(ShowSession), "default")
+
+    def test_reads_of_safe_requests_use_replica(self):
+        token = read_from_replica.set(True)
+        self.addCleanup(read_from_replica.reset, token)
+
+        self.assertEqual(self.router.db_for_read(ShowSession), "replica")
+        self.assertEqual(self.router.db_for_write(ShowSession), "default")
+
+    @override_settings(PLANETARIUM_DB_REPLICAS=[])
+    def test_without_replicas(self):
+        token = read_from_replica.set(True)
+        self.addCleanup(read_from_replica.reset, token)
+
+        self.assertEqual(self.router.db_for_read(ShowSession), "default")
+
+    def test_relations_and_migrations(self):
+        show, dome = AstronomyShow(), PlanetariumDome()
+        show._state.db, dome._state.db = "replica", "default"
+
+        self.assertTrue(self.router.allow_relation(show, dome))
+        self.assertFalse(self.router.allow_migrate("replica", "planetarium"))
+        self.assertIsNone(self.router.allow_migrate("default", "planetarium"))
+
+
+class ReplicaMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "replica@example.com", "password"
+        )
+        cache.delete(sticky_key(self.user.pk))
+        self.addCleanup(cache.delete, sticky_key(self.user.pk))
+
+    def call(self, method, user=None, status_code=200):
+        seen = {}
+
+        def get_response(request):
+            request.user = user or AnonymousUser()
+            seen["replica"] = read_from_replica.get()
+            return HttpResponse(status=status_code)
+
+        request = getattr(RequestFactory(), method)("/")
+        ReplicaMiddleware(get_response)(request)
+        return seen["replica"]
+
+    def test_safe_requests_may_read_from_replica(self):
+        self.assertTrue(self.call("get"))
+        self.assertFalse(self.call("post"))
+        self.assertFalse(read_from_replica.get())
+
+    def test_writes_stick_user_to_primary(self):
+        self.call("post", self.user, status_code=400)
+        self.assertIsNone(cache.get(sticky_key(self.user.pk)))
+
+        self.call("post", self.user, status_code=201)
+        self.assertTrue(cache.get(sticky_key(self.user.pk)))
+
+    def test_authentication_reads_sticky_user_from_primary(self):
+        token = AccessToken.for_user(self.user)
+        authentication = CachedJWTAuthentication()
+
+        def get_response(request):
+            authentication.get_user(token)
+            return HttpResponse(read_from_replica.get())
+
+        middleware = ReplicaMiddleware(get_response)
+        self.assertEqual(middleware(RequestFactory().get("/")).content,
+                         b"True")
+
+        cache.set(sticky_key(self.user.pk), True)
+        self.assertEqual(middleware(RequestFactory().get("/")).content,
+                         b"False")
+
+
+@override_settings(PLANETARIUM_DB_REPLICAS=["replica"])
+class ReplicaRoutingTests(TransactionTestCase):
+    """Route through a second alias of the test database"""
+
+    databases = "__all__"
+
+    @classmethod
+    def setUpClass(cls):
+        connections.settings["replica"] = {
+            **connections["default"].settings_dict,
+            "TEST": {"MIRROR": "default"},
+        }
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections["replica"].close()
+        del connections["replica"]
+        del connections.settings["replica"]
+
+    def setUp(self):
+        self.replica = connections["replica"]
+        self.user = get_user_model().objects.create_user(
+            "replica@example.com", "password"
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        self.show_session = ShowSession.objects.create(
+            astronomy_show=AstronomyShow.objects.create(title="Show"),
+            planetarium_dome=PlanetariumDome.objects.create(
+                name="Dome", rows=5, seats_in_row=5
+            ),
+            show_time=timezone.now() + timedelta(days=1),
+        )
+        cache.clear()
+
+    def test_reservations_are_read_from_primary_after_booking(self):
+        with CaptureQueriesContext(self.replica) as replica_queries:
+            res = self.client.get(RESERVATION_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(replica_queries.captured_queries)
+
+        res = self.client.post(
+            RESERVATION_URL,
+            {"tickets": [{"show_session": self.show_session.id,
+                          "row": 1, "seat": 1}]},
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        with CaptureQueriesContext(self.replica) as replica_queries:
+            res = self.client.get(RESERVATION_URL)
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertEqual(replica_queries.captured_queries, [])
@@ -1,6 +1,8 @@
 from datetime import timedelta
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.reverse import reverse
@@ -78,6 +80,20 @@ class AuthenticatedReservationTests(TestCase):
         self.assertEqual(len(res.data["results"]), 1)
         self.assertEqual(res.data["results"][0]["id"], reservation.id)
 
+    def test_list_reservations_cursor_pagination(self):
+        reservations = [
+            Reservation.objects.create(user=self.user) for _ in range(3)
+        ]
+
+        res = self.client.get(RESERVATION_URL, {"pagination": "cursor"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", res.data)
+        self.assertEqual(
+            [reservation["id"] for reservation in res.data["results"]],
+            [reservation.id for reservation in reversed(reservations)],
+        )
+
     def test_create_reservation(self):
         show_session = sample_show_session()
         payload = {
@@ -93,6 +109,74 @@ class AuthenticatedReservationTests(TestCase):
         self.assertEqual(reservation.user, self.user)
         self.assertEqual(reservation.tickets.count(), 2)
 
+    def test_create_reservation_query_count_is_fixed(self):
+        show_session = sample_show_session(
+            planetarium_dome=sample_planetarium_dome(rows=5, seats_in_row=10)
+        )
+
+        def book(row, seats):
+            payload = {
+                "tickets": [
+                    {"show_session": show_session.id, "row": row, "seat": seat}
+                    for seat in seats
+                ]
+            }
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.post(RESERVATION_URL, payload, format="json")
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            return len(queries)
+
+        single = book(1, [1])
+        group = book(2, range(1, 11))
+
+        self.assertEqual(single, group)
+        self.assertEqual(Ticket.objects.count(), 11)
+
+    def test_create_reservation_reports_taken_seats(self):
+        show_session = sample_show_session()
+        reservation = Reservation.objects.create(user=self.user)
+        Ticket.objects.create(
+            show_session=show_session, reservation=reservation, row=1, seat=2
+        )
+        payload = {
+            "tickets": [
+                {"show_session": show_session.id, "row": 1, "seat": 1},
+                {"show_session": show_session.id, "row": 1, "seat": 2},
+            ]
+        }
+        res = self.client.post(RESERVATION_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["tickets"][0], {})
+        self.assertIn("seat", res.data["tickets"][1])
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_create_reservation_duplicate_seat_in_request(self):
+        show_session = sample_show_session()
+        ticket = {"show_session": show_session.id, "row": 1, "seat": 1}
+        res = self.client.post(
+            RESERVATION_URL, {"tickets": [ticket, ticket]}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("seat", res.data["tickets"][1])
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_create_reservation_invalid_row_and_session(self):
+        show_session = sample_show_session()
+        payload = {
+            "tickets": [
+                {"show_session": show_session.id, "row": 99, "seat": 1},
+                {"show_session": show_session.id + 100, "row": 1, "seat": 1},
+            ]
+        }
+        res = self.client.post(RESERVATION_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("row", res.data["tickets"][0])
+        self.assertIn("show_session", res.data["tickets"][1])
+        self.assertFalse(Reservation.objects.exists())
+
     def test_create_reservation_empty_tickets(self):
         payload = {"tickets": []}
         res = self.client.post(RESERVATION_URL, payload, format="json")
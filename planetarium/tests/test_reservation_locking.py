@@ -0,0 +1,132 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework import serializers, status
+from rest_framework.test import APIClient
+
+from planetarium import booking
+from planetarium.management.commands.stress_reservations import run_burst
+from planetarium.models import Reservation, Ticket
+from planetarium.tests.test_reservation import (
+    RESERVATION_URL,
+    sample_show_session,
+)
+
+
+class ReservationLockingTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "locking@example.com", "password"
+        )
+        self.show_session = sample_show_session()
+
+    def tickets_data(self, *seats):
+        return [
+            {"show_session_id": self.show_session.id, "row": 1, "seat": seat}
+            for seat in seats
+        ]
+
+    def test_reserve_with_every_strategy(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        for seat, locking in enumerate(booking.RESERVATION_LOCKING, 1):
+            with self.subTest(locking=locking), override_settings(
+                PLANETARIUM_RESERVATION_LOCKING=locking
+            ):
+                res = client.post(
+                    RESERVATION_URL,
+                    {"tickets": [{"show_session": self.show_session.id,
+                                  "row": 1, "seat": seat}]},
+                    format="json",
+                )
+
+                self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.show_session.refresh_from_db()
+        self.assertEqual(self.show_session.tickets_sold, 4)
+
+    def test_seats_sold_after_validation_are_reported(self):
+        Ticket.objects.create(
+            reservation=Reservation.objects.create(user=self.user),
+            show_session=self.show_session, row=1, seat=2,
+        )
+        for locking in booking.RESERVATION_LOCKING:
+            with self.subTest(locking=locking):
+                with self.assertRaises(serializers.ValidationError) as error:
+                    with transaction.atomic():
+                        reservation = Reservation.objects.create(
+                            user=self.user
+                        )
+                        booking.create_tickets(
+                            reservation, self.tickets_data(1, 2), locking
+                        )
+
+                self.assertEqual(error.exception.detail["tickets"][0], {})
+                self.assertIn("seat", error.exception.detail["tickets"][1])
+                self.assertEqual(Ticket.objects.count(), 1)
+        self.show_session.refresh_from_db()
+        self.assertEqual(self.show_session.tickets_sold, 1)
+
+    def test_own_held_seats_are_not_reported(self):
+        booking.hold_seats(self.user, self.tickets_data(1))
+        Ticket.objects.create(
+            reservation=Reservation.objects.create(user=self.user),
+            show_session=self.show_session, row=1, seat=2,
+        )
+        for locking in booking.RESERVATION_LOCKING:
+            with self.subTest(locking=locking):
+                with self.assertRaises(serializers.ValidationError) as error:
+                    with transaction.atomic():
+                        booking.create_tickets(
+                            Reservation.objects.create(user=self.user),
+                            self.tickets_data(1, 2), locking,
+                        )
+
+                self.assertEqual(error.exception.detail["tickets"][0], {})
+                self.assertIn("seat", error.exception.detail["tickets"][1])
+
+    def test_locks_recheck_seats_held_by_others(self):
+        other = get_user_model().objects.create_user("other@example.com",
+                                                     "password")
+        booking.hold_seats(other, self.tickets_data(3))
+        for locking in ("session", "advisory"):
+            with self.subTest(locking=locking):
+                with self.assertRaises(serializers.ValidationError):
+                    with transaction.atomic():
+                        booking.create_tickets(
+                            Reservation.objects.create(user=self.user),
+                            self.tickets_data(3), locking,
+                        )
+
+    def test_unknown_strategy(self):
+        with override_settings(PLANETARIUM_RESERVATION_LOCKING="retry"):
+            with self.assertRaises(ImproperlyConfigured):
+                with transaction.atomic():
+                    booking.create_tickets(
+                        Reservation.objects.create(user=self.user),
+                        self.tickets_data(1),
+                    )
+
+    @skipUnless(connection.vendor != "postgresql", "Needs another database")
+    def test_stress_command_needs_postgres(self):
+        with self.assertRaises(CommandError):
+            call_command("stress_reservations")
+
+
+@skipUnless(connection.vendor == "postgresql", "Needs PostgreSQL")
+class ReservationBurstTests(TransactionTestCase):
+    def test_no_seat_is_sold_twice(self):
+        for locking in booking.RESERVATION_LOCKING:
+            with self.subTest(locking=locking):
+                result = run_burst(locking, buyers=40, concurrency=8,
+                                   hot_seats=12)
+
+                self.assertEqual(result["errors"], 0, result["first_error"])
+                self.assertEqual(result["bookings"] + result["conflicts"], 40)
+                self.assertEqual(result["double_booked"], [])
+                self.assertEqual(result["tickets_sold"],
+                                 2 * result["bookings"])
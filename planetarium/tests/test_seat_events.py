@@ -0,0 +1,301 @@
+import asyncio
+import json
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from planetarium import events
+from planetarium.models import (
+    AstronomyShow,
+    PlanetariumDome,
+    ShowSession,
+    Reservation,
+    Ticket,
+)
+
+RESERVATION_URL = reverse("planetarium:reservation-list")
+SEAT_HOLD_URL = reverse("planetarium:seathold-list")
+
+
+def events_url(show_session_id):
+    return reverse("planetarium:showsession-events", args=[show_session_id])
+
+
+def sample_show_session(**kwargs):
+    astronomy_show = AstronomyShow.objects.create(
+        title="Sample Show", description="Sample Description"
+    )
+    planetarium_dome = PlanetariumDome.objects.create(
+        name="Dome 1", rows=10, seats_in_row=15
+    )
+    defaults = {
+        "astronomy_show": astronomy_show,
+        "planetarium_dome": planetarium_dome,
+        "show_time": timezone.now() + timedelta(days=1),
+    }
+    defaults.update(kwargs)
+    return ShowSession.objects.create(**defaults)
+
+
+def parse_event(chunk):
+    lines = dict(
+        line.split(": ", 1) for line in chunk.decode().strip().split("\n")
+    )
+    return lines["event"], json.loads(lines["data"])
+
+
+class RecordingHub(events.LocalHub):
+    published = []
+
+    def publish(self, show_session_id, event):
+        self.published.append((show_session_id, event))
+
+
+class LocalHubTests(TestCase):
+    async def test_publish_reaches_subscribers_of_the_session(self):
+        hub = events.LocalHub()
+        queue = hub.subscribe(1)
+        other_queue = hub.subscribe(2)
+
+        await asyncio.to_thread(hub.publish, 1, {"type": "taken"})
+
+        self.assertEqual(await queue.get(), {"type": "taken"})
+        self.assertTrue(other_queue.empty())
+
+        hub.unsubscribe(1, queue)
+        hub.unsubscribe(2, other_queue)
+        self.assertEqual(hub.subscribers, {})
+
+    async def test_slow_subscriber_gets_resync(self):
+        hub = events.LocalHub()
+        hub.queue_size = 2
+        queue = hub.subscribe(1)
+
+        for _ in range(3):
+            hub.publish(1, {"type": "taken"})
+        await asyncio.sleep(0)
+
+        self.assertIs(await queue.get(), events.RESYNC)
+        self.assertTrue(queue.empty())
+
+
+@override_settings(
+    PLANETARIUM_SEAT_EVENT_HUB="planetarium.tests.test_seat_events."
+                               "RecordingHub"
+)
+class SeatEventPublishingTests(TestCase):
+    def setUp(self):
+        events.get_hub.cache_clear()
+        RecordingHub.published = []
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="testpass"
+        )
+        self.client.force_authenticate(self.user)
+        self.show_session = sample_show_session()
+
+    def tearDown(self):
+        events.get_hub.cache_clear()
+
+    def test_reservation_publishes_taken_seats_on_commit(self):
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": 1, "show_session": self.show_session.id},
+                {"row": 1, "seat": 2, "show_session": self.show_session.id},
+            ]
+        }
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            res = self.client.post(RESERVATION_URL, payload, format="json")
+            self.assertEqual(RecordingHub.published, [])
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(RecordingHub.published, [(
+            self.show_session.id,
+            {"type": "taken", "seats": [{"row": 1, "seat": 1},
+                                        {"row": 1, "seat": 2}]},
+        )])
+
+    def test_invalid_reservation_publishes_nothing(self):
+        payload = {
+            "tickets": [
+                {"row": 99, "seat": 1, "show_session": self.show_session.id}
+            ]
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(RESERVATION_URL, payload, format="json")
+
+        self.assertEqual(RecordingHub.published, [])
+
+    def test_ticket_delete_publishes_released_seat(self):
+        ticket = Ticket.objects.create(
+            show_session=self.show_session,
+            reservation=Reservation.objects.create(user=self.user),
+            row=3,
+            seat=4,
+        )
+        RecordingHub.published = []
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket.delete()
+
+        self.assertEqual(RecordingHub.published, [(
+            self.show_session.id,
+            {"type": "released", "seats": [{"row": 3, "seat": 4}]},
+        )])
+
+    def test_ticket_seat_change_publishes_both_seats(self):
+        ticket = Ticket.objects.create(
+            show_session=self.show_session,
+            reservation=Reservation.objects.create(user=self.user),
+            row=3,
+            seat=4,
+        )
+        RecordingHub.published = []
+
+        ticket.seat = 5
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket.save()
+
+        self.assertEqual(RecordingHub.published, [
+            (self.show_session.id,
+             {"type": "released", "seats": [{"row": 3, "seat": 4}]}),
+            (self.show_session.id,
+             {"type": "taken", "seats": [{"row": 3, "seat": 5}]}),
+        ])
+
+    def test_seat_hold_and_release_publish(self):
+        payload = {
+            "seats": [{"row": 2, "seat": 2,
+                       "show_session": self.show_session.id}]
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            hold_id = self.client.post(
+                SEAT_HOLD_URL, payload, format="json"
+            ).data[0]["id"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"{SEAT_HOLD_URL}{hold_id}/")
+
+        self.assertEqual(
+            [event["type"] for _, event in RecordingHub.published],
+            ["taken", "released"],
+        )
+
+
+class SeatEventStreamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            email="test@test.com", password="testpass"
+        )
+        cls.show_session = sample_show_session()
+        Ticket.objects.create(
+            show_session=cls.show_session,
+            reservation=Reservation.objects.create(user=cls.user),
+            row=1,
+            seat=1,
+        )
+        token = AccessToken.for_user(cls.user)
+        cls.headers = {"Authorization": f"Bearer {token}"}
+
+    def setUp(self):
+        events.get_hub.cache_clear()
+
+    async def test_snapshot_then_deltas(self):
+        res = await self.async_client.get(
+            events_url(self.show_session.id), headers=self.headers
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "text/event-stream")
+        stream = aiter(res.streaming_content)
+
+        event, data = parse_event(await anext(stream))
+        self.assertEqual(event, "snapshot")
+        self.assertEqual(data["taken_seats"], [{"row": 1, "seat": 1}])
+
+        events.publish_seats(events.SEATS_RELEASED,
+                             [(self.show_session.id, 1, 1)])
+        events.publish_seats(events.SEATS_TAKEN,
+                             [(self.show_session.id + 1, 2, 2)])
+        events.publish_seats(events.SEATS_TAKEN,
+                             [(self.show_session.id, 5, 6)])
+
+        event, data = parse_event(await anext(stream))
+        self.assertEqual((event, data),
+                         ("released", {"seats": [{"row": 1, "seat": 1}]}))
+        event, data = parse_event(await anext(stream))
+        self.assertEqual((event, data),
+                         ("taken", {"seats": [{"row": 5, "seat": 6}]}))
+
+        # A client disconnect cancels the task reading the stream
+        reader = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        reader.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await reader
+        self.assertEqual(events.get_hub().subscribers, {})
+
+    def test_wsgi_is_rejected(self):
+        res = self.client.get(events_url(self.show_session.id),
+                              headers=self.headers)
+
+        self.assertEqual(res.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+
+    async def test_auth_required_and_not_found(self):
+        res = await self.async_client.get(events_url(self.show_session.id))
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        res = await self.async_client.get(events_url(999),
+                                          headers=self.headers)
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class PostgresHubTests(TestCase):
+    def setUp(self):
+        self.hub = events.PostgresHub()
+        self.delivered = []
+        self.hub.deliver = lambda show_session_id, event: (
+            self.delivered.append((show_session_id, event))
+        )
+        self.notify = SimpleNamespace(payload=json.dumps(
+            {"show_session": 1, "type": "taken", "seats": []}
+        ))
+
+    def listen_once(self, listener, is_psycopg3):
+        with mock.patch.object(connection, "Database") as database, \
+                mock.patch.object(connection, "get_connection_params",
+                                  return_value={}), \
+                mock.patch("django.db.backends.postgresql.psycopg_any"
+                           ".is_psycopg3", is_psycopg3):
+            database.connect.return_value = listener
+            try:
+                self.hub.listen_once()
+            except OSError:
+                pass
+        listener.close.assert_called_once()
+        self.assertEqual(self.delivered,
+                         [(1, {"type": "taken", "seats": []})])
+
+    def test_listen_with_psycopg3(self):
+        listener = mock.MagicMock()
+        listener.notifies.return_value = iter([self.notify])
+
+        self.listen_once(listener, is_psycopg3=True)
+
+    def test_listen_with_psycopg2(self):
+        listener = mock.MagicMock()
+        listener.notifies = [self.notify]
+
+        # The second select fails like a dropped connection
+        with mock.patch("planetarium.events.select.select",
+                        side_effect=[([listener], [], []), OSError]):
+            self.listen_once(listener, is_psycopg3=False)
@@ -0,0 +1,190 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from planetarium.jobs import registry
+from planetarium.models import (
+    AstronomyShow,
+    PlanetariumDome,
+    ShowSession,
+    Reservation,
+    SeatHold,
+)
+from planetarium.tasks import purge_expired_seat_holds
+
+SEAT_HOLD_URL = reverse("planetarium:seathold-list")
+SEAT_HOLD_RESERVE_URL = reverse("planetarium:seathold-reserve")
+RESERVATION_URL = reverse("planetarium:reservation-list")
+SHOW_SESSION_URL = reverse("planetarium:showsession-list")
+
+
+def seat_hold_detail_url(seat_hold_id):
+    return reverse("planetarium:seathold-detail", args=[seat_hold_id])
+
+
+def sample_show_session(**kwargs):
+    astronomy_show = AstronomyShow.objects.create(
+        title="Sample Show", description="Sample Description"
+    )
+    planetarium_dome = PlanetariumDome.objects.create(
+        name="Dome 1", rows=10, seats_in_row=15
+    )
+    defaults = {
+        "astronomy_show": astronomy_show,
+        "planetarium_dome": planetarium_dome,
+        "show_time": timezone.now() + timedelta(days=1),
+    }
+    defaults.update(kwargs)
+    return ShowSession.objects.create(**defaults)
+
+
+class UnAuthenticatedSeatHoldTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        res = self.client.get(SEAT_HOLD_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AuthenticatedSeatHoldTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="testpass"
+        )
+        self.client.force_authenticate(self.user)
+        self.other_client = APIClient()
+        self.other_user = get_user_model().objects.create_user(
+            email="other@test.com", password="testpass"
+        )
+        self.other_client.force_authenticate(self.other_user)
+        self.show_session = sample_show_session()
+
+    def seats(self, *seats):
+        return [
+            {"show_session": self.show_session.id, "row": 1, "seat": seat}
+            for seat in seats
+        ]
+
+    def test_hold_seats(self):
+        res = self.client.post(
+            SEAT_HOLD_URL, {"seats": self.seats(1, 2)}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 2)
+        self.assertEqual(SeatHold.objects.filter(user=self.user).count(), 2)
+
+    def test_held_seats_count_as_taken(self):
+        self.client.post(SEAT_HOLD_URL, {"seats": self.seats(1)},
+                         format="json")
+
+        res = self.other_client.get(
+            reverse("planetarium:showsession-detail",
+                    args=[self.show_session.id])
+        )
+        self.assertEqual(res.data["taken_seats"], [{"row": 1, "seat": 1}])
+
+        res = self.other_client.get(SHOW_SESSION_URL)
+        self.assertEqual(res.data["results"][0]["tickets_available"], 149)
+
+    def test_seat_held_by_other_user_is_unavailable(self):
+        self.client.post(SEAT_HOLD_URL, {"seats": self.seats(1)},
+                         format="json")
+
+        res = self.other_client.post(
+            SEAT_HOLD_URL, {"seats": self.seats(1)}, format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("seat", res.data["seats"][0])
+
+        res = self.other_client.post(
+            RESERVATION_URL, {"tickets": self.seats(1)}, format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_expired_hold_frees_seat(self):
+        SeatHold.objects.create(
+            show_session=self.show_session,
+            user=self.user,
+            row=1,
+            seat=1,
+            expires_at=timezone.now() - timedelta(seconds=1),
+        )
+
+        res = self.other_client.post(
+            SEAT_HOLD_URL, {"seats": self.seats(1)}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SeatHold.objects.get().user, self.other_user)
+        self.assertFalse(self.client.get(SEAT_HOLD_URL).data["results"])
+
+    def test_reserve_held_seats(self):
+        self.client.post(SEAT_HOLD_URL, {"seats": self.seats(1, 2)},
+                         format="json")
+
+        res = self.client.post(SEAT_HOLD_RESERVE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        reservation = Reservation.objects.get(id=res.data["id"])
+        self.assertEqual(reservation.user, self.user)
+        self.assertEqual(reservation.tickets.count(), 2)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_reserve_without_holds(self):
+        res = self.client.post(SEAT_HOLD_RESERVE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_release_hold(self):
+        res = self.client.post(SEAT_HOLD_URL, {"seats": self.seats(1)},
+                               format="json")
+
+        version = ShowSession.objects.get(pk=self.show_session.pk).version
+
+        res = self.client.delete(seat_hold_detail_url(res.data[0]["id"]))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(SeatHold.objects.exists())
+        self.show_session.refresh_from_db()
+        self.assertEqual(self.show_session.version, version + 1)
+
+    def test_purge_expired_holds_bumps_version(self):
+        SeatHold.objects.create(
+            show_session=self.show_session,
+            user=self.user,
+            row=1,
+            seat=1,
+            expires_at=timezone.now() - timedelta(seconds=1),
+        )
+
+        call_command("purge_seat_holds", stdout=StringIO())
+
+        self.assertFalse(SeatHold.objects.exists())
+        self.show_session.refresh_from_db()
+        self.assertEqual(self.show_session.version, 1)
+
+    def test_workers_purge_expired_holds(self):
+        SeatHold.objects.create(
+            show_session=self.show_session,
+            user=self.user,
+            row=1,
+            seat=1,
+            expires_at=timezone.now() - timedelta(seconds=1),
+        )
+
+        self.assertIsNotNone(registry["purge_expired_seat_holds"].every)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            purge_expired_seat_holds()
+
+        self.assertFalse(SeatHold.objects.exists())
+        self.assertEqual(len(callbacks), 1)
@@ -1,24 +1,39 @@
+import base64
 from datetime import datetime, timedelta
+from io import StringIO
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.management import call_command
+from django.test import Client, TestCase
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
 from planetarium.models import (
     AstronomyShow,
     PlanetariumDome,
     ShowSession,
+    Reservation,
+    SeatHold,
+    Ticket,
 )
 
 SHOW_SESSION_URL = reverse("planetarium:showsession-list")
+ASYNC_SHOW_SESSION_URL = reverse("planetarium:async-showsession-list")
 
 
 def detail_url(show_session_id):
     return reverse("planetarium:showsession-detail", args=[show_session_id])
 
 
+def async_seat_map_url(show_session_id):
+    return reverse(
+        "planetarium:async-showsession-seat-map", args=[show_session_id]
+    )
+
+
 def sample_astronomy_show(**kwargs):
     defaults = {"title": "Sample Show", "description": "Sample Description"}
     defaults.update(kwargs)
@@ -70,6 +85,50 @@ class AuthenticatedShowSessionTests(TestCase):
         self.assertEqual(len(res.data["results"]), 2)
         self.assertIn("tickets_available", res.data["results"][0])
 
+    def test_list_show_sessions_tickets_available(self):
+        dome = sample_planetarium_dome(rows=2, seats_in_row=5)
+        show_session = sample_show_session(planetarium_dome=dome)
+        reservation = Reservation.objects.create(user=self.user)
+        Ticket.objects.create(
+            show_session=show_session, reservation=reservation, row=1, seat=1
+        )
+
+        res = self.client.get(SHOW_SESSION_URL)
+
+        self.assertEqual(res.data["results"][0]["tickets_available"], 9)
+
+    def test_list_show_sessions_cursor_pagination(self):
+        show_time = timezone.now() + timedelta(days=1)
+        sessions = [
+            sample_show_session(show_time=show_time + timedelta(hours=hours))
+            for hours in (3, 1, 2)
+        ]
+
+        res = self.client.get(
+            SHOW_SESSION_URL, {"pagination": "cursor", "limit": 2}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", res.data)
+        self.assertEqual(
+            [session["id"] for session in res.data["results"]],
+            [sessions[1].id, sessions[2].id],
+        )
+
+        res = self.client.get(res.data["next"])
+
+        self.assertEqual(
+            [session["id"] for session in res.data["results"]],
+            [sessions[0].id],
+        )
+        self.assertIsNone(res.data["next"])
+
+    def test_list_show_sessions_invalid_pagination(self):
+        res = self.client.get(SHOW_SESSION_URL, {"pagination": "pages"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("pagination", res.data)
+
     def test_filter_show_sessions_by_date(self):
         show_time_1 = timezone.now() + timedelta(days=1)
         show_time_2 = timezone.now() + timedelta(days=2)
@@ -83,6 +142,18 @@ class AuthenticatedShowSessionTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(len(res.data["results"]), 1)
 
+    def test_filter_show_sessions_by_date_is_half_open(self):
+        midnight = timezone.make_aware(datetime(2030, 1, 2))
+        inside = sample_show_session(show_time=midnight)
+        sample_show_session(show_time=midnight + timedelta(days=1))
+        sample_show_session(show_time=midnight - timedelta(microseconds=1))
+
+        res = self.client.get(SHOW_SESSION_URL, {"date": "2030-01-02"})
+
+        self.assertEqual(
+            [session["id"] for session in res.data["results"]], [inside.id]
+        )
+
     def test_filter_show_sessions_invalid_date_format(self):
         res = self.client.get(SHOW_SESSION_URL, {"date": "invalid-date"})
 
@@ -98,6 +169,93 @@ class AuthenticatedShowSessionTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data["id"], show_session.id)
 
+    def test_retrieve_show_session_seatmap_bitmap(self):
+        dome = sample_planetarium_dome(rows=2, seats_in_row=5)
+        show_session = sample_show_session(planetarium_dome=dome)
+        reservation = Reservation.objects.create(user=self.user)
+        for row, seat in ((1, 1), (2, 3)):
+            Ticket.objects.create(
+                show_session=show_session,
+                reservation=reservation,
+                row=row,
+                seat=seat,
+            )
+
+        res = self.client.get(
+            detail_url(show_session.id), {"seatmap": "bitmap"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        bitmap = base64.b64decode(res.data["taken_seats"])
+        self.assertEqual(bitmap, bytes([0b10000001, 0b00000000]))
+
+    def test_retrieve_show_session_seatmap_invalid(self):
+        show_session = sample_show_session()
+
+        res = self.client.get(detail_url(show_session.id), {"seatmap": "x"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("seatmap", res.data)
+
+    def test_retrieve_show_session_not_modified(self):
+        show_session = sample_show_session()
+        url = detail_url(show_session.id)
+        etag = self.client.get(url)["ETag"]
+
+        with self.assertNumQueries(1):
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+
+        Ticket.objects.create(
+            show_session=show_session,
+            reservation=Reservation.objects.create(user=self.user),
+            row=1,
+            seat=1,
+        )
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+        self.assertEqual(len(res.data["taken_seats"]), 1)
+
+    def test_list_show_sessions_not_modified(self):
+        show_session = sample_show_session()
+        etag = self.client.get(SHOW_SESSION_URL)["ETag"]
+
+        res = self.client.get(SHOW_SESSION_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        show_session.show_time += timedelta(hours=1)
+        show_session.save()
+        res = self.client.get(SHOW_SESSION_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_list_show_sessions_etag_follows_holds(self):
+        show_session = sample_show_session()
+        etags = [self.client.get(SHOW_SESSION_URL)["ETag"]]
+
+        hold = SeatHold.objects.create(
+            show_session=show_session, user=self.user, row=1, seat=1,
+            expires_at=timezone.now() + timedelta(minutes=5),
+        )
+        etags.append(self.client.get(SHOW_SESSION_URL)["ETag"])
+        SeatHold.objects.filter(pk=hold.pk).delete()
+        etags.append(self.client.get(SHOW_SESSION_URL)["ETag"])
+
+        self.assertNotEqual(etags[1], etags[0])
+        self.assertEqual(etags[2], etags[0])
+
+    def test_cursor_pages_skip_the_list_watermark(self):
+        sample_show_session()
+
+        with self.assertNumQueries(1):
+            res = self.client.get(SHOW_SESSION_URL, {"pagination": "cursor"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("ETag", res)
+
     def test_create_show_session_forbidden(self):
         astronomy_show = sample_astronomy_show()
         planetarium_dome = sample_planetarium_dome()
@@ -111,6 +269,80 @@ class AuthenticatedShowSessionTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
 
 
+class AsyncShowSessionTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="testpass"
+        )
+        self.client = Client(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def test_auth_required(self):
+        res = Client().get(ASYNC_SHOW_SESSION_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_list_matches_sync_list(self):
+        dome = sample_planetarium_dome(rows=2, seats_in_row=5)
+        show_session = sample_show_session(planetarium_dome=dome)
+        sample_show_session()
+        Ticket.objects.create(
+            show_session=show_session,
+            reservation=Reservation.objects.create(user=self.user),
+            row=1,
+            seat=1,
+        )
+        api_client = APIClient()
+        api_client.force_authenticate(self.user)
+
+        res = self.client.get(ASYNC_SHOW_SESSION_URL, {"limit": 1})
+        expected = api_client.get(SHOW_SESSION_URL, {"limit": 1}).json()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["count"], 2)
+        self.assertEqual(res.json()["results"], expected["results"])
+        self.assertIn("offset=1", res.json()["next"])
+
+    def test_list_filter_by_date(self):
+        show_time = timezone.now() + timedelta(days=3)
+        sample_show_session(show_time=show_time)
+        sample_show_session()
+
+        res = self.client.get(
+            ASYNC_SHOW_SESSION_URL,
+            {"date": timezone.localdate(show_time).isoformat()},
+        )
+        self.assertEqual(res.json()["count"], 1)
+
+        res = self.client.get(ASYNC_SHOW_SESSION_URL, {"date": "1-1-2024"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_seat_map(self):
+        dome = sample_planetarium_dome(rows=2, seats_in_row=5)
+        show_session = sample_show_session(planetarium_dome=dome)
+        Ticket.objects.create(
+            show_session=show_session,
+            reservation=Reservation.objects.create(user=self.user),
+            row=2,
+            seat=3,
+        )
+        url = async_seat_map_url(show_session.id)
+
+        res = self.client.get(url)
+        self.assertEqual(res.json()["taken_seats"], [{"row": 2, "seat": 3}])
+
+        res = self.client.get(url, {"seatmap": "bitmap"})
+        bitmap = base64.b64decode(res.json()["taken_seats"])
+        self.assertEqual(bitmap, bytes([0b00000001, 0b00000000]))
+
+        res = self.client.get(url, {"seatmap": "x"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_seat_map_not_found(self):
+        res = self.client.get(async_seat_map_url(999))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
 class AdminShowSessionTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -132,6 +364,20 @@ class AdminShowSessionTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
         self.assertTrue(ShowSession.objects.filter(id=res.data["id"]).exists())
 
+    def test_update_show_session_keeps_counters(self):
+        show_session = sample_show_session()
+        ShowSession.objects.filter(pk=show_session.pk).update(tickets_sold=3)
+
+        res = self.client.patch(
+            detail_url(show_session.id),
+            {"show_time": (timezone.now() + timedelta(days=3)).isoformat()},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        show_session.refresh_from_db()
+        self.assertEqual(show_session.tickets_sold, 3)
+        self.assertEqual(show_session.version, 1)
+
     def test_delete_show_session(self):
         show_session = sample_show_session()
         url = detail_url(show_session.id)
@@ -149,3 +395,103 @@ class AdminShowSessionTests(TestCase):
         )
 
         self.assertIn("Space Tour", str(show_session))
+
+
+class TicketsSoldCounterTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="testpass"
+        )
+        self.show_session = sample_show_session()
+
+    def create_ticket(self, reservation, row=1, seat=1):
+        return Ticket.objects.create(
+            show_session=self.show_session,
+            reservation=reservation,
+            row=row,
+            seat=seat,
+        )
+
+    def test_counter_follows_ticket_create_and_delete(self):
+        reservation = Reservation.objects.create(user=self.user)
+        ticket = self.create_ticket(reservation, seat=1)
+        self.create_ticket(reservation, seat=2)
+        self.show_session.refresh_from_db()
+        self.assertEqual(self.show_session.tickets_sold, 2)
+
+        ticket.delete()
+        self.show_session.refresh_from_db()
+        self.assertEqual(self.show_session.tickets_sold, 1)
+
+        reservation.delete()
+        self.show_session.refresh_from_db()
+        self.assertEqual(self.show_session.tickets_sold, 0)
+
+    def test_raw_save_recounts_counter(self):
+        reservation = Reservation.objects.create(user=self.user)
+        self.create_ticket(reservation, seat=1)
+        ShowSession.objects.filter(pk=self.show_session.pk).update(
+            tickets_sold=0
+        )
+        Ticket(
+            show_session=self.show_session,
+            reservation=reservation,
+            row=1,
+            seat=2,
+        ).save_base(raw=True)
+
+        self.show_session.refresh_from_db()
+        self.assertEqual(self.show_session.tickets_sold, 2)
+
+    def test_loaddata_counts_tickets(self):
+        call_command("loaddata", "db_data.json", verbosity=0)
+
+        self.assertEqual(
+            dict(ShowSession.objects.filter(tickets_sold__gt=0)
+                 .values_list("id", "tickets_sold")),
+            {1: 2, 3: 1, 4: 1},
+        )
+
+    def test_moved_ticket_moves_counter(self):
+        other = sample_show_session()
+        ticket = self.create_ticket(Reservation.objects.create(user=self.user))
+
+        ticket.show_session = other
+        ticket.save()
+
+        self.show_session.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.show_session.tickets_sold, 0)
+        self.assertEqual(other.tickets_sold, 1)
+
+    def test_counter_follows_reservation_create(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        payload = {
+            "tickets": [
+                {"show_session": self.show_session.id, "row": 1, "seat": seat}
+                for seat in (1, 2, 3)
+            ]
+        }
+
+        client.post(reverse("planetarium:reservation-list"), payload,
+                    format="json")
+
+        self.show_session.refresh_from_db()
+        self.assertEqual(self.show_session.tickets_sold, 3)
+
+    def test_reconcile_command_repairs_drift(self):
+        self.create_ticket(Reservation.objects.create(user=self.user))
+        ShowSession.objects.filter(pk=self.show_session.pk).update(
+            tickets_sold=7
+        )
+
+        out = StringIO()
+        call_command("reconcile_tickets_sold", "--dry-run", stdout=out)
+        self.show_session.refresh_from_db()
+        self.assertEqual(self.show_session.tickets_sold, 7)
+        self.assertIn("tickets_sold 7, actual 1", out.getvalue())
+
+        call_command("reconcile_tickets_sold", stdout=StringIO())
+        self.show_session.refresh_from_db()
+        self.assertEqual(self.show_session.tickets_sold, 1)
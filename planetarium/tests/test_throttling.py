@@ -0,0 +1,207 @@
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import Client, SimpleTestCase, TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from planetarium.tests.test_reservation import (
+    RESERVATION_URL,
+    sample_show_session,
+)
+from planetarium.throttling import (
+    ActionScopedThrottle,
+    AnonSlidingWindowThrottle,
+    SlidingWindowThrottle,
+    UserSlidingWindowThrottle,
+    reset_throttles,
+)
+
+RATES = {"anon": "4/minute", "user": "4/minute", "booking": "2/minute"}
+
+
+class View:
+    def __init__(self, action=None, throttle_scopes=None):
+        self.action = action
+        if throttle_scopes is not None:
+            self.throttle_scopes = throttle_scopes
+
+
+class SlidingWindowThrottleTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 600.0
+        self.cache = LocMemCache("throttling-tests", {})
+        self.cache.clear()
+        for attribute, value in (("THROTTLE_RATES", RATES),
+                                 ("cache", self.cache),
+                                 ("timer", mock.Mock(
+                                     side_effect=lambda: self.now))):
+            patcher = mock.patch.object(SlidingWindowThrottle, attribute,
+                                        value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.request = APIRequestFactory().get("/")
+        self.request.user = AnonymousUser()
+
+    def allowed(self, throttle_class=AnonSlidingWindowThrottle,
+                request=None, view=None):
+        throttle = throttle_class()
+        result = throttle.allow_request(request or self.request,
+                                        view or View())
+        self.wait = throttle.wait() if not result else None
+        return result
+
+    def test_limits_within_window(self):
+        self.assertEqual([self.allowed() for _ in range(5)],
+                         [True, True, True, True, False])
+        self.assertEqual(self.wait, 60)
+
+    def test_previous_window_is_weighted(self):
+        for _ in range(4):
+            self.allowed()
+
+        # 10s into the next window 5/6 of the previous 4 requests count
+        self.now = 670.0
+        self.assertEqual([self.allowed() for _ in range(2)], [True, False])
+        self.assertEqual(self.wait, 5)
+
+        self.now = 676.0
+        self.assertTrue(self.allowed())
+
+    def test_counters_use_fixed_memory(self):
+        for _ in range(6):
+            self.allowed()
+
+        self.assertEqual(len(self.cache._cache), 1)
+        self.assertEqual(self.cache.get("throttle:anon:127.0.0.1:10"), 4)
+
+    def test_concurrent_requests_share_the_limit(self):
+        def allow(_):
+            return AnonSlidingWindowThrottle().allow_request(self.request,
+                                                             View())
+
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(allow, range(20)))
+
+        self.assertEqual(results.count(True), 4)
+
+    def test_identities_and_scopes(self):
+        user = get_user_model()(pk=7, email="user@example.com")
+        request = APIRequestFactory().get("/")
+        request.user = user
+
+        self.assertTrue(self.allowed(AnonSlidingWindowThrottle, request))
+        self.assertTrue(self.allowed(UserSlidingWindowThrottle))
+        for _ in range(4):
+            self.allowed(UserSlidingWindowThrottle, request)
+        self.assertFalse(self.allowed(UserSlidingWindowThrottle, request))
+        self.assertTrue(self.allowed())
+
+    def test_action_scopes(self):
+        booking = View("create", {"create": "booking"})
+
+        self.assertEqual(
+            [self.allowed(ActionScopedThrottle, view=booking)
+             for _ in range(3)],
+            [True, True, False],
+        )
+        self.assertTrue(self.allowed(ActionScopedThrottle,
+                                     view=View("list", {"create": "booking"})))
+        self.assertTrue(self.allowed(ActionScopedThrottle, view=View()))
+
+    def test_shared_cache_backend(self):
+        with tempfile.TemporaryDirectory() as directory:
+            shared = FileBasedCache(directory, {})
+            with mock.patch.object(AnonSlidingWindowThrottle, "cache",
+                                   shared):
+                self.assertEqual([self.allowed() for _ in range(5)],
+                                 [True, True, True, True, False])
+
+    def test_reset_throttles(self):
+        for _ in range(4):
+            self.allowed()
+
+        with mock.patch("planetarium.throttling.api_settings") as settings:
+            settings.DEFAULT_THROTTLE_RATES = RATES
+            reset_throttles(["127.0.0.1"])
+
+        self.assertTrue(self.allowed())
+
+
+class BookingThrottleTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "booking@example.com", "password"
+        )
+        self.client.force_authenticate(self.user)
+        reset_throttles([self.user.pk])
+        self.addCleanup(reset_throttles, [self.user.pk])
+
+    def test_reservation_create_has_own_scope(self):
+        show_session = sample_show_session()
+        rates = {**ActionScopedThrottle.THROTTLE_RATES, "booking": "2/hour"}
+        with mock.patch.object(ActionScopedThrottle, "THROTTLE_RATES",
+                               rates):
+            statuses = [
+                self.client.post(
+                    RESERVATION_URL,
+                    {"tickets": [{"show_session": show_session.id,
+                                  "row": 1, "seat": seat}]},
+                    format="json",
+                ).status_code
+                for seat in (1, 2, 3)
+            ]
+            list_status = self.client.get(RESERVATION_URL).status_code
+            hold_status = self.client.post(
+                reverse("planetarium:seathold-list"),
+                {"seats": [{"show_session": show_session.id,
+                            "row": 2, "seat": 1}]},
+                format="json",
+            ).status_code
+
+        self.assertEqual(statuses, [status.HTTP_201_CREATED,
+                                    status.HTTP_201_CREATED,
+                                    status.HTTP_429_TOO_MANY_REQUESTS])
+        self.assertEqual(list_status, status.HTTP_200_OK)
+        self.assertEqual(hold_status, status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+class AsyncViewThrottleTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "async@example.com", "password"
+        )
+        self.client = Client(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        reset_throttles([self.user.pk])
+        self.addCleanup(reset_throttles, [self.user.pk])
+
+    def test_async_views_are_throttled(self):
+        show_session = sample_show_session()
+        urls = [
+            reverse("planetarium:async-showsession-list"),
+            reverse("planetarium:async-showsession-seat-map",
+                    args=[show_session.id]),
+        ]
+        rates = {**UserSlidingWindowThrottle.THROTTLE_RATES,
+                 "user": "2/hour"}
+        with mock.patch.object(UserSlidingWindowThrottle, "THROTTLE_RATES",
+                               rates):
+            responses = [self.client.get(url) for url in urls * 2]
+
+        self.assertEqual(
+            [response.status_code for response in responses],
+            [status.HTTP_200_OK, status.HTTP_200_OK,
+             status.HTTP_429_TOO_MANY_REQUESTS,
+             status.HTTP_429_TOO_MANY_REQUESTS],
+        )
+        self.assertIn("Retry-After", responses[2])
@@ -1,7 +1,11 @@
+import csv
+import json
 from datetime import timedelta
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.reverse import reverse
@@ -12,11 +16,13 @@ from planetarium.models import (
     PlanetariumDome,
     ShowSession,
     Reservation,
+    SeatHold,
     Ticket,
 )
 
 
 TICKET_URL = reverse("planetarium:ticket-list")
+TICKET_EXPORT_URL = reverse("planetarium:ticket-export")
 
 
 def sample_astronomy_show(**kwargs):
@@ -71,6 +77,164 @@ class AuthenticatedTicketTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(len(res.data["results"]), 1)
+        self.assertEqual(res.data["results"][0], {
+            "id": res.data["results"][0]["id"],
+            "row": 1,
+            "seat": 1,
+            "show_session": {
+                "id": show_session.id,
+                "astronomy_show_title": "Sample Show",
+                "astronomy_show_image": None,
+                "planetarium_dome_name": "Dome 1",
+                "show_time": res.data["results"][0]["show_session"][
+                    "show_time"
+                ],
+                "tickets_available": 149,
+            },
+            "reservation": reservation.id,
+        })
+
+    def test_list_tickets_query_count_does_not_grow_with_page(self):
+        reservation = Reservation.objects.create(user=self.user)
+        for _ in range(4):
+            show_session = sample_show_session()
+            Ticket.objects.bulk_create(
+                Ticket(show_session=show_session, reservation=reservation,
+                       row=1, seat=seat)
+                for seat in range(1, 6)
+            )
+
+        with CaptureQueriesContext(connection) as small_page:
+            self.client.get(TICKET_URL, {"limit": 2})
+        with CaptureQueriesContext(connection) as large_page:
+            res = self.client.get(TICKET_URL, {"limit": 20})
+
+        self.assertEqual(len(res.data["results"]), 20)
+        self.assertEqual(len(large_page), len(small_page))
+
+    def test_list_tickets_not_modified(self):
+        show_session = sample_show_session()
+        reservation = Reservation.objects.create(user=self.user)
+        Ticket.objects.create(
+            show_session=show_session, reservation=reservation, row=1, seat=1
+        )
+        etag = self.client.get(TICKET_URL)["ETag"]
+
+        res = self.client.get(TICKET_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Ticket.objects.create(
+            show_session=show_session, reservation=reservation, row=1, seat=2
+        )
+        res = self.client.get(TICKET_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_list_tickets_modified_by_expiring_hold(self):
+        show_session = sample_show_session()
+        Ticket.objects.create(
+            show_session=show_session,
+            reservation=Reservation.objects.create(user=self.user),
+            row=1,
+            seat=1,
+        )
+        hold = SeatHold.objects.create(
+            show_session=show_session, user=self.user, row=1, seat=2,
+            expires_at=timezone.now() + timedelta(minutes=5),
+        )
+        etag = self.client.get(TICKET_URL)["ETag"]
+
+        SeatHold.objects.filter(pk=hold.pk).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        res = self.client.get(TICKET_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["results"][0]["show_session"]["tickets_available"], 149
+        )
+
+
+class TicketExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            email="admin@test.com", password="testpass"
+        )
+        self.client.force_authenticate(self.user)
+        self.show_session = sample_show_session()
+        self.reservation = Reservation.objects.create(user=self.user)
+        for seat in (1, 2, 3):
+            Ticket.objects.create(
+                show_session=self.show_session,
+                reservation=self.reservation,
+                row=1,
+                seat=seat,
+            )
+
+    def export(self, **params):
+        res = self.client.get(TICKET_EXPORT_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return b"".join(res.streaming_content).decode()
+
+    def test_export_ndjson(self):
+        with self.assertNumQueries(1):
+            lines = self.export(format="ndjson").splitlines()
+
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row["seat"] for row in rows], [1, 2, 3])
+        self.assertEqual(rows[0]["show_session"], self.show_session.id)
+        self.assertEqual(rows[0]["astronomy_show"], "Sample Show")
+        self.assertEqual(rows[0]["user"], "admin@test.com")
+        self.assertTrue(rows[0]["reserved_at"].endswith("Z"))
+
+    def test_export_csv(self):
+        res = self.client.get(TICKET_EXPORT_URL, {"format": "csv"})
+
+        self.assertEqual(res["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn("tickets.csv", res["Content-Disposition"])
+        rows = list(csv.DictReader(
+            b"".join(res.streaming_content).decode().splitlines()
+        ))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[2]["seat"], "3")
+        self.assertEqual(rows[2]["planetarium_dome"], "Dome 1")
+
+    def test_export_filters(self):
+        other_session = sample_show_session()
+        Ticket.objects.create(
+            show_session=other_session,
+            reservation=self.reservation,
+            row=1,
+            seat=1,
+        )
+        today = timezone.localdate()
+
+        self.assertEqual(
+            len(self.export(show_session=other_session.id).splitlines()), 1
+        )
+        self.assertEqual(
+            len(self.export(**{"from": today, "to": today}).splitlines()), 4
+        )
+        self.assertEqual(
+            self.export(**{"from": today + timedelta(days=1)}), ""
+        )
+        self.assertEqual(
+            self.export(to=(timezone.now() - timedelta(hours=1)).isoformat()),
+            "",
+        )
+
+    def test_export_invalid_filters(self):
+        for params in ({"from": "01.02.2026"}, {"show_session": "x"}):
+            res = self.client.get(TICKET_EXPORT_URL, params)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_admin_only(self):
+        self.user.is_staff = False
+        self.user.save()
+
+        res = self.client.get(TICKET_EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
 
 
 class TicketModelTests(TestCase):
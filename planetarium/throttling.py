@@ -0,0 +1,135 @@
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+def counter_keys(scope, ident, duration, now):
+    """Keys of the previous and the current window counter"""
+    window = int(now // duration)
+    return [f"throttle:{scope}:{ident}:{window - 1}",
+            f"throttle:{scope}:{ident}:{window}"]
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """Rate limit with two counters per client instead of a request log.
+
+    The number of recent requests is estimated from the counter of the
+    current fixed window plus the previous window's counter, weighted by
+    how much of it still overlaps the sliding window. A request is
+    counted with one incr before deciding and taken back with decr when
+    refused; both are atomic on the locmem, Redis and Memcached
+    backends, so memory stays constant and processes sharing the cache
+    count together.
+    """
+
+    def get_ident_key(self, request, view):
+        """Client identity within the scope, or None to skip throttling"""
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        ident = self.get_ident_key(request, view)
+        if ident is None:
+            return True
+
+        now = self.timer()
+        previous_key, current_key = counter_keys(self.scope, ident,
+                                                 self.duration, now)
+        previous = self.cache.get(previous_key, 0)
+        # Counting first makes concurrent requests see distinct counts,
+        # so no more than num_requests of them can pass
+        current = self.increment(current_key)
+        elapsed = now % self.duration
+        weight = 1 - elapsed / self.duration
+        # Allowed while the requests before this one leave room
+        if previous * weight + current - 1 < self.num_requests:
+            return True
+
+        # Refused requests do not count
+        self.cache.decr(current_key)
+        current -= 1
+        if current >= self.num_requests:
+            self.wait_seconds = self.duration - elapsed
+        else:
+            # The previous window fades out until enough room is left
+            self.wait_seconds = (
+                self.duration * (1 - (self.num_requests - current)
+                                 / previous) - elapsed
+            )
+        return False
+
+    def increment(self, key):
+        """Count a request in the window counter, return the new count"""
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            if self.cache.add(key, 1, 2 * self.duration):
+                return 1
+            return self.cache.incr(key)
+
+    def wait(self):
+        return max(self.wait_seconds, 0)
+
+
+class AnonSlidingWindowThrottle(SlidingWindowThrottle):
+    """Limit anonymous clients per IP address, scope "anon" """
+
+    scope = "anon"
+
+    def get_ident_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return self.get_ident(request)
+
+
+class UserSlidingWindowThrottle(SlidingWindowThrottle):
+    """Limit authenticated users per user id, scope "user" """
+
+    scope = "user"
+
+    def get_ident_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        return None
+
+
+class ActionScopedThrottle(SlidingWindowThrottle):
+    """Extra limits for expensive actions.
+
+    Views map actions to scopes in throttle_scopes, ex.
+    {"create": "booking"}; actions without a scope are not limited
+    here. Clients are counted per user, or per IP address when
+    anonymous.
+    """
+
+    def __init__(self):
+        # The scope depends on the view action, see allow_request
+        pass
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, "throttle_scopes", {}).get(
+            getattr(view, "action", None)
+        )
+        if self.scope is None:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_ident_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        return self.get_ident(request)
+
+
+def reset_throttles(idents):
+    """Forget the recent requests of the given idents in every scope"""
+    now = SlidingWindowThrottle.timer()
+    keys = []
+    for scope, rate in api_settings.DEFAULT_THROTTLE_RATES.items():
+        if rate is None:
+            continue
+        _, duration = ActionScopedThrottle().parse_rate(rate)
+        for ident in idents:
+            keys += counter_keys(scope, ident, duration, now)
+    SlidingWindowThrottle.cache.delete_many(keys)
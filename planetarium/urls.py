@@ -1,9 +1,11 @@
 from django.urls import path, include
 from rest_framework import routers
 
+from planetarium import async_views
 from planetarium.views import (ShowThemeViewSet, AstronomyShowViewSet,
                                PlanetariumDomeViewSet, ShowSessionViewSet,
-                               ReservationViewSet, TicketViewSet)
+                               ReservationViewSet, TicketViewSet,
+                               SeatHoldViewSet, CatalogCacheStatsView)
 
 router = routers.DefaultRouter()
 router.register("show-themes", ShowThemeViewSet)
@@ -12,9 +14,18 @@ router.register("planetarium-domes", PlanetariumDomeViewSet)
 router.register("show-sessions", ShowSessionViewSet)
 router.register("reservations", ReservationViewSet)
 router.register("tickets", TicketViewSet)
+router.register("seat-holds", SeatHoldViewSet)
 
 urlpatterns = [
+    path("show-sessions/<int:pk>/events/", async_views.show_session_events,
+         name="showsession-events"),
     path("", include(router.urls)),
+    path("cache-stats/", CatalogCacheStatsView.as_view(), name="cache-stats"),
+    path("async/show-sessions/", async_views.show_session_list,
+         name="async-showsession-list"),
+    path("async/show-sessions/<int:pk>/seat-map/",
+         async_views.show_session_seat_map,
+         name="async-showsession-seat-map"),
 ]
 
 app_name = "planetarium"
@@ -1,14 +1,37 @@
-from datetime import datetime
+from datetime import datetime, time, timedelta
 
-from django.db.models import Count, F
+from django.db.models import Count, Max, Sum
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from drf_spectacular.types import OpenApiTypes
-from drf_spectacular.utils import extend_schema, OpenApiParameter
+from drf_spectacular.utils import (
+    extend_schema,
+    extend_schema_view,
+    OpenApiParameter,
+)
 from rest_framework import viewsets, mixins, status
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from planetarium import events
+from planetarium.cache import (
+    CachedListMixin,
+    CachedRetrieveMixin,
+    catalog_cache_stats,
+)
+from planetarium.conditional import (
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+)
+from planetarium.counters import bump_versions
+from planetarium.idempotency import (
+    IDEMPOTENCY_KEY_PARAMETER,
+    IdempotentCreateMixin,
+)
 from planetarium.models import (
     ShowTheme,
     AstronomyShow,
@@ -16,8 +39,27 @@ from planetarium.models import (
     ShowSession,
     Reservation,
     Ticket,
+    SeatHold,
+)
+from planetarium.pagination import (
+    SelectablePaginationMixin,
+    ShowSessionCursorPagination,
+    TicketCursorPagination,
+    ReservationCursorPagination,
 )
 from planetarium.permissions import IsAdminOrIfAuthenticatedReadOnly
+from planetarium.read_models import (
+    TICKET_EXPORT_FIELDS,
+    ReadModelListMixin,
+    astronomy_show_list_items,
+    astronomy_show_list_values,
+    show_session_list_items,
+    show_session_list_values,
+    ticket_export_rows,
+    ticket_list_items,
+    ticket_list_values,
+)
+from planetarium.renderers import CSVRenderer, NDJSONRenderer
 from planetarium.serializers import (
     ShowThemeSerializer,
     AstronomyShowSerializer,
@@ -28,22 +70,75 @@ from planetarium.serializers import (
     AstronomyShowListSerializer,
     AstronomyShowRetrieveSerializer,
     ShowSessionRetrieveSerializer,
+    ShowSessionSeatMapSerializer,
     ReservationCreateSerializer,
     TicketListSerializer,
     ReservationListSerializer,
     AstronomyShowImageSerializer,
+    SeatHoldSerializer,
+    SeatHoldCreateSerializer,
+    SeatAllocationSerializer,
 )
+from planetarium.seatmap import active_holds, held_seats
+
+PAGINATION_PARAMETER = OpenApiParameter(
+    "pagination",
+    type=OpenApiTypes.STR,
+    enum=["offset", "cursor"],
+    description="Use limit/offset pages with a total count (default) "
+    "or cursor pages without a count",
+)
+
+
+def show_time_on(date):
+    """Half-open show_time range of a local date, served by its index"""
+    start = timezone.make_aware(datetime.combine(date, time.min))
+    end = timezone.make_aware(datetime.combine(date + timedelta(days=1),
+                                               time.min))
+    return {"show_time__gte": start, "show_time__lt": end}
+
+
+def parse_bound(name, value, end=False):
+    """Datetime of an ISO datetime or a date query parameter.
+
+    A date stands for its local midnight, or the next one for an end
+    bound, so that ?from=2026-02-01&to=2026-02-01 covers the whole day.
+    """
+    error = ValidationError(
+        {name: "Use format YYYY-MM-DD or an ISO 8601 datetime"}
+    )
+    try:
+        date = datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        try:
+            moment = parse_datetime(value)
+        except ValueError:
+            raise error
+        if moment is None:
+            raise error
+    else:
+        moment = datetime.combine(date + timedelta(days=end), time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
 
 
 class ShowThemeViewSet(
-    mixins.CreateModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet
+    CachedListMixin,
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet,
 ):
     queryset = ShowTheme.objects.all().order_by("id")
     serializer_class = ShowThemeSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_model = "showtheme"
 
 
 class AstronomyShowViewSet(
+    CachedListMixin,
+    CachedRetrieveMixin,
+    ReadModelListMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
@@ -51,6 +146,8 @@ class AstronomyShowViewSet(
 ):
     queryset = AstronomyShow.objects.all()
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_model = "astronomyshow"
+    cache_dependencies = ("showtheme",)
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -70,10 +167,16 @@ class AstronomyShowViewSet(
                 queryset = queryset.filter(themes__id__in=theme_ids).distinct()
             except ValueError:
                 raise ValidationError({"themes": "Use comma separated integers"})
-        if self.action in ("list", "retrieve"):
+        if self.action == "retrieve":
             queryset = queryset.prefetch_related("themes")
         return queryset.order_by("id")
 
+    def get_list_values(self, queryset):
+        return astronomy_show_list_values(queryset)
+
+    def get_list_data(self, rows):
+        return astronomy_show_list_items(rows, self.request)
+
     @action(
         methods=[
             "post",
@@ -107,22 +210,64 @@ class AstronomyShowViewSet(
 
 
 class PlanetariumDomeViewSet(
-    mixins.CreateModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet
+    CachedListMixin,
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet,
 ):
     queryset = PlanetariumDome.objects.all().order_by("id")
     serializer_class = PlanetariumDomeSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_model = "planetariumdome"
 
 
-class ShowSessionViewSet(viewsets.ModelViewSet):
+class ShowSessionViewSet(
+    SelectablePaginationMixin,
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    ReadModelListMixin,
+    IdempotentCreateMixin,
+    viewsets.ModelViewSet,
+):
     queryset = ShowSession.objects.all()
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cursor_pagination_class = ShowSessionCursorPagination
+    etag_dependencies = ("astronomyshow", "showtheme", "planetariumdome")
+    throttle_scopes = {"allocate": "booking"}
+
+    def get_list_watermark(self, queryset):
+        return tuple(
+            queryset.aggregate(
+                count=Count("pk"),
+                last=Max("pk"),
+                versions=Sum("version"),
+                held=Sum(active_holds()),
+            ).values()
+        )
+
+    def get_object_watermark(self, pk):
+        try:
+            return (
+                ShowSession.objects.filter(pk=pk)
+                .annotate(held=active_holds())
+                .values_list("version", "held")
+                .first()
+            )
+        except (TypeError, ValueError):
+            return None
 
     def get_serializer_class(self):
         if self.action == "list":
             return ShowSessionListSerializer
         elif self.action == "retrieve":
+            seatmap = self.request.query_params.get("seatmap", "list")
+            if seatmap == "bitmap":
+                return ShowSessionSeatMapSerializer
+            if seatmap != "list":
+                raise ValidationError({"seatmap": "Use list or bitmap"})
             return ShowSessionRetrieveSerializer
+        elif self.action == "allocate":
+            return SeatAllocationSerializer
         return ShowSessionSerializer
 
     def get_queryset(self):
@@ -131,41 +276,100 @@ class ShowSessionViewSet(viewsets.ModelViewSet):
         if date:
             try:
                 date = datetime.strptime(date, "%Y-%m-%d").date()
-                queryset = queryset.filter(show_time__date=date)
             except ValueError:
                 raise ValidationError({"date": "Use format YYYY-MM-DD"})
-        if self.action == "list":
-            queryset = queryset.select_related(
-                "astronomy_show", "planetarium_dome"
-            ).annotate(
-                tickets_available=F("planetarium_dome__rows")
-                * F("planetarium_dome__seats_in_row")
-                - Count("tickets", distinct=True)
-            )
-        elif self.action == "retrieve":
+            queryset = queryset.filter(**show_time_on(date))
+        if self.action == "retrieve":
             queryset = queryset.select_related("astronomy_show", "planetarium_dome")
+        elif self.action == "allocate":
+            queryset = queryset.select_related("planetarium_dome")
         return queryset.order_by("id")
 
+    def get_list_values(self, queryset):
+        return show_session_list_values(queryset)
+
+    def get_list_data(self, rows):
+        return show_session_list_items(rows, self.request)
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
                 "date",
                 type=OpenApiTypes.DATE,
                 description="Filter by date (ex. 2026-02-04)",
-            )
+            ),
+            PAGINATION_PARAMETER,
         ]
     )
     def list(self, request, *args, **kwargs):
         """Get list of Show Sessions"""
         return super().list(request, *args, **kwargs)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "seatmap",
+                type=OpenApiTypes.STR,
+                enum=["list", "bitmap"],
+                description="Format of taken_seats: list of {row, seat} "
+                "(default) or a base64 bitmap with one bit per seat, "
+                "row by row, most significant bit first",
+            )
+        ]
+    )
+    def retrieve(self, request, *args, **kwargs):
+        """Get Show Session with its taken seats"""
+        return super().retrieve(request, *args, **kwargs)
+
+    @extend_schema(
+        parameters=[IDEMPOTENCY_KEY_PARAMETER],
+        responses={201: ReservationCreateSerializer},
+    )
+    @action(methods=["post"], detail=True,
+            permission_classes=[IsAuthenticated])
+    def allocate(self, request, pk=None):
+        """Reserve the best available seats for count people"""
+        return self.idempotent(request, lambda: self.allocate_seats(request))
 
+    def allocate_seats(self, request):
+        serializer = self.get_serializer(
+            data=request.data,
+            context={**self.get_serializer_context(),
+                     "show_session": self.get_object()},
+        )
+        serializer.is_valid(raise_exception=True)
+        reservation = serializer.save()
+        return Response(ReservationCreateSerializer(reservation).data,
+                        status=status.HTTP_201_CREATED)
+
+
+@extend_schema_view(
+    list=extend_schema(parameters=[PAGINATION_PARAMETER]),
+    create=extend_schema(parameters=[IDEMPOTENCY_KEY_PARAMETER]),
+)
 class ReservationViewSet(
-    mixins.ListModelMixin, mixins.CreateModelMixin, viewsets.GenericViewSet
+    SelectablePaginationMixin,
+    ConditionalListMixin,
+    IdempotentCreateMixin,
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    viewsets.GenericViewSet,
 ):
     queryset = Reservation.objects.all()
     serializer_class = ReservationSerializer
     permission_classes = (IsAuthenticated,)
+    cursor_pagination_class = ReservationCursorPagination
+    etag_dependencies = ("astronomyshow", "planetariumdome")
+    throttle_scopes = {"create": "booking"}
+
+    def get_list_watermark(self, queryset):
+        return tuple(
+            queryset.aggregate(
+                count=Count("pk", distinct=True),
+                last=Max("pk"),
+                versions=Sum("tickets__show_session__version"),
+            ).values()
+        ) + (held_seats(queryset.values("tickets__show_session")),)
 
     def get_queryset(self):
         queryset = self.queryset.filter(user=self.request.user)
@@ -187,10 +391,165 @@ class ReservationViewSet(
         return ReservationSerializer
 
 
-class TicketViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+@extend_schema_view(list=extend_schema(parameters=[PAGINATION_PARAMETER]))
+class TicketViewSet(
+    SelectablePaginationMixin,
+    ConditionalListMixin,
+    ReadModelListMixin,
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet,
+):
     queryset = Ticket.objects.all()
     serializer_class = TicketListSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cursor_pagination_class = TicketCursorPagination
+    etag_dependencies = ("astronomyshow", "planetariumdome")
+    throttle_scopes = {"export": "export"}
+
+    def get_list_watermark(self, queryset):
+        return tuple(
+            queryset.aggregate(
+                count=Count("pk"),
+                last=Max("pk"),
+                versions=Sum("show_session__version"),
+            ).values()
+        ) + (held_seats(queryset.values("show_session")),)
+
+    def get_list_values(self, queryset):
+        return ticket_list_values(queryset)
+
+    def get_list_data(self, rows):
+        return ticket_list_items(rows, self.request)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "format", type=OpenApiTypes.STR, enum=["ndjson", "csv"]
+            ),
+            OpenApiParameter(
+                "show_session", type=OpenApiTypes.INT,
+                description="Only tickets of this show session",
+            ),
+            OpenApiParameter(
+                "from", type=OpenApiTypes.STR,
+                description="Reserved at or after this date or datetime",
+            ),
+            OpenApiParameter(
+                "to", type=OpenApiTypes.STR,
+                description="Reserved before this datetime or during this "
+                "date",
+            ),
+        ],
+        responses={(200, "application/x-ndjson"): OpenApiTypes.STR,
+                   (200, "text/csv"): OpenApiTypes.STR},
+    )
+    @action(
+        methods=["get"],
+        detail=False,
+        permission_classes=[IsAdminUser],
+        renderer_classes=[NDJSONRenderer, CSVRenderer],
+    )
+    def export(self, request):
+        """Stream all matching tickets as NDJSON or CSV, for admins"""
+        queryset = Ticket.objects.all()
+        params = request.query_params
+        if params.get("show_session"):
+            try:
+                queryset = queryset.filter(
+                    show_session_id=int(params["show_session"])
+                )
+            except ValueError:
+                raise ValidationError({"show_session": "Use an integer"})
+        if params.get("from"):
+            queryset = queryset.filter(
+                reservation__created_at__gte=parse_bound("from",
+                                                         params["from"])
+            )
+        if params.get("to"):
+            queryset = queryset.filter(
+                reservation__created_at__lt=parse_bound("to", params["to"],
+                                                        end=True)
+            )
+
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.stream(ticket_export_rows(queryset),
+                            TICKET_EXPORT_FIELDS),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="tickets.{renderer.format}"'
+        )
+        return response
+
+
+class SeatHoldViewSet(
+    IdempotentCreateMixin,
+    mixins.ListModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    queryset = SeatHold.objects.all()
+    permission_classes = (IsAuthenticated,)
+    throttle_scopes = {"create": "booking", "reserve": "booking"}
 
     def get_queryset(self):
-        return self.queryset.select_related("show_session", "reservation")
+        return self.queryset.active().filter(user=self.request.user)
+
+    def get_serializer_class(self):
+        if self.action == "create":
+            return SeatHoldCreateSerializer
+        if self.action == "reserve":
+            return ReservationCreateSerializer
+        return SeatHoldSerializer
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        bump_versions([instance.show_session_id])
+        events.publish_seats_on_commit(
+            events.SEATS_RELEASED,
+            [(instance.show_session_id, instance.row, instance.seat)],
+        )
+
+    @extend_schema(parameters=[IDEMPOTENCY_KEY_PARAMETER],
+                   responses=SeatHoldSerializer(many=True))
+    def create(self, request, *args, **kwargs):
+        """Hold seats for a few minutes before reserving them"""
+        return self.idempotent(request, lambda: self.hold_seats(request))
+
+    @extend_schema(request=None, parameters=[IDEMPOTENCY_KEY_PARAMETER])
+    @action(methods=["post"], detail=False)
+    def reserve(self, request):
+        """Turn all active seat holds of the user into a reservation"""
+        return self.idempotent(request, lambda: self.reserve_holds(request))
+
+    def hold_seats(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        holds = serializer.save()
+        return Response(SeatHoldSerializer(holds, many=True).data,
+                        status=status.HTTP_201_CREATED)
+
+    def reserve_holds(self, request):
+        tickets = [
+            {"show_session": hold.show_session_id,
+             "row": hold.row,
+             "seat": hold.seat}
+            for hold in self.get_queryset()
+        ]
+        if not tickets:
+            raise ValidationError({"seats": "You have no active seat holds."})
+        serializer = self.get_serializer(data={"tickets": tickets})
+        serializer.is_valid(raise_exception=True)
+        serializer.save(user=request.user)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class CatalogCacheStatsView(APIView):
+    """Hit and miss counters of the catalog response cache"""
+
+    permission_classes = (IsAdminUser,)
+
+    @extend_schema(responses={200: {"type": "object"}})
+    def get(self, request):
+        return Response(catalog_cache_stats())
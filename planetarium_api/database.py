@@ -0,0 +1,69 @@
+"""Connection management of the Postgres database, configured from env.
+
+DB_CONNECTION_MODE picks how connections are reused:
+
+- "none": open a connection per request, Django's default
+- "persistent": keep it open for DB_CONN_MAX_AGE seconds (default 60)
+  and check it is usable before reusing it
+- "pool": psycopg's connection pool of DB_POOL_MIN_SIZE to
+  DB_POOL_MAX_SIZE connections, waiting up to DB_POOL_TIMEOUT seconds
+  for a free one (needs psycopg 3 with psycopg_pool)
+
+DB_CONNECTION_ROLE ("web", "worker" or "maintenance") picks the
+statement timeout of the process, DB_STATEMENT_TIMEOUT_<ROLE> in
+milliseconds, 0 for none. It is sent as a connection option, so it
+costs no extra query. wsgi.py and asgi.py default the role to "web";
+other processes, such as management commands, default to
+"maintenance" so migrations and batch jobs are not cut off.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+CONNECTION_MODES = ("none", "persistent", "pool")
+STATEMENT_TIMEOUTS = {"web": 5000, "worker": 60000, "maintenance": 0}
+
+
+def env_int(environ, name, default):
+    return int(environ.get(name, default))
+
+
+def database_config(environ=os.environ, mode=None, role=None):
+    """DATABASES entry of the Postgres database described by environ"""
+    mode = mode or environ.get("DB_CONNECTION_MODE", "persistent")
+    role = role or environ.get("DB_CONNECTION_ROLE", "maintenance")
+    if mode not in CONNECTION_MODES:
+        raise ImproperlyConfigured(
+            f"DB_CONNECTION_MODE must be one of {', '.join(CONNECTION_MODES)}"
+        )
+    if role not in STATEMENT_TIMEOUTS:
+        raise ImproperlyConfigured(
+            "DB_CONNECTION_ROLE must be one of "
+            f"{', '.join(STATEMENT_TIMEOUTS)}"
+        )
+
+    config = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": environ.get("POSTGRES_DB"),
+        "USER": environ.get("POSTGRES_USER"),
+        "PASSWORD": environ.get("POSTGRES_PASSWORD"),
+        "HOST": environ.get("POSTGRES_HOST"),
+        "PORT": environ.get("POSTGRES_PORT"),
+        "CONN_MAX_AGE": 0,
+        "OPTIONS": {},
+    }
+    if mode == "persistent":
+        config["CONN_MAX_AGE"] = env_int(environ, "DB_CONN_MAX_AGE", 60)
+        config["CONN_HEALTH_CHECKS"] = True
+    elif mode == "pool":
+        config["OPTIONS"]["pool"] = {
+            "min_size": env_int(environ, "DB_POOL_MIN_SIZE", 2),
+            "max_size": env_int(environ, "DB_POOL_MAX_SIZE", 10),
+            "timeout": env_int(environ, "DB_POOL_TIMEOUT", 10),
+        }
+
+    timeout = env_int(environ, f"DB_STATEMENT_TIMEOUT_{role.upper()}",
+                      STATEMENT_TIMEOUTS[role])
+    if timeout:
+        config["OPTIONS"]["options"] = f"-c statement_timeout={timeout}"
+    return config
@@ -0,0 +1,106 @@
+"""Send reads of safe requests to read replicas.
+
+Aliases listed in PLANETARIUM_DB_REPLICAS serve the queries of GET,
+HEAD and OPTIONS requests, everything else (writes, unsafe requests,
+workers, management commands) uses the primary "default" database.
+A user whose request wrote something reads from the primary for the
+next PLANETARIUM_DB_PRIMARY_STICKINESS seconds, so a replica lagging
+behind cannot hide their own changes.
+"""
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.core.cache import cache
+
+PRIMARY = "default"
+
+read_from_replica = ContextVar("read_from_replica", default=False)
+
+
+def sticky_key(user_id):
+    return f"db:primary:{user_id}"
+
+
+def stick_to_primary(user_id):
+    """Send reads of the user to the primary for a while"""
+    cache.set(sticky_key(user_id), True,
+              settings.PLANETARIUM_DB_PRIMARY_STICKINESS)
+
+
+def use_primary():
+    """Read from the primary for the rest of the request"""
+    read_from_replica.set(False)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.PLANETARIUM_DB_REPLICAS
+        if replicas and read_from_replica.get():
+            return random.choice(replicas)
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *settings.PLANETARIUM_DB_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.PLANETARIUM_DB_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaMiddleware:
+    """Allow replica reads for safe requests, stick writers to primary.
+
+    Authentication calls use_primary() for users who wrote recently,
+    see user.authentication.CachedJWTAuthentication.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = read_from_replica.set(self.is_safe(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            read_from_replica.reset(token)
+        self.process_write(request, response)
+        return response
+
+    async def __acall__(self, request):
+        token = read_from_replica.set(self.is_safe(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            read_from_replica.reset(token)
+        await sync_to_async(self.process_write)(request, response)
+        return response
+
+    def is_safe(self, request):
+        return request.method in ("GET", "HEAD", "OPTIONS")
+
+    def process_write(self, request, response):
+        if self.is_safe(request) or response.status_code >= 400:
+            return
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            stick_to_primary(user.pk)
@@ -16,6 +16,8 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 
+from planetarium_api.database import database_config
+
 load_dotenv()
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -59,6 +61,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "planetarium_api.replicas.ReplicaMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -86,14 +89,46 @@ WSGI_APPLICATION = "planetarium_api.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Connection reuse and statement timeouts, see planetarium_api/database.py
+
 DATABASES = {
+    "default": database_config(),
+}
+
+# Read replicas, DB_REPLICA_HOSTS=host[:port],... with the credentials of
+# the primary, serve the reads of safe requests, see
+# planetarium_api/replicas.py
+
+PLANETARIUM_DB_REPLICAS = []
+for number, address in enumerate(
+    filter(None, os.environ.get("DB_REPLICA_HOSTS", "").split(",")), 1
+):
+    host, _, port = address.strip().partition(":")
+    alias = f"replica_{number}"
+    DATABASES[alias] = {
+        **database_config(),
+        "HOST": host,
+        "PORT": port or os.environ.get("POSTGRES_PORT"),
+        "TEST": {"MIRROR": "default"},
+    }
+    PLANETARIUM_DB_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["planetarium_api.replicas.ReplicaRouter"]
+
+PLANETARIUM_DB_PRIMARY_STICKINESS = int(
+    os.environ.get("PLANETARIUM_DB_PRIMARY_STICKINESS", 10)
+)
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
-        "NAME": os.environ.get("POSTGRES_DB"),
-        "USER": os.environ.get("POSTGRES_USER"),
-        "PASSWORD": os.environ.get("POSTGRES_PASSWORD"),
-        "HOST": os.environ.get("POSTGRES_HOST"),
-        "PORT": os.environ.get("POSTGRES_PORT"),
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "planetarium"),
     }
 }
 
@@ -148,14 +183,29 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 5,
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     ),
+    "DEFAULT_RENDERER_CLASSES": [
+        "planetarium.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "planetarium.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "planetarium.throttling.AnonSlidingWindowThrottle",
+        "planetarium.throttling.UserSlidingWindowThrottle",
+        "planetarium.throttling.ActionScopedThrottle",
     ],
-    "DEFAULT_THROTTLE_RATES": {"anon": "100/day", "user": "1000/day"},
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": "100/day",
+        "user": "1000/day",
+        "booking": "60/hour",
+        "export": "30/hour",
+    },
 }
 
 INTERNAL_IPS = [
@@ -179,4 +229,56 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_TOKENS": True,
+    "CHECK_REVOKE_TOKEN": True,
 }
+
+PLANETARIUM_USER_CACHE_TIMEOUT = int(
+    os.environ.get("PLANETARIUM_USER_CACHE_TIMEOUT", 60)
+)
+
+PLANETARIUM_CATALOG_CACHE_TIMEOUT = int(
+    os.environ.get("PLANETARIUM_CATALOG_CACHE_TIMEOUT", 60 * 60)
+)
+
+PLANETARIUM_SEAT_HOLD_TTL = timedelta(
+    minutes=int(os.environ.get("PLANETARIUM_SEAT_HOLD_TTL_MINUTES", 10))
+)
+
+# How concurrent reservations of the same seats are arbitrated:
+# constraint, session, advisory or optimistic, see
+# planetarium.booking.create_tickets
+PLANETARIUM_RESERVATION_LOCKING = os.environ.get(
+    "PLANETARIUM_RESERVATION_LOCKING", "constraint"
+)
+
+# planetarium.events.LocalHub fans seat events out inside one process,
+# planetarium.events.PostgresHub across processes with LISTEN/NOTIFY
+PLANETARIUM_SEAT_EVENT_HUB = os.environ.get(
+    "PLANETARIUM_SEAT_EVENT_HUB", "planetarium.events.LocalHub"
+)
+
+PLANETARIUM_SEAT_EVENT_KEEPALIVE = int(
+    os.environ.get("PLANETARIUM_SEAT_EVENT_KEEPALIVE", 15)
+)
+
+# Public base URL of the API (ex. https://planetarium.example.com),
+# enables re-rendering the catalog cache in the background after changes
+PLANETARIUM_CACHE_WARM_URL = os.environ.get("PLANETARIUM_CACHE_WARM_URL", "")
+
+PLANETARIUM_CACHE_WARM_DELAY = int(
+    os.environ.get("PLANETARIUM_CACHE_WARM_DELAY", 5)
+)
+
+PLANETARIUM_JOB_STALE_AFTER = timedelta(
+    minutes=int(os.environ.get("PLANETARIUM_JOB_STALE_AFTER_MINUTES", 10))
+)
+
+# Responses of create requests with an Idempotency-Key are replayed for
+# this many seconds; retries wait this long for a request still running
+PLANETARIUM_IDEMPOTENCY_TTL = int(
+    os.environ.get("PLANETARIUM_IDEMPOTENCY_TTL", 24 * 60 * 60)
+)
+
+PLANETARIUM_IDEMPOTENCY_WAIT = int(
+    os.environ.get("PLANETARIUM_IDEMPOTENCY_WAIT", 10)
+)
@@ -12,5 +12,7 @@ import os
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "planetarium_api.settings")
+# Statement timeout of web requests, see planetarium_api/database.py
+os.environ.setdefault("DB_CONNECTION_ROLE", "web")
 
 application = get_wsgi_application()
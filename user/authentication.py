@@ -0,0 +1,115 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from planetarium_api import replicas
+
+CACHED_FIELDS = ("id", "email", "is_active", "is_staff", "is_superuser")
+
+
+def user_cache_key(user_id):
+    return f"user:auth:{user_id}"
+
+
+def user_entry(user):
+    """Cache entry of a user loaded for authentication"""
+    if user is None:
+        raise AuthenticationFailed(_("User not found"),
+                                   code="user_not_found")
+    cached = {name: getattr(user, name) for name in CACHED_FIELDS}
+    cached["token_version"] = get_md5_hash_password(user.password)
+    return cached
+
+
+def invalidate_user(user_id):
+    """Drop the cached user now and again when the transaction commits"""
+    key = user_cache_key(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that reads users through the cache.
+
+    The fields permissions and views need are cached for
+    PLANETARIUM_USER_CACHE_TIMEOUT seconds together with a hash of the
+    password, which tokens carry as their version (CHECK_REVOKE_TOKEN),
+    so changing the password revokes them. request.user is a User with
+    the other fields deferred; reading one of them loads it. Saving a
+    user drops its entry, other changes show after the timeout. Users
+    who wrote recently read from the primary database, see
+    planetarium_api.replicas.
+    """
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        key = user_cache_key(user_id)
+        sticky = replicas.sticky_key(user_id)
+        entries = cache.get_many([key, sticky])
+        if sticky in entries:
+            replicas.use_primary()
+        cached = entries.get(key)
+        if cached is None:
+            cached = self.load_user(user_id)
+            cache.set(key, cached, settings.PLANETARIUM_USER_CACHE_TIMEOUT)
+        return self.cached_user(validated_token, cached)
+
+    async def aget_user(self, validated_token):
+        """get_user for async views, with the async cache and ORM APIs"""
+        user_id = self.get_user_id(validated_token)
+        key = user_cache_key(user_id)
+        sticky = replicas.sticky_key(user_id)
+        entries = await cache.aget_many([key, sticky])
+        if sticky in entries:
+            replicas.use_primary()
+        cached = entries.get(key)
+        if cached is None:
+            cached = user_entry(await self.user_model.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id}
+            ).afirst())
+            await cache.aset(key, cached,
+                             settings.PLANETARIUM_USER_CACHE_TIMEOUT)
+        return self.cached_user(validated_token, cached)
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+    def cached_user(self, validated_token, cached):
+        if api_settings.CHECK_USER_IS_ACTIVE and not cached["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"),
+                                       code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != cached["token_version"]:
+            raise AuthenticationFailed(
+                _("The user's password has been changed."),
+                code="password_changed",
+            )
+
+        field_names = [
+            field.attname for field in self.user_model._meta.concrete_fields
+            if field.attname in CACHED_FIELDS
+        ]
+        return self.user_model.from_db(
+            router.db_for_read(self.user_model),
+            field_names,
+            [cached[name] for name in field_names],
+        )
+
+    def load_user(self, user_id):
+        return user_entry(self.user_model.objects.filter(
+            **{api_settings.USER_ID_FIELD: user_id}
+        ).first())
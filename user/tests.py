@@ -1,8 +1,14 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from drf_spectacular.generators import SchemaGenerator
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from user.authentication import CachedJWTAuthentication, user_cache_key
 
 
 CREATE_USER_URL = reverse("user:create")
@@ -153,6 +159,97 @@ class PrivateUserApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
 
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="testpass123",
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def test_authenticated_read_needs_no_user_query(self):
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["email"], "test@test.com")
+
+    def test_saving_user_invalidates_cache(self):
+        self.client.get(ME_URL)
+        self.user.is_staff = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertTrue(res.data["is_staff"])
+
+    def test_update_profile_through_cached_user(self):
+        self.client.get(ME_URL)
+
+        res = self.client.patch(ME_URL, {"email": "new@test.com"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(self.client.get(ME_URL).data["email"],
+                         "new@test.com")
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("testpass123"))
+
+    def test_password_change_revokes_tokens(self):
+        res = self.client.patch(ME_URL, {"password": "newpassword123"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_inactive_user_rejected(self):
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_async_get_user_fills_and_reads_cache(self):
+        authentication = CachedJWTAuthentication()
+        token = AccessToken.for_user(self.user)
+        await cache.adelete(user_cache_key(self.user.id))
+
+        user = await authentication.aget_user(token)
+        await get_user_model().objects.filter(pk=self.user.pk).aupdate(
+            email="changed@test.com"
+        )
+        cached = await authentication.aget_user(token)
+
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(cached.email, "test@test.com")
+
+    async def test_async_get_user_rejects_inactive_user(self):
+        self.user.is_active = False
+        await self.user.asave()
+
+        with self.assertRaises(AuthenticationFailed):
+            await CachedJWTAuthentication().aget_user(
+                AccessToken.for_user(self.user)
+            )
+
+
+    def test_schema_documents_jwt_scheme(self):
+        schema = SchemaGenerator().get_schema(request=None, public=True)
+
+        self.assertEqual(
+            schema["components"]["securitySchemes"]["jwtAuth"]["scheme"],
+            "bearer",
+        )
+        self.assertIn({"jwtAuth": []}, schema["paths"]["/api/user/me/"]
+                      ["get"]["security"])
+
 class UserManagerTests(TestCase):
     def test_create_user(self):
         email = "test@test.com"